@@ -0,0 +1,333 @@
+"""
+Deterministic offline stand-ins for the external services, shared by the
+benchmarks: Gemini chat (ChatGoogleGenerativeAI), Gemini embeddings
+(GoogleGenerativeAIEmbeddings), Qdrant (sync and async clients) and
+OpenWeatherMap (requests and httpx clients).
+
+Every fake sleeps for a latency drawn from a seeded `Latency`, so runs with
+the same configuration are reproducible. `fake_backends()` patches them all
+in for the duration of a `with` block.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import AIMessage
+from src.tools.clients import clear_clients
+from src.tools.tenancy import payload_value
+
+DIMENSION = 768
+
+class Latency:
+    """Seeded latency: `mean` seconds +/- uniform `jitter`"""
+
+    def __init__(self, mean: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.mean = mean
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self) -> float:
+        if not self.jitter:
+            return self.mean
+        with self._lock:
+            return max(0.0, self.mean + self._random.uniform(-self.jitter, self.jitter))
+
+    def sleep(self):
+        delay = self.sample()
+        if delay:
+            time.sleep(delay)
+
+    async def asleep(self):
+        delay = self.sample()
+        if delay:
+            await asyncio.sleep(delay)
+
+def _content(message) -> str:
+    return message.content if hasattr(message, "content") else message["content"]
+
+class FakeChatModel:
+    """
+    Chat model answering routing prompts with a route, city prompts with the
+    city and anything else with a fixed answer, reporting estimated token usage
+    """
+
+    def __init__(self, latency: Latency, **kwargs):
+        self.latency = latency
+
+    @staticmethod
+    def _reply(prompt: str) -> str:
+        query = re.search(r"Query: (.*)", prompt)
+        if "Return only JSON" in prompt:
+            weather = "weather" in query.group(1).lower()
+            return json.dumps({"route": "weather" if weather else "document",
+                               "city": query.group(1).rstrip("?").split()[-1] if weather else None,
+                               "units": None, "date": None})
+        if "Return exactly one word" in prompt:
+            return "weather" if "weather" in query.group(1).lower() else "document"
+        if prompt.startswith("Extract just the city name from:"):
+            return prompt.rstrip("?").split()[-1]
+        return "A generated answer based on the retrieved context."
+
+    def _answer(self, messages) -> AIMessage:
+        prompt = _content(messages[-1])
+        content = self._reply(prompt)
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": len(prompt) // 4, "output_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4
+        })
+
+    def invoke(self, messages, config=None, **kwargs) -> AIMessage:
+        self.latency.sleep()
+        return self._answer(messages)
+
+    async def ainvoke(self, messages, config=None, **kwargs) -> AIMessage:
+        await self.latency.asleep()
+        return self._answer(messages)
+
+    def batch(self, inputs, config=None, **kwargs) -> List[AIMessage]:
+        # Requests of a batch run concurrently, so the batch takes about one latency
+        self.latency.sleep()
+        return [self._answer(messages) for messages in inputs]
+
+class FakeEmbeddings:
+    """Deterministic unit vectors derived from the text hash; one latency per call"""
+
+    def __init__(self, latency: Latency, dimension: int = DIMENSION, **kwargs):
+        self.latency = latency
+        self.dimension = dimension
+
+    def _vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dimension)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        self.latency.sleep()
+        return self._vector(text)
+
+    def embed_documents(self, texts: List[str], task_type: Optional[str] = None) -> List[List[float]]:
+        self.latency.sleep()
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await self.latency.asleep()
+        return self._vector(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await self.latency.asleep()
+        return [self._vector(text) for text in texts]
+
+class FakeQdrantStore:
+    """In-memory collections with exact cosine search, shared by the sync and async fake clients"""
+
+    def __init__(self):
+        self.collections: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _matrix(self, collection: Dict):
+        if collection["matrix"] is None:
+            ids = list(collection["points"])
+            vectors = np.array([collection["points"][i][0] for i in ids], dtype=np.float32)
+            if ids:
+                vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            collection["matrix"] = (ids, vectors)
+        return collection["matrix"]
+
+    def query(self, name: str, vector, limit: int, with_vectors: bool = False, query_filter=None):
+        with self._lock:
+            collection = self.collections[name]
+            ids, matrix = self._matrix(collection)
+            if not ids:
+                return SimpleNamespace(points=[])
+            query = np.asarray(vector, dtype=np.float32)
+            scores = matrix @ (query / max(np.linalg.norm(query), 1e-12))
+            if query_filter is not None:
+                keep = np.array([filter_matches(collection["points"][point_id][1], query_filter)
+                                 for point_id in ids])
+                scores[~keep] = -np.inf
+                limit = min(limit, int(keep.sum()))
+            top = np.argsort(-scores)[:limit]
+            points = []
+            for row in top:
+                vector, payload = collection["points"][ids[row]]
+                points.append(SimpleNamespace(id=ids[row], payload=payload, score=float(scores[row]),
+                                              vector=list(vector) if with_vectors else None))
+        return SimpleNamespace(points=points)
+
+def filter_matches(payload: Dict, condition) -> bool:
+    """Evaluate the subset of Qdrant filters that QdrantBackend builds"""
+    if getattr(condition, "is_empty", None) is not None:
+        return payload_value(payload, condition.is_empty.key) is None
+    if getattr(condition, "match", None) is not None:
+        value = payload_value(payload, condition.key)
+        match = condition.match
+        return value in match.any if getattr(match, "any", None) is not None else value == match.value
+    return (all(filter_matches(payload, c) for c in condition.must or [])
+            and (not condition.should or any(filter_matches(payload, c) for c in condition.should)))
+
+class FakeQdrantClient:
+    """The subset of QdrantClient used by QdrantBackend"""
+
+    def __init__(self, store: FakeQdrantStore, latency: Latency, **kwargs):
+        self.store = store
+        self.latency = latency
+
+    def get_collection(self, collection_name: str):
+        if collection_name not in self.store.collections:
+            raise ValueError(f"Collection {collection_name} not found")
+        return SimpleNamespace(points_count=len(self.store.collections[collection_name]["points"]))
+
+    def create_collection(self, collection_name: str, **config):
+        with self.store._lock:
+            self.store.collections[collection_name] = {"points": {}, "matrix": None}
+
+    def create_payload_index(self, collection_name: str, field_name: str, field_schema=None):
+        pass
+
+    def delete_collection(self, collection_name: str):
+        with self.store._lock:
+            self.store.collections.pop(collection_name, None)
+
+    def upsert(self, collection_name: str, points):
+        self.latency.sleep()
+        with self.store._lock:
+            collection = self.store.collections[collection_name]
+            for point in points:
+                collection["points"][str(point.id)] = (point.vector, point.payload)
+            collection["matrix"] = None
+
+    def delete(self, collection_name: str, points_selector):
+        self.latency.sleep()
+        with self.store._lock:
+            collection = self.store.collections[collection_name]
+            if getattr(points_selector, "filter", None) is not None:
+                ids = [point_id for point_id, (_, payload) in collection["points"].items()
+                       if filter_matches(payload, points_selector.filter)]
+            else:
+                ids = points_selector.points
+            for point_id in ids:
+                collection["points"].pop(str(point_id), None)
+            collection["matrix"] = None
+
+    def retrieve(self, collection_name: str, ids, with_payload: bool = True):
+        self.latency.sleep()
+        points = self.store.collections[collection_name]["points"]
+        return [SimpleNamespace(id=point_id, payload=points[str(point_id)][1])
+                for point_id in ids if str(point_id) in points]
+
+    def query_points(self, collection_name: str, query, limit: int = 10, with_vectors: bool = False,
+                     query_filter=None, **kwargs):
+        self.latency.sleep()
+        return self.store.query(collection_name, query, limit, with_vectors, query_filter)
+
+    def query_batch_points(self, collection_name: str, requests):
+        self.latency.sleep()
+        return [self.store.query(collection_name, request.query, request.limit, bool(request.with_vector),
+                                 request.filter)
+                for request in requests]
+
+class FakeAsyncQdrantClient:
+    """The subset of AsyncQdrantClient used by QdrantBackend"""
+
+    def __init__(self, store: FakeQdrantStore, latency: Latency, **kwargs):
+        self.store = store
+        self.latency = latency
+
+    async def query_points(self, collection_name: str, query, limit: int = 10, with_vectors: bool = False,
+                           query_filter=None, **kwargs):
+        await self.latency.asleep()
+        return self.store.query(collection_name, query, limit, with_vectors, query_filter)
+
+class FakeWeatherResponse:
+    """requests/httpx-style response carrying an OpenWeatherMap payload"""
+
+    status_code = 200
+    headers: Dict[str, str] = {}
+
+    def __init__(self, city: str):
+        temp = 5 + int(hashlib.sha256(city.encode("utf-8")).hexdigest(), 16) % 25
+        self._body = {"name": city, "main": {"temp": float(temp), "feels_like": temp - 1.0, "humidity": 60},
+                      "weather": [{"description": "clear sky"}]}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self) -> Dict:
+        return self._body
+
+class FakeWeatherSession:
+    """requests.Session replacement for WeatherAPI"""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+
+    def mount(self, prefix, adapter):
+        pass
+
+    def get(self, url, params=None, timeout=None):
+        self.latency.sleep()
+        return FakeWeatherResponse(params["q"])
+
+class FakeHTTPClient:
+    """httpx.AsyncClient replacement for WeatherAPI"""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+
+    async def get(self, url, params=None):
+        await self.latency.asleep()
+        return FakeWeatherResponse(params["q"])
+
+@contextmanager
+def fake_backends(llm: float = 0.3, embed: float = 0.05, search: float = 0.02, weather: float = 0.1,
+                  jitter: float = 0.0, seed: int = 0):
+    """
+    Patch every external service with a fake of the given mean latency
+    (seconds, +/- `jitter` as a fraction of the mean). Shared clients are
+    cleared on entry and exit, and the embedding cache, BM25 index and chunk
+    store stay in memory so runs leave nothing on disk.
+    """
+    def latency(mean: float, offset: int) -> Latency:
+        return Latency(mean, mean * jitter, seed + offset)
+
+    llm_latency, embed_latency = latency(llm, 1), latency(embed, 2)
+    search_latency, weather_latency = latency(search, 3), latency(weather, 4)
+    store = FakeQdrantStore()
+    clear_clients()
+    try:
+        with patch('src.tools.vector_store.QdrantClient',
+                   side_effect=lambda **kw: FakeQdrantClient(store, search_latency)), \
+                patch('src.tools.vector_store.AsyncQdrantClient',
+                      side_effect=lambda **kw: FakeAsyncQdrantClient(store, search_latency)), \
+                patch('src.tools.vector_store.GoogleGenerativeAIEmbeddings',
+                      side_effect=lambda **kw: FakeEmbeddings(embed_latency)), \
+                patch('src.tools.vector_store.EMBEDDING_CACHE_PATH', None), \
+                patch('src.tools.vector_store.BM25_INDEX_PATH', ""), \
+                patch('src.tools.vector_store.STORE_VERSION_PATH', ""), \
+                patch('src.tools.vector_store.CHUNK_STORE_PATH', ":memory:"), \
+                patch('src.graphs.workflow.ChatGoogleGenerativeAI',
+                      side_effect=lambda **kw: FakeChatModel(llm_latency)), \
+                patch('src.agents.router_agent.ChatGoogleGenerativeAI',
+                      side_effect=lambda **kw: FakeChatModel(llm_latency)), \
+                patch('src.tools.weather_api.requests.Session',
+                      side_effect=lambda: FakeWeatherSession(weather_latency)), \
+                patch('src.tools.weather_api.WeatherAPI._new_async_client',
+                      side_effect=lambda: FakeHTTPClient(weather_latency)):
+            yield store
+    finally:
+        clear_clients()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Per-query workflow overhead before and after caching the compiled graph.
+
+Backends are replaced with in-process stubs, so the numbers isolate the cost
+of building WorkflowGraph objects and compiling the LangGraph:
+
+    python benchmarks/graph_overhead.py --queries 200
+"""
+import argparse
+import os
+import sys
+import time
+from unittest.mock import Mock, patch
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.graphs.workflow import WorkflowGraph
+from src.tools.clients import clear_clients
+
+def make_workflow() -> WorkflowGraph:
+    """Build a WorkflowGraph whose backends answer instantly"""
+    workflow = WorkflowGraph()
+    workflow.router = Mock()
+    workflow.router.route.side_effect = lambda query: {"route": "document", "query": query, "slots": {}}
+    workflow._process_document = lambda query, tenant=None, history="": ("stub answer", None)
+    return workflow
+
+def time_per_query(fn, queries: int) -> float:
+    start = time.perf_counter()
+    for i in range(queries):
+        fn(f"question {i}")
+    return (time.perf_counter() - start) / queries * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    with patch('src.graphs.workflow.RouterAgent'), patch('src.graphs.workflow.WeatherAPI'), \
+            patch('src.graphs.workflow.VectorStore'), patch('src.graphs.workflow.ChatGoogleGenerativeAI'):
+        workflow = make_workflow()
+
+        # Before: a new WorkflowGraph per Streamlit rerun and a fresh compile per query
+        def rebuild_everything(query):
+            clear_clients()
+            fresh = make_workflow()
+            return fresh.create_graph().invoke({"query": query, "messages": []})
+
+        # Before: the graph is compiled on every run call
+        def recompile(query):
+            return workflow.create_graph().invoke({"query": query, "messages": []})
+
+        # After: shared clients and a graph compiled once per process
+        def cached(query):
+            return workflow.run(query)
+
+        workflow.run("warm up")
+        results = [
+            ("new workflow + compile per query", time_per_query(rebuild_everything, args.queries)),
+            ("compile per query", time_per_query(recompile, args.queries)),
+            ("compiled once (current)", time_per_query(cached, args.queries)),
+        ]
+
+    print(f"Per-query overhead over {args.queries} queries:")
+    for name, ms in results:
+        print(f"  {name:<34} {ms:8.3f} ms")
+    print(f"  speedup vs compile per query       {results[1][1] / results[2][1]:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Async load test for WorkflowGraph.arun with mocked backends.
+
+The Gemini LLM, embeddings, Qdrant and OpenWeatherMap are replaced with
+fakes that sleep for a configurable latency, so the run measures how many
+concurrent queries one process and one event loop can serve:
+
+    python benchmarks/load_test.py --queries 500 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fakes import fake_backends
+from src.graphs.workflow import WorkflowGraph
+
+CITIES = ["London", "Paris", "Tokyo", "Berlin", "Madrid", "Rome", "Oslo", "Cairo", "Lima", "Seoul"]
+
+def make_queries(count: int):
+    queries = []
+    for i in range(count):
+        if i % 2:
+            queries.append(f"What's the weather in {CITIES[i % len(CITIES)]}?")
+        else:
+            queries.append(f"Question {i}: what does it say about topic {i}?")
+    return queries
+
+async def run_load(workflow: WorkflowGraph, queries, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(query):
+        async with semaphore:
+            start = time.perf_counter()
+            await workflow.arun(query)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[one(q) for q in queries])
+    return time.perf_counter() - start, latencies
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--search-latency", type=float, default=0.02)
+    parser.add_argument("--weather-latency", type=float, default=0.1)
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- fraction of each latency")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with fake_backends(llm=args.llm_latency, embed=args.embed_latency, search=args.search_latency,
+                       weather=args.weather_latency, jitter=args.jitter, seed=args.seed):
+        workflow = WorkflowGraph()
+        workflow.weather_api.rate_limit_per_minute = 10 ** 9
+        queries = make_queries(args.queries)
+        elapsed, latencies = asyncio.run(run_load(workflow, queries, args.concurrency))
+
+    serial_estimate = sum(latencies)
+    print(f"Queries: {args.queries}  concurrency: {args.concurrency}")
+    print(f"Wall time:   {elapsed:8.2f} s")
+    print(f"Throughput:  {args.queries / elapsed:8.1f} queries/s")
+    print(f"Latency p50: {percentile(latencies, 50) * 1000:8.1f} ms")
+    print(f"Latency p95: {percentile(latencies, 95) * 1000:8.1f} ms")
+    print(f"Latency p99: {percentile(latencies, 99) * 1000:8.1f} ms")
+    print(f"Mean latency {statistics.mean(latencies) * 1000:8.1f} ms "
+          f"(serial run would take ~{serial_estimate:.1f} s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Cost and effect of the rerank stage for different candidate counts.
+
+For each candidate count the top hits are over-fetched from clustered
+synthetic 768-dimensional embeddings and reduced to --top-k by maximal
+marginal relevance. Reported per count: p50/p99 rerank latency, mean
+relevance (cosine to the query) and mean redundancy (highest cosine between
+two kept passages) of the kept hits:
+
+    python benchmarks/rerank.py --queries 200 --lambda 0.7
+
+With --model, a local cross-encoder (needs sentence-transformers) also
+scores each candidate list of placeholder passages, to measure its CPU cost.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.reranker import Reranker
+
+DIMENSION = 768
+
+def make_data(points: int, queries: int, seed: int = 0):
+    """Unit vectors in clusters, each passage with a few near-duplicates
+    (like overlapping chunks or repeated boilerplate)"""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(max(1, points // 200), DIMENSION))
+    passages = centres[rng.integers(len(centres), size=points // 4)] + 0.8 * rng.normal(size=(points // 4, DIMENSION))
+    passages /= np.linalg.norm(passages, axis=1, keepdims=True)
+    vectors = np.repeat(passages, 4, axis=0) + 0.005 * rng.normal(size=(len(passages) * 4, DIMENSION))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    query_vectors = centres[rng.integers(len(centres), size=queries)] + 0.5 * rng.normal(size=(queries, DIMENSION))
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32), query_vectors.astype(np.float32)
+
+def redundancy(vectors: np.ndarray) -> float:
+    if len(vectors) < 2:
+        return 0.0
+    similarity = vectors @ vectors.T
+    np.fill_diagonal(similarity, -1.0)
+    return float(similarity.max())
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--lambda", dest="mmr_lambda", type=float, default=0.7)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[5, 10, 20, 50])
+    parser.add_argument("--model", default="", help="cross-encoder model name, e.g. cross-encoder/ms-marco-MiniLM-L-6-v2")
+    args = parser.parse_args()
+
+    vectors, queries = make_data(args.points, args.queries)
+    reranker = Reranker(top_k=args.top_k, mmr_lambda=args.mmr_lambda, model_name=args.model)
+
+    print(f"{args.points} points, {args.queries} queries, top {args.top_k}, lambda {args.mmr_lambda}")
+    print(f"{'candidates':<12}{'p50 ms':>9}{'p99 ms':>9}{'relevance':>11}{'redundancy':>12}")
+    for candidates in args.candidates:
+        latencies, relevance, overlap = [], [], []
+        for query in queries:
+            scores = vectors @ query
+            top = np.argpartition(-scores, candidates - 1)[:candidates]
+            top = top[np.argsort(-scores[top])]
+            hits = [{"text": f"placeholder passage {row} " * 20, "score": float(scores[row]),
+                     "metadata": {"row": int(row)}, "vector": vectors[row].tolist()} for row in top]
+            start = time.perf_counter()
+            kept, _ = reranker.rerank("placeholder question", hits)
+            latencies.append(time.perf_counter() - start)
+            rows = [hit["metadata"]["row"] for hit in kept]
+            relevance.append(float(scores[rows].mean()))
+            overlap.append(redundancy(vectors[rows]))
+        print(f"{candidates:<12}{percentile(latencies, 50) * 1000:>9.2f}{percentile(latencies, 99) * 1000:>9.2f}"
+              f"{np.mean(relevance):>11.3f}{np.mean(overlap):>12.3f}")
+    print(f"candidates = top-k ({args.top_k}) is plain vector search; "
+          "lower redundancy means more distinct passages reach the prompt.")
+
+if __name__ == "__main__":
+    main()
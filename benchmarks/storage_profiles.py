@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Memory, recall and latency of the collection storage profiles.
+
+For each profile in src/tools/storage_profiles.py this reports the estimated
+RAM and disk per million chunks, recall@k against exact search and p50/p99
+search latency, on clustered synthetic 768-dimensional embeddings:
+
+    python benchmarks/storage_profiles.py --points 20000 --queries 200
+
+By default quantized search with rescoring is emulated in NumPy (exact
+search over the quantized vectors, so HNSW effects are not included). With
+--qdrant each profile is loaded into a temporary collection on the Qdrant
+server at QDRANT_HOST:QDRANT_PORT and searched for real.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.storage_profiles import STORAGE_PROFILES, estimate_bytes_per_chunk, slim_payload
+
+DIMENSION = 768
+
+def make_data(points: int, queries: int, seed: int = 0):
+    """Unit vectors around a few hundred cluster centres, like real embeddings"""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(max(1, points // 100), DIMENSION))
+    vectors = centres[rng.integers(len(centres), size=points)] + 0.6 * rng.normal(size=(points, DIMENSION))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    picks = rng.integers(points, size=queries)
+    query_vectors = vectors[picks] + 0.1 * rng.normal(size=(queries, DIMENSION))
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32), query_vectors.astype(np.float32)
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    scores = queries @ vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+def quantize(profile, vectors: np.ndarray) -> np.ndarray:
+    """Vectors as the quantized index sees them"""
+    if profile["quantization"] == "scalar":
+        # int8 over the 0.99 quantile range, as Qdrant does
+        low, high = np.quantile(vectors, [0.005, 0.995])
+        codes = np.round((np.clip(vectors, low, high) - low) / (high - low) * 255)
+        return (codes / 255 * (high - low) + low).astype(np.float32)
+    if profile["quantization"] == "binary":
+        return np.where(vectors > 0, 1.0, -1.0).astype(np.float32)
+    return vectors
+
+def emulate(profile, vectors: np.ndarray, queries: np.ndarray, k: int):
+    """Per-query top-k and latencies for exact search over quantized vectors plus rescoring"""
+    index = quantize(profile, vectors)
+    candidates = int(k * (profile["oversampling"] or 1.0)) if profile["quantization"] else k
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        scores = index @ query
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        if profile["quantization"]:
+            # Rescore the candidates with the original vectors
+            top = top[np.argsort(-(vectors[top] @ query))][:k]
+        else:
+            top = top[np.argsort(-scores[top])][:k]
+        latencies.append(time.perf_counter() - start)
+        results.append(top)
+    return np.array(results), latencies
+
+def run_qdrant(name: str, vectors: np.ndarray, queries: np.ndarray, k: int):
+    """Per-query top-k and latencies from a temporary Qdrant collection"""
+    from qdrant_client import QdrantClient
+    from src.config.settings import QDRANT_HOST, QDRANT_PORT
+    from src.tools.vector_store import QdrantBackend
+
+    client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+    collection = f"benchmark_{name}"
+    client.delete_collection(collection)
+    backend = QdrantBackend(client, collection_name=collection, profile=name)
+    backend.ensure_collection(DIMENSION)
+    ids = [str(uuid.UUID(int=i)) for i in range(len(vectors))]
+    for i in range(0, len(vectors), 1000):
+        backend.upsert(ids[i:i + 1000], vectors[i:i + 1000].tolist(),
+                       [{"row": row} for row in range(i, min(i + 1000, len(vectors)))])
+    # Wait for indexing and quantization to finish
+    while client.get_collection(collection).status != "green":
+        time.sleep(0.5)
+
+    results, latencies = [], []
+    try:
+        for query in queries:
+            start = time.perf_counter()
+            hits = backend.search(query.tolist(), limit=k)
+            latencies.append(time.perf_counter() - start)
+            results.append([payload["row"] for _, payload, _ in hits])
+    finally:
+        client.delete_collection(collection)
+    return results, latencies
+
+def recall(found, truth) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--points", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--chunk-chars", type=int, default=1000, help="chunk text size for payload estimates")
+    parser.add_argument("--qdrant", action="store_true", help="search a real Qdrant server instead of emulating")
+    args = parser.parse_args()
+
+    vectors, queries = make_data(args.points, args.queries)
+    truth = exact_top_k(vectors, queries, args.k)
+    payload = {"text": "x" * args.chunk_chars,
+               "metadata": {"source": "data/documents/report.pdf", "page": 12, "producer": "PDF library",
+                            "creator": "Word processor", "creationdate": "2024-01-01T00:00:00+00:00",
+                            "total_pages": 40, "page_label": "13"}}
+
+    print(f"{args.points} points, {args.queries} queries, recall@{args.k}, "
+          f"{'Qdrant server' if args.qdrant else 'emulated'} search")
+    print(f"{'profile':<10}{'RAM GB/1M':>11}{'on disk GB/1M':>15}{f'recall@{args.k}':>11}{'p50 ms':>9}{'p99 ms':>9}")
+    for name, profile in STORAGE_PROFILES.items():
+        stored = slim_payload(payload) if profile["slim_payload"] else payload
+        size = estimate_bytes_per_chunk(profile, DIMENSION, len(json.dumps(stored)))
+        if args.qdrant:
+            found, latencies = run_qdrant(name, vectors, queries, args.k)
+        else:
+            found, latencies = emulate(profile, vectors, queries, args.k)
+        print(f"{name:<10}{size['ram'] * 1e6 / 1e9:>11.2f}{size['disk'] * 1e6 / 1e9:>15.2f}"
+              f"{recall(found, truth):>11.3f}{percentile(latencies, 50) * 1000:>9.2f}"
+              f"{percentile(latencies, 99) * 1000:>9.2f}")
+    print("Slim-payload profiles keep the chunk text in the local chunk store instead "
+          f"({args.chunk_chars * 1e6 / 1e9:.2f} GB/1M chunks before compression).")
+
+if __name__ == "__main__":
+    main()
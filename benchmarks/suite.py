@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Reproducible offline benchmark suite.
+
+Gemini (chat and embeddings), Qdrant and OpenWeatherMap are replaced by the
+deterministic fakes in benchmarks/fakes.py, with seeded latency and jitter,
+so results depend only on this code and the chosen configuration. Scenarios:
+
+    ingestion        synthetic Markdown/text corpus through IngestionPipeline
+    single_query     sequential WorkflowGraph.run latency (p50/p95/p99)
+    concurrent_load  WorkflowGraph.arun under a concurrency limit
+    cache_hits       repeated queries served by the response, embedding and weather caches
+    conversation     one long WorkflowGraph conversation: per-turn latency, history and checkpoint sizes
+    startup          cold-process import and WorkflowGraph() time, and heavy SDKs loaded eagerly
+
+Results are written as JSON and can be compared against an earlier run; the
+exit status is 1 when a metric regresses by more than the tolerance:
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --baseline results.json --tolerance 0.1
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks.fakes import fake_backends
+from src.graphs.workflow import WorkflowGraph
+from src.tools.clients import shared_client
+from src.tools.context_packer import estimate_tokens
+from src.tools.ingestion import IngestionPipeline
+from src.tools.tracing import percentile, tracer
+from src.tools.vector_store import VectorStore
+
+SCENARIOS = ("ingestion", "single_query", "concurrent_load", "cache_hits", "conversation", "startup")
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CITIES = ["London", "Paris", "Tokyo", "Berlin", "Madrid", "Rome", "Oslo", "Cairo", "Lima", "Seoul"]
+TOPICS = ["retrieval", "embeddings", "routing", "caching", "chunking", "weather", "latency", "indexing"]
+WORDS = ("the system stores vectors and answers questions about documents using a language model "
+         "with context from search results ranked by similarity").split()
+# Metrics where a larger value is an improvement; every other metric is a duration or a count
+HIGHER_IS_BETTER = ("per_second", "hit_rate")
+# Millisecond metrics changing by less than this are noise, whatever the relative change
+MIN_DELTA_MS = 1.0
+# SDKs that should only be imported by the code paths using them
+HEAVY_MODULES = ("langgraph", "qdrant_client", "langchain_google_genai", "langsmith")
+STARTUP_CODE = """
+import json, sys, time
+start = time.perf_counter()
+from src.graphs.workflow import WorkflowGraph
+imported = time.perf_counter()
+WorkflowGraph()
+created = time.perf_counter()
+print(json.dumps({"import": imported - start, "init": created - imported,
+                  "heavy": [m for m in %r if m in sys.modules]}))
+"""
+
+def write_corpus(directory: str, files: int, paragraphs: int, seed: int) -> List[str]:
+    """Synthetic Markdown and text files about a handful of topics"""
+    rng = random.Random(seed)
+    paths = []
+    for i in range(files):
+        topic = TOPICS[i % len(TOPICS)]
+        sections = []
+        for p in range(paragraphs):
+            sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120)))
+            sections.append(f"## {topic.title()} {p}\n\n{topic} {sentence}.")
+        extension = ".md" if i % 2 else ".txt"
+        path = os.path.join(directory, f"doc_{i:04d}{extension}")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# Notes on {topic}\n\n" + "\n\n".join(sections))
+        paths.append(path)
+    return paths
+
+def make_queries(count: int) -> List[str]:
+    """Alternating document and weather questions; weather questions cycle through CITIES"""
+    queries = []
+    for i in range(count):
+        if i % 2:
+            queries.append(f"What's the weather in {CITIES[i % len(CITIES)]}?")
+        else:
+            queries.append(f"Question {i}: what do the notes say about {TOPICS[i % len(TOPICS)]}?")
+    return queries
+
+def latency_metrics(latencies: List[float]) -> Dict[str, float]:
+    return {"p50_ms": percentile(latencies, 50) * 1000, "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+            "mean_ms": sum(latencies) / len(latencies) * 1000}
+
+def stage_metrics() -> Dict[str, Dict]:
+    """Per-span percentiles recorded by the tracer since the last reset, in milliseconds"""
+    return {name: {"count": stats["count"], "p50_ms": stats["p50"] * 1000, "p95_ms": stats["p95"] * 1000,
+                   "p99_ms": stats["p99"] * 1000}
+            for name, stats in tracer.summary().items()}
+
+def ingest(paths: List[str], args) -> Dict:
+    vector_store = shared_client(VectorStore)
+    pipeline = IngestionPipeline(vector_store, parse_workers=args.parse_workers, use_processes=False)
+    return pipeline.run(paths)
+
+def new_workflow() -> WorkflowGraph:
+    workflow = WorkflowGraph()
+    # The fakes have no quota; keep the free-tier limiter from shaping the results
+    workflow.weather_api.rate_limit_per_minute = 10 ** 9
+    return workflow
+
+def run_ingestion(args, corpus: List[str]) -> Dict:
+    stats = ingest(corpus, args)
+    total_bytes = sum(os.path.getsize(path) for path in corpus)
+    return {"metrics": {"wall_seconds": stats["wall_seconds"],
+                        "files_per_second": stats["files_done"] / stats["wall_seconds"],
+                        "chunks_per_second": stats["chunks"] / stats["wall_seconds"],
+                        "mb_per_second": total_bytes / 1e6 / stats["wall_seconds"]},
+            "info": {"files": stats["files_done"], "chunks": stats["chunks"], "bytes": total_bytes,
+                     "failed": stats["files_failed"]}}
+
+def run_single_query(args, corpus: List[str]) -> Dict:
+    ingest(corpus, args)
+    workflow = new_workflow()
+    tracer.reset()
+    latencies = []
+    for query in make_queries(args.queries):
+        start = time.perf_counter()
+        workflow.run(query)
+        latencies.append(time.perf_counter() - start)
+    return {"metrics": latency_metrics(latencies), "info": {"queries": len(latencies)}}
+
+def run_concurrent_load(args, corpus: List[str]) -> Dict:
+    ingest(corpus, args)
+    workflow = new_workflow()
+    tracer.reset()
+
+    async def load():
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies = []
+
+        async def one(query):
+            async with semaphore:
+                start = time.perf_counter()
+                await workflow.arun(query)
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[one(query) for query in make_queries(args.load_queries)])
+        return time.perf_counter() - start, latencies
+
+    elapsed, latencies = asyncio.run(load())
+    metrics = latency_metrics(latencies)
+    metrics.update(wall_seconds=elapsed, queries_per_second=len(latencies) / elapsed)
+    return {"metrics": metrics, "info": {"queries": len(latencies), "concurrency": args.concurrency}}
+
+def run_cache_hits(args, corpus: List[str]) -> Dict:
+    ingest(corpus, args)
+    workflow = new_workflow()
+    embeddings = workflow.vector_store.embeddings
+    embeddings.stats.update(memory_hits=0, disk_hits=0, misses=0)
+    tracer.reset()
+    queries = make_queries(args.distinct_queries)
+    latencies = []
+    for _ in range(args.repeats):
+        for query in queries:
+            start = time.perf_counter()
+            workflow.run(query)
+            latencies.append(time.perf_counter() - start)
+    weather = workflow.weather_api.stats
+    weather_lookups = weather["hits"] + weather["stale_hits"] + weather["misses"] + weather["coalesced"]
+    metrics = latency_metrics(latencies)
+    metrics.update(response_cache_hit_rate=workflow.response_cache.hit_rate,
+                   embedding_cache_hit_rate=embeddings.hit_rate,
+                   weather_cache_hit_rate=(weather["hits"] + weather["stale_hits"]) / weather_lookups
+                   if weather_lookups else 0.0)
+    return {"metrics": metrics, "info": {"queries": len(latencies), "distinct": len(queries)}}
+
+def run_conversation(args, corpus: List[str]) -> Dict:
+    ingest(corpus, args)
+    workflow = new_workflow()
+    tracer.reset()
+    queries = make_queries(args.turns)
+    latencies, history_tokens = [], []
+    for query in queries:
+        start = time.perf_counter()
+        workflow.run(query, thread_id="benchmark")
+        latencies.append(time.perf_counter() - start)
+        conversation = workflow.conversation("benchmark")
+        history_tokens.append(estimate_tokens(workflow.memory.render(conversation["messages"],
+                                                                     conversation["summary"])))
+    checkpointer = workflow.checkpointer
+    metrics = latency_metrics(latencies)
+    # Sizes at the end of the conversation; they stop growing once the window is full
+    metrics.update(history_tokens=history_tokens[-1], max_history_tokens=max(history_tokens),
+                   checkpoint_blobs=len(checkpointer.blobs),
+                   checkpoints=sum(len(checkpoints) for namespaces in checkpointer.storage.values()
+                                   for checkpoints in namespaces.values()))
+    return {"metrics": metrics, "info": {"turns": len(queries), "window_turns": workflow.memory.window_turns},
+            "stages": stage_metrics()}
+
+def import_profile(module: str, top: int = 10) -> List[Dict]:
+    """Slowest imports (cumulative) of a cold `import module`, from python -X importtime"""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            rows.append({"module": name.strip(), "cumulative_ms": int(cumulative) / 1000})
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return [row for row in rows if row["module"] != module][:top]
+
+def run_startup(args, corpus: List[str]) -> Dict:
+    imports, inits, heavy = [], [], set()
+    for _ in range(args.startup_runs):
+        output = subprocess.run([sys.executable, "-c", STARTUP_CODE % (HEAVY_MODULES,)], cwd=PROJECT_ROOT,
+                                capture_output=True, text=True, check=True).stdout
+        run = json.loads(output.splitlines()[-1])
+        imports.append(run["import"])
+        inits.append(run["init"])
+        heavy.update(run["heavy"])
+    return {"metrics": {"workflow_import_ms": statistics.median(imports) * 1000,
+                        "workflow_init_ms": statistics.median(inits) * 1000,
+                        "heavy_modules_loaded": len(heavy)},
+            "info": {"runs": args.startup_runs, "heavy_modules": sorted(heavy),
+                     "slowest_imports": import_profile("src.graphs.workflow")}}
+
+RUNNERS = {"ingestion": run_ingestion, "single_query": run_single_query,
+           "concurrent_load": run_concurrent_load, "cache_hits": run_cache_hits,
+           "conversation": run_conversation, "startup": run_startup}
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Metrics that got worse than the baseline by more than `tolerance` (a fraction)
+    """
+    regressions = []
+    for name, scenario in results["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name, {}).get("metrics", {})
+        for metric, value in scenario["metrics"].items():
+            old = previous.get(metric)
+            if old is None:
+                continue
+            if old:
+                change = (value - old) / old
+            else:
+                # e.g. heavy_modules_loaded going from 0 to 1
+                change = float("inf") if value > 0 else 0.0
+            higher_is_better = metric.endswith(HIGHER_IS_BETTER)
+            worse = change < -tolerance if higher_is_better else change > tolerance
+            if metric.endswith("_ms") and abs(value - old) < MIN_DELTA_MS:
+                worse = False
+            marker = "REGRESSION" if worse else ""
+            print(f"  {name + '.' + metric:<45}{old:>12.3f}{value:>12.3f}{change * 100:>+9.1f}%  {marker}")
+            if worse:
+                regressions.append(f"{name}.{metric}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--files", type=int, default=40, help="synthetic documents to ingest")
+    parser.add_argument("--paragraphs", type=int, default=20, help="paragraphs per document")
+    parser.add_argument("--parse-workers", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=20, help="sequential queries")
+    parser.add_argument("--load-queries", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--distinct-queries", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=40, help="turns of the conversation scenario")
+    parser.add_argument("--startup-runs", type=int, default=5, help="cold processes timed by the startup scenario")
+    parser.add_argument("--llm-latency", type=float, default=0.3)
+    parser.add_argument("--embed-latency", type=float, default=0.05)
+    parser.add_argument("--search-latency", type=float, default=0.02)
+    parser.add_argument("--weather-latency", type=float, default=0.1)
+    parser.add_argument("--jitter", type=float, default=0.2, help="+/- fraction of each latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="compare against a previous --output file")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative regression")
+    args = parser.parse_args()
+
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "tolerance")}
+    results = {"meta": {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                        "platform": platform.platform(), "config": config},
+               "scenarios": {}}
+
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = write_corpus(directory, args.files, args.paragraphs, args.seed)
+        for name in args.scenarios:
+            print(f"Running {name}...")
+            # Fresh fakes and clients per scenario, so caches never leak between them
+            with fake_backends(llm=args.llm_latency, embed=args.embed_latency, search=args.search_latency,
+                               weather=args.weather_latency, jitter=args.jitter, seed=args.seed):
+                tracer.reset()
+                scenario = RUNNERS[name](args, corpus)
+                scenario["stages"] = stage_metrics()
+            results["scenarios"][name] = scenario
+            for metric, value in scenario["metrics"].items():
+                print(f"  {metric:<28}{value:>12.3f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} (tolerance {args.tolerance:.0%}):")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+        print("No regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Filtered search latency as the number of tenants sharing a collection grows.
+
+Tenants are added to one payload-partitioned collection, each with the same
+number of chunks, and after each step a tenant-filtered search is timed
+against an unfiltered search over every tenant's chunks:
+
+    python benchmarks/tenants.py --tenants 1 10 100 --points-per-tenant 500
+
+With payload indexes the filtered latency stays flat while the unfiltered
+one grows with the collection. By default the local index is used; with
+--qdrant a temporary collection on the Qdrant server at
+QDRANT_HOST:QDRANT_PORT is searched instead.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.local_index import LocalVectorIndex
+from src.tools.tenancy import tenant_where
+
+DIMENSION = 768
+
+def tenant_vectors(tenant: int, points: int) -> np.ndarray:
+    """Unit vectors clustered around a per-tenant centre"""
+    rng = np.random.default_rng(tenant)
+    vectors = rng.normal(size=DIMENSION) + 0.8 * rng.normal(size=(points, DIMENSION))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+def add_tenant(backend, tenant: int, points: int):
+    vectors = tenant_vectors(tenant, points)
+    ids = [str(uuid.UUID(int=tenant * 10 ** 9 + i)) for i in range(points)]
+    for i in range(0, points, 1000):
+        backend.upsert(ids[i:i + 1000], vectors[i:i + 1000].tolist(),
+                       [{"tenant": f"t{tenant}", "metadata": {"source": f"doc{j % 20}.pdf"}}
+                        for j in range(i, min(i + 1000, points))])
+
+def timed(search, queries: np.ndarray):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query.tolist())
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def make_backend(args, tmp_dir: str):
+    if not args.qdrant:
+        # HNSW is disabled so unfiltered searches are exact too
+        return LocalVectorIndex(tmp_dir, hnsw_threshold=0), lambda: None
+    from qdrant_client import QdrantClient
+    from src.config.settings import QDRANT_HOST, QDRANT_PORT
+    from src.tools.vector_store import QdrantBackend
+
+    client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+    backend = QdrantBackend(client, collection_name="benchmark_tenants", partitioned=True)
+    backend.drop_collection()
+    return backend, backend.drop_collection
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tenants", type=int, nargs="+", default=[1, 10, 50, 100])
+    parser.add_argument("--points-per-tenant", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--qdrant", action="store_true", help="search a real Qdrant server instead of the local index")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        backend, cleanup = make_backend(args, tmp_dir)
+        backend.ensure_collection(DIMENSION)
+        queries = tenant_vectors(0, args.queries)
+        where = tenant_where("t0")
+        print(f"{args.points_per_tenant} chunks per tenant, {args.queries} queries, top {args.k}, "
+              f"{'Qdrant server' if args.qdrant else 'local index'}")
+        print(f"{'tenants':>8}{'chunks':>9}{'filtered p50':>14}{'p99 ms':>9}{'unfiltered p50':>16}{'p99 ms':>9}")
+        try:
+            added = 0
+            for count in sorted(args.tenants):
+                for tenant in range(added, count):
+                    add_tenant(backend, tenant, args.points_per_tenant)
+                added = max(added, count)
+                if args.qdrant:
+                    while backend.client.get_collection(backend.collection_name).status != "green":
+                        time.sleep(0.5)
+                filtered = timed(lambda query: backend.search(query, args.k, where=where), queries)
+                unfiltered = timed(lambda query: backend.search(query, args.k), queries)
+                print(f"{added:>8}{added * args.points_per_tenant:>9}"
+                      f"{percentile(filtered, 50) * 1000:>14.2f}{percentile(filtered, 99) * 1000:>9.2f}"
+                      f"{percentile(unfiltered, 50) * 1000:>16.2f}{percentile(unfiltered, 99) * 1000:>9.2f}")
+        finally:
+            cleanup()
+            if not args.qdrant:
+                backend.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Chunking throughput of FastTextSplitter against LangChain's
+RecursiveCharacterTextSplitter on synthetic text:
+
+    python benchmarks/text_splitter.py --megabytes 8
+
+Two text shapes are measured: "lines" (short lines as extracted from most
+PDFs) and "paragraphs" (reflowed text with no line breaks, where chunks are
+merged word by word). Each splitter is timed doing what ingestion needs,
+chunks with their start offsets: LangChain's create_documents with
+add_start_index against split_spans. All splitters use the ingestion
+settings (1000 characters, 200 overlap) and the run fails if the chunks
+differ.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from src.tools.text_splitter import FastTextSplitter, TokenTextSplitter
+
+def make_text(megabytes: float, shape: str, seed: int = 0) -> str:
+    """Sentences of random words, in short lines or in long paragraphs"""
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 10)))
+                  for _ in range(5000)]
+    parts, size = [], 0
+    while size < megabytes * 1_000_000:
+        if shape == "lines":
+            line = " ".join(rng.choices(vocabulary, k=rng.randint(6, 14)))
+            line += "\n\n" if rng.random() < 0.15 else "\n"
+        else:
+            line = " ".join(rng.choices(vocabulary, k=rng.randint(200, 600))) + "\n\n"
+        parts.append(line)
+        size += len(line)
+    return "".join(parts)
+
+def measure(split, text: str, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        split(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=float, default=4.0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    langchain = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200, add_start_index=True)
+    fast = FastTextSplitter(chunk_size=1000, chunk_overlap=200)
+    tokens = TokenTextSplitter(chunk_size=256, chunk_overlap=50)
+    splitters = [
+        ("RecursiveCharacterTextSplitter", lambda text: langchain.create_documents([text])),
+        ("FastTextSplitter", fast.split_spans),
+        ("TokenTextSplitter (256/50)", tokens.split_spans),
+    ]
+
+    print(f"best of {args.repeats}")
+    print(f"{'text':<12}{'splitter':<32}{'seconds':>10}{'MB/s':>10}")
+    for shape in ("lines", "paragraphs"):
+        text = make_text(args.megabytes, shape)
+        if fast.split_text(text) != langchain.split_text(text):
+            sys.exit(f"FastTextSplitter chunks differ from RecursiveCharacterTextSplitter on {shape}")
+        for name, split in splitters:
+            seconds = measure(split, text, args.repeats)
+            print(f"{shape:<12}{name:<32}{seconds:>10.3f}{len(text) / 1e6 / seconds:>10.1f}")
+    print("chunks identical")
+
+if __name__ == "__main__":
+    main()
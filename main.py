@@ -1,24 +1,59 @@
 from src.graphs.workflow import WorkflowGraph
-from src.tools.pdf_loader import PDFLoader
+from src.tools.index_manifest import IndexManifest
+from src.tools.document_loaders import is_supported
+from src.tools.ingestion import IngestionPipeline
+from src.tools.clients import shared_client
+from src.tools.tracing import format_summary, tracer
 from src.tools.vector_store import VectorStore
+from src.tools.tenancy import check_tenant, tenant_path
+from src.config.settings import PARSE_WORKERS, EMBED_WORKERS, INDEX_MANIFEST_PATH
+from typing import Optional
+import argparse
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-def initialize_knowledge_base():
-    """Initialize the knowledge base with PDF documents"""
-    pdf_loader = PDFLoader()
-    vector_store = VectorStore()
+def initialize_knowledge_base(parse_workers: int = PARSE_WORKERS, embed_workers: int = EMBED_WORKERS,
+                              tenant: Optional[str] = None):
+    """Initialize the knowledge base with the documents in data/documents, for a tenant if given"""
+    vector_store = shared_client(VectorStore)
+    # Each tenant has its own manifest, next to the default one
+    manifest = IndexManifest(tenant_path(INDEX_MANIFEST_PATH, check_tenant(tenant)))
+    if vector_store.created_collection or len(vector_store.lexical_index(tenant)) == 0:
+        # The collection or the lexical index is empty, so re-index everything
+        # the manifest records (unchanged chunks come from the embedding cache)
+        manifest.clear()
     
-    # Load PDFs from the documents directory
+    # Load every file with a registered loader (PDF, Markdown, text, HTML, DOCX)
     docs_dir = os.path.join(os.path.dirname(__file__), "data", "documents")
-    for filename in os.listdir(docs_dir):
-        if filename.endswith(".pdf"):
-            pdf_path = os.path.join(docs_dir, filename)
-            chunks = pdf_loader.load_and_split(pdf_path)
-            vector_store.store_documents(chunks)
+    doc_paths = [
+        os.path.join(docs_dir, filename)
+        for filename in sorted(os.listdir(docs_dir))
+        if is_supported(filename)
+    ]
+
+    def report_progress(done: int, total: int, path: str):
+        print(f"   [{done}/{total}] {os.path.basename(path)}")
+
+    pipeline = IngestionPipeline(vector_store, parse_workers=parse_workers,
+                                 embed_workers=embed_workers, manifest=manifest, tenant=tenant)
+    stats = pipeline.run(doc_paths, progress=report_progress)
+
+    print(f"   Ingested {stats['chunks']} new chunks from {stats['files_done']} files "
+          f"({stats['files_skipped']} unchanged, {stats['chunks_deleted']} stale chunks removed) "
+          f"in {stats['wall_seconds']:.2f}s "
+          f"(parse {stats['parse_seconds']:.2f}s, embed+upsert {stats['store_seconds']:.2f}s)")
+    for ext, fmt in sorted(stats["formats"].items()):
+        throughput = fmt["bytes"] / 1e6 / fmt["parse_seconds"] if fmt["parse_seconds"] else 0.0
+        print(f"   {ext}: {fmt['files']} files, {fmt['chunks']} chunks, "
+              f"parsed at {throughput:.2f} MB/s")
+    cache_stats = vector_store.embeddings.stats
+    print(f"   Embedding cache: {cache_stats['memory_hits']} memory hits, "
+          f"{cache_stats['disk_hits']} disk hits, {cache_stats['misses']} misses")
+    for path, error in stats["errors"].items():
+        print(f"   ⚠️  Failed to ingest {os.path.basename(path)}: {error}")
 
 def check_api_keys():
     """Check if required API keys are set"""
@@ -45,7 +80,19 @@ def check_api_keys():
     print("✅ All required API keys found")
     return True
 
+def parse_args():
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="LangGraph agentic pipeline")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_WORKERS,
+                        help="Processes used to parse and split documents")
+    parser.add_argument("--embed-workers", type=int, default=EMBED_WORKERS,
+                        help="Threads used to embed and upsert parsed documents")
+    parser.add_argument("--tenant", default=None,
+                        help="Tenant whose knowledge base is indexed and queried (default: DEFAULT_TENANT)")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
     print("🚀 Starting AI Engineer Assignment - LangGraph Agentic Pipeline")
     print("=" * 60)
     
@@ -56,7 +103,7 @@ def main():
     try:
         # Initialize the knowledge base
         print("\n📚 Initializing knowledge base...")
-        initialize_knowledge_base()
+        initialize_knowledge_base(args.parse_workers, args.embed_workers, args.tenant)
         print("✅ Knowledge base initialized successfully")
         
         # Create workflow instance
@@ -74,9 +121,12 @@ def main():
         
         query = "Tell me about artificial intelligence"
         print(f"\nQuery: {query}")
-        result = workflow.run(query)
+        result = workflow.run(query, tenant=args.tenant)
         print(f"Response: {result['response']}")
         
+        print("\n⏱️  Latency by stage:")
+        print(format_summary(tracer.summary()))
+        
         print(f"\n🎉 Success! The application is working correctly.")
         print("💡 Try running the Streamlit UI: streamlit run src/ui/streamlit_app.py")
         
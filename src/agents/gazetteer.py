@@ -0,0 +1,62 @@
+from typing import Dict, Optional
+import re
+
+# Common city names recognised without an LLM call
+CITIES = [
+    "Abu Dhabi", "Accra", "Addis Ababa", "Adelaide", "Ahmedabad", "Algiers", "Amman",
+    "Amsterdam", "Ankara", "Athens", "Atlanta", "Auckland", "Austin", "Baghdad", "Baku",
+    "Bangalore", "Bangkok", "Barcelona", "Beijing", "Beirut", "Belgrade", "Berlin", "Bogota",
+    "Boston", "Brisbane", "Brussels", "Bucharest", "Budapest", "Buenos Aires", "Cairo",
+    "Calgary", "Cape Town", "Caracas", "Casablanca", "Chennai", "Chicago", "Copenhagen",
+    "Dakar", "Dallas", "Delhi", "Denver", "Detroit", "Dhaka", "Doha", "Dubai", "Dublin",
+    "Edinburgh", "Frankfurt", "Geneva", "Glasgow", "Guangzhou", "Hamburg", "Hanoi",
+    "Havana", "Helsinki", "Ho Chi Minh City", "Hong Kong", "Honolulu", "Houston",
+    "Hyderabad", "Istanbul", "Jakarta", "Jeddah", "Jerusalem", "Johannesburg", "Karachi",
+    "Kathmandu", "Kiev", "Kolkata", "Kuala Lumpur", "Kyiv", "Lagos", "Lahore", "Las Vegas",
+    "Lima", "Lisbon", "London", "Los Angeles", "Lyon", "Madrid", "Manchester", "Manila",
+    "Marseille", "Melbourne", "Mexico City", "Miami", "Milan", "Minneapolis", "Montreal",
+    "Moscow", "Mumbai", "Munich", "Nairobi", "Naples", "New Delhi", "New Orleans",
+    "New York", "Osaka", "Oslo", "Ottawa", "Paris", "Perth", "Philadelphia",
+    "Phoenix", "Portland", "Prague", "Pune", "Quebec", "Reykjavik", "Riga", "Rio de Janeiro",
+    "Riyadh", "Rome", "Rotterdam", "San Diego", "San Francisco", "Santiago", "Sao Paulo",
+    "Seattle", "Seoul", "Shanghai", "Shenzhen", "Singapore", "Sofia", "St Petersburg",
+    "Stockholm", "Sydney", "Taipei", "Tallinn", "Tehran", "Tel Aviv", "Tokyo", "Toronto",
+    "Tunis", "Vancouver", "Venice", "Vienna", "Vilnius", "Warsaw", "Washington",
+    "Wellington", "Zagreb", "Zurich"
+]
+
+_CITY_LOOKUP = {city.lower(): city for city in CITIES}
+# Longest names first so "New York" wins over "York"-style partial matches
+_CITY_PATTERN = re.compile(
+    r"\b(" + "|".join(re.escape(city) for city in sorted(CITIES, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE
+)
+_UNITS = [
+    (re.compile(r"\b(fahrenheit|imperial|°f)\b|\d\s*f\b", re.IGNORECASE), "imperial"),
+    (re.compile(r"\b(kelvin)\b", re.IGNORECASE), "standard"),
+    (re.compile(r"\b(celsius|centigrade|metric|°c)\b", re.IGNORECASE), "metric"),
+]
+_DATE_PATTERN = re.compile(
+    r"\b(today|tonight|tomorrow|now|this (morning|afternoon|evening|week|weekend)|"
+    r"(next |on )?(monday|tuesday|wednesday|thursday|friday|saturday|sunday))\b",
+    re.IGNORECASE
+)
+
+def extract_city(query: str) -> Optional[str]:
+    """
+    Return the canonical name of a known city mentioned in the query
+    """
+    match = _CITY_PATTERN.search(query)
+    return _CITY_LOOKUP[match.group(1).lower()] if match else None
+
+def extract_slots(query: str) -> Dict[str, Optional[str]]:
+    """
+    Extract weather slots (city, units, date) from a query without an LLM
+    """
+    units = next((name for pattern, name in _UNITS if pattern.search(query)), None)
+    date = _DATE_PATTERN.search(query)
+    return {
+        "city": extract_city(query),
+        "units": units,
+        "date": date.group(0).lower() if date else None
+    }
@@ -1,28 +1,274 @@
-from typing import Dict, Tuple
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import Dict, List, Optional, Tuple
+import json
+import re
+import threading
+import time
+from functools import cached_property
 from langchain_core.messages import HumanMessage
-from src.config.settings import GEMINI_MODEL, GOOGLE_API_KEY
+from src.agents.gazetteer import extract_slots
+from src.config.settings import GEMINI_MODEL, GOOGLE_API_KEY, ROUTER_CONFIDENCE_THRESHOLD
+from src.tools.clients import shared_client
+from src.tools.lazy_import import LazyImport
+from src.tools.tracing import token_usage, tracer
+from src.tools.weather_api import TEMPERATURE_UNITS
+
+# Terms that on their own identify a weather query
+WEATHER_TERMS = re.compile(
+    r"\b(weather|forecast|temperature|humidity|humid|precipitation|"
+    r"rain(ing|y)?|snow(ing|y)?|drizzl(e|ing)|thunderstorms?|celsius|fahrenheit)\b",
+    re.IGNORECASE
+)
+# Terms that hint at weather but are common in other questions too
+WEATHER_HINTS = re.compile(
+    r"\b(hot|cold|warm|sunny|cloudy|windy|wind|storm|umbrella|degrees|outside)\b",
+    re.IGNORECASE
+)
+# Terms that explicitly refer to the document collection
+DOCUMENT_TERMS = re.compile(
+    r"\b(documents?|pdfs?|files?|papers?|reports?|manuals?|knowledge base|"
+    r"according to|mentioned|in the text)\b",
+    re.IGNORECASE
+)
+# Openings that continue an earlier turn ("and tomorrow?", "what about Paris?")
+FOLLOW_UP_OPENINGS = re.compile(
+    r"^\W*(and|but|also|what about|how about|what of)\b",
+    re.IGNORECASE
+)
+# Words that refer back to earlier turns when a short query has nothing else to go on
+REFERRING_TERMS = re.compile(
+    r"\b(it|its|that|this|these|those|they|them|their|there|he|she|him|his|her)\b",
+    re.IGNORECASE
+)
+# Queries longer than this are taken to say what they are about
+FOLLOW_UP_MAX_WORDS = 8
+
+# Imported on first use; most queries are routed by the rules without an LLM
+ChatGoogleGenerativeAI = LazyImport("langchain_google_genai", "ChatGoogleGenerativeAI")
+
+EMPTY_SLOTS = {"city": None, "units": None, "date": None}
 
 class RouterAgent:
-    def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(
+    def __init__(self, confidence_threshold: float = ROUTER_CONFIDENCE_THRESHOLD,
+                 structured: bool = True):
+        self.confidence_threshold = confidence_threshold
+        self.structured = structured
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "rules": {"decided": 0, "seconds": 0.0},
+            "llm": {"decided": 0, "seconds": 0.0}
+        }
+
+    @cached_property
+    def llm(self):
+        """Gemini model for the LLM tier, created on first use"""
+        return shared_client(
+            ChatGoogleGenerativeAI,
             model=GEMINI_MODEL,
             google_api_key=GOOGLE_API_KEY,
             temperature=0
         )
 
-    def route_query(self, query: str) -> Tuple[str, str]:
+    def _record(self, tier: str, seconds: float, decided: bool):
+        with self._stats_lock:
+            self.stats[tier]["seconds"] += seconds
+            self.stats[tier]["decided"] += int(decided)
+
+    def rule_route(self, query: str) -> Tuple[str, float]:
         """
-        Determine whether to route to weather or RAG pipeline
+        Classify a query locally with keyword rules.
+
+        Returns the route and a confidence; queries with no weather signal
+        are confidently document queries, whether or not they name the
+        documents, while conflicting or hint-only queries get a low
+        confidence so they are escalated to the LLM.
+        """
+        weather = bool(WEATHER_TERMS.search(query))
+        weather_hint = bool(WEATHER_HINTS.search(query))
+        document = bool(DOCUMENT_TERMS.search(query))
+
+        if not (weather or weather_hint):
+            return "document", 0.95
+        if weather and not document:
+            return "weather", 0.95
+        if weather_hint and not document:
+            return "weather", 0.6
+        return "document", 0.5
+
+    @staticmethod
+    def is_follow_up(query: str) -> bool:
+        """
+        Whether a query seems to lean on earlier turns: it opens like a
+        continuation, or is short and refers back with a pronoun
         """
-        prompt = f"""
+        if FOLLOW_UP_OPENINGS.search(query):
+            return True
+        return len(query.split()) <= FOLLOW_UP_MAX_WORDS and bool(REFERRING_TERMS.search(query))
+
+    def _llm_prompt(self, query: str, history: str = "") -> str:
+        # Follow-up questions ("and tomorrow?") are resolved against the
+        # conversation and rewritten so they can be searched on their own
+        if history:
+            return f"""
+        Determine if the following query is asking about weather or requesting information from documents.
+        For weather queries also extract the city, the units ('metric', 'imperial' or 'standard')
+        and the date the user asks about, using null for anything not mentioned.
+        Also rewrite the query as a standalone question that can be understood without the
+        conversation, replacing references such as "it", "there" or "that" with what they refer to.
+        Conversation so far:
+        {history}
+        
+        Query: {query}
+        
+        Return only JSON: {{"route": "weather" or "document", "query": ..., "city": ..., "units": ..., "date": ...}}
+        """
+        if not self.structured:
+            return f"""
         Determine if the following query is asking about weather or requesting information from documents.
         Query: {query}
         
         Return exactly one word: either 'weather' or 'document'
         """
+        return f"""
+        Determine if the following query is asking about weather or requesting information from documents.
+        For weather queries also extract the city, the units ('metric', 'imperial' or 'standard')
+        and the date the user asks about, using null for anything not mentioned.
+        Query: {query}
         
-        response = self.llm.invoke([HumanMessage(content=prompt)])
-        route = response.content.strip().lower()
+        Return only JSON: {{"route": "weather" or "document", "city": ..., "units": ..., "date": ...}}
+        """
+
+    def _parse_llm_response(self, query: str, content: str,
+                            history: str = "") -> Tuple[str, float, Dict, str]:
+        """
+        Parse a one-word or JSON routing answer into route, confidence, slots
+        and the standalone query (the query itself outside a conversation)
+        """
+        content = content.strip()
+        route, slots, standalone = content.lower(), dict(EMPTY_SLOTS), query
+        if self.structured or history:
+            try:
+                # Tolerate markdown code fences around the JSON
+                parsed = json.loads(re.sub(r"^```(json)?|```$", "", content, flags=re.IGNORECASE).strip())
+                route = str(parsed.get("route", "")).strip().lower()
+                if history and isinstance(parsed.get("query"), str) and parsed["query"].strip():
+                    standalone = parsed["query"].strip()
+                # Keep locally extracted values the LLM left out or gave as anything but text
+                local_slots = extract_slots(standalone)
+                slots = {key: parsed[key].strip() if isinstance(parsed.get(key), str) and parsed[key].strip()
+                         else local_slots[key] for key in EMPTY_SLOTS}
+                # OpenWeatherMap silently answers in Kelvin for unknown units such as "celsius"
+                if slots["units"] is not None and slots["units"] not in TEMPERATURE_UNITS:
+                    slots["units"] = local_slots["units"] or "metric"
+            except (ValueError, AttributeError, TypeError):
+                pass
         
-        return (route, query) if route in ['weather', 'document'] else ('document', query)
+        if route not in ['weather', 'document']:
+            return 'document', 0.5, dict(EMPTY_SLOTS), standalone
+        return route, 1.0, slots if route == 'weather' else dict(EMPTY_SLOTS), standalone
+
+    def llm_route(self, query: str, history: str = "") -> Tuple[str, float, Dict, str]:
+        """
+        Classify a query with the LLM, extracting weather slots in the same
+        call when in structured mode and, within a conversation, rewriting
+        the query into a standalone one
+        """
+        response = self.llm.invoke([HumanMessage(content=self._llm_prompt(query, history))])
+        tracer.annotate(**token_usage(response))
+        return self._parse_llm_response(query, response.content, history)
+
+    async def allm_route(self, query: str, history: str = "") -> Tuple[str, float, Dict, str]:
+        """
+        Async version of llm_route
+        """
+        response = await self.llm.ainvoke([HumanMessage(content=self._llm_prompt(query, history))])
+        tracer.annotate(**token_usage(response))
+        return self._parse_llm_response(query, response.content, history)
+
+    def _rules_decision(self, query: str, history: str = "") -> Optional[Dict]:
+        """
+        Decision of the local rules tier, or None when the LLM must decide
+        """
+        start = time.perf_counter()
+        route, confidence = self.rule_route(query)
+        decided = confidence >= self.confidence_threshold
+        slots = dict(EMPTY_SLOTS)
+        if decided and self.structured and route == "weather":
+            slots = extract_slots(query)
+            decided = slots["city"] is not None
+        # Follow-ups need the LLM to rewrite them, however clear their route,
+        # unless they are weather queries naming a city the gazetteer knows
+        if decided and history and self.is_follow_up(query):
+            decided = route == "weather" and (slots["city"] or extract_slots(query)["city"]) is not None
+        self._record("rules", time.perf_counter() - start, decided)
+        if not decided:
+            return None
+        return {"route": route, "query": query, "confidence": confidence,
+                "tier": "rules", "slots": slots}
+
+    def route(self, query: str, history: str = "") -> Dict:
+        """
+        Route a query, answering confidently-classified queries locally and
+        escalating ambiguous ones to the LLM.
+
+        Returns the route, the query, the confidence, the tier that decided
+        and, in structured mode, the weather slots (city, units, date). A
+        weather query whose city is in the local gazetteer needs no LLM call;
+        otherwise routing and slot extraction share one LLM call. The
+        conversation `history`, if any, sends follow-up questions to the LLM
+        tier, which returns them rewritten as standalone queries to search
+        with; self-contained questions are still decided by the rules.
+        """
+        decision = self._rules_decision(query, history)
+        if decision is not None:
+            return decision
+
+        with tracer.span("llm.route") as span:
+            route, confidence, slots, query = self.llm_route(query, history)
+        self._record("llm", span.duration, True)
+        return {"route": route, "query": query, "confidence": confidence,
+                "tier": "llm", "slots": slots}
+
+    async def aroute(self, query: str, history: str = "") -> Dict:
+        """
+        Async version of route
+        """
+        decision = self._rules_decision(query, history)
+        if decision is not None:
+            return decision
+
+        with tracer.span("llm.route") as span:
+            route, confidence, slots, query = await self.allm_route(query, history)
+        self._record("llm", span.duration, True)
+        return {"route": route, "query": query, "confidence": confidence,
+                "tier": "llm", "slots": slots}
+
+    def route_batch(self, queries: List[str], max_concurrency: int = 8) -> List[Dict]:
+        """
+        Route many queries: rule-decided ones locally, and all ambiguous ones
+        with a single batched LLM call of bounded concurrency
+        """
+        decisions = [self._rules_decision(query) for query in queries]
+        pending = [i for i, decision in enumerate(decisions) if decision is None]
+        if pending:
+            with tracer.span("llm.route", queries=len(pending)) as span:
+                responses = self.llm.batch(
+                    [[HumanMessage(content=self._llm_prompt(queries[i]))] for i in pending],
+                    config={"max_concurrency": max_concurrency}
+                )
+                usages = [token_usage(response) for response in responses]
+                span.set(input_tokens=sum(usage.get("input_tokens", 0) for usage in usages),
+                         output_tokens=sum(usage.get("output_tokens", 0) for usage in usages))
+            per_query = span.duration / len(pending)
+            for i, response in zip(pending, responses):
+                route, confidence, slots, _ = self._parse_llm_response(queries[i], response.content)
+                self._record("llm", per_query, True)
+                decisions[i] = {"route": route, "query": queries[i], "confidence": confidence,
+                                "tier": "llm", "slots": slots}
+        return decisions
+
+    def route_query(self, query: str) -> Tuple[str, str]:
+        """
+        Determine whether to route to weather or RAG pipeline
+        """
+        decision = self.route(query)
+        return decision["route"], decision["query"]
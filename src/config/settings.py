@@ -4,18 +4,100 @@ import os
 # Load environment variables first
 load_dotenv()
 
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 OPENWEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY")
 
 # Vector Store Configuration
 QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.getenv("QDRANT_PORT", 6333))
-COLLECTION_NAME = "knowledge_base"
+COLLECTION_NAME = os.getenv("COLLECTION_NAME", "knowledge_base")
+# Multi-tenancy: "payload" keeps every tenant in COLLECTION_NAME, partitioned by an indexed
+# "tenant" payload field; "collection" gives each tenant its own collection (local index directory)
+TENANCY = os.getenv("TENANCY", "payload")
+DEFAULT_TENANT = os.getenv("DEFAULT_TENANT", "default")  # used when no tenant is given
+# "qdrant" or "local" (in-process memory-mapped index, no server needed)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant")
+LOCAL_INDEX_PATH = os.getenv("LOCAL_INDEX_PATH", os.path.join(PROJECT_ROOT, "data", "local_index"))
+LOCAL_INDEX_HNSW_THRESHOLD = int(os.getenv("LOCAL_INDEX_HNSW_THRESHOLD", 50000))  # needs hnswlib; 0 disables
+# Collection storage profile: default, scalar, binary or compact (see src/tools/storage_profiles.py)
+STORAGE_PROFILE = os.getenv("STORAGE_PROFILE", "default")
+CHUNK_STORE_PATH = os.getenv("CHUNK_STORE_PATH", os.path.join(PROJECT_ROOT, "data", "chunks.sqlite"))  # slim payloads only
+# Retrieval: "dense" (vectors), "hybrid" (BM25 + vectors fused by reciprocal rank) or "lexical" (BM25, no embedding call)
+SEARCH_MODE = os.getenv("SEARCH_MODE", "dense")
+BM25_INDEX_PATH = os.getenv("BM25_INDEX_PATH", os.path.join(PROJECT_ROOT, "data", "bm25_index.npz"))  # "" keeps it in memory
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", 20))  # results fetched from each retriever before fusion
+RRF_K = int(os.getenv("RRF_K", 60))
+# Rewritten on every write to the store so other processes (e.g. main.py re-indexing while the
+# app runs) invalidate answers cached from the old chunks; "" only tracks writes in this process
+STORE_VERSION_PATH = os.getenv("STORE_VERSION_PATH", os.path.join(PROJECT_ROOT, "data", "store_version"))
+
+# Ingestion Configuration
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", 64))
+EMBEDDING_MAX_IN_FLIGHT = int(os.getenv("EMBEDDING_MAX_IN_FLIGHT", 2))
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1))
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", 4))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 8))  # parsed files held in memory
+# PDFs with at least 2 * PDF_PAGES_PER_TASK pages are read in page ranges by this many processes (1 reads sequentially)
+PDF_PAGE_WORKERS = int(os.getenv("PDF_PAGE_WORKERS", 1))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", 50))
+# >0 sizes chunks in estimated tokens instead of 1000 characters with 200 overlap
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", 0))
+CHUNK_TOKEN_OVERLAP = int(os.getenv("CHUNK_TOKEN_OVERLAP", 50))
+INDEX_MANIFEST_PATH = os.getenv("INDEX_MANIFEST_PATH", os.path.join(PROJECT_ROOT, "data", "index_manifest.json"))
+
+# Embedding Cache Configuration (set EMBEDDING_CACHE_PATH="" to disable the disk tier)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 10000))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", os.path.join(PROJECT_ROOT, "data", "cache", "embeddings.sqlite")) or None
+EMBEDDING_CACHE_MAX_BYTES = int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Context Packing: hits below the threshold (dense search only) are dropped and the
+# remaining passages are packed into the token budget
+CONTEXT_SCORE_THRESHOLD = float(os.getenv("CONTEXT_SCORE_THRESHOLD", 0.3))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", 1500))
+
+# Reranking: fetch RERANK_CANDIDATES hits and keep the RERANK_TOP_K best by maximal
+# marginal relevance (RERANK_CANDIDATES=0 disables it)
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", 0))
+RERANK_TOP_K = int(os.getenv("RERANK_TOP_K", 5))
+MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", 0.7))  # 1.0 ranks by relevance only, lower favours diversity
+RERANKER_MODEL = os.getenv("RERANKER_MODEL", "")  # optional local cross-encoder, needs sentence-transformers
+
+# Batch Query Configuration
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", 16))
+
+# Semantic Response Cache Configuration (RESPONSE_CACHE_SIZE=0 disables it)
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", 0.95))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 3600))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 1000))
+
+# Weather API Configuration
+WEATHER_TIMEOUT = float(os.getenv("WEATHER_TIMEOUT", 5))
+WEATHER_POOL_SIZE = int(os.getenv("WEATHER_POOL_SIZE", 10))
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", 600))  # OpenWeatherMap updates about every 10 minutes
+WEATHER_STALE_TTL = float(os.getenv("WEATHER_STALE_TTL", 3600))  # served while a refresh runs
+WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", 1000))
+WEATHER_RATE_LIMIT_PER_MINUTE = int(os.getenv("WEATHER_RATE_LIMIT_PER_MINUTE", 60))  # free tier quota
+
+# Conversation memory for runs given a thread_id: recent turns verbatim plus a rolling summary
+MEMORY_WINDOW_TURNS = int(os.getenv("MEMORY_WINDOW_TURNS", 4))  # user/assistant turns kept verbatim
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", 1000))  # estimated tokens for those turns
+MEMORY_SUMMARY_TOKENS = int(os.getenv("MEMORY_SUMMARY_TOKENS", 300))  # cap on the summary of older turns
+MEMORY_MAX_THREADS = int(os.getenv("MEMORY_MAX_THREADS", 1000))  # conversations kept in memory (LRU)
+
+# Tracing Configuration (works offline; summarize with `python -m src.tools.tracing`)
+TRACE_PATH = os.getenv("TRACE_PATH", "")  # JSONL file receiving every span; "" disables it
+TRACE_MAX_SAMPLES = int(os.getenv("TRACE_MAX_SAMPLES", 10000))  # recent durations kept per span for percentiles
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))  # serves Prometheus metrics on /metrics; 0 disables it
 
 # LangSmith Configuration
 LANGCHAIN_API_KEY = os.getenv("LANGCHAIN_API_KEY")
 LANGCHAIN_PROJECT = "weather_rag_system"
 
+# Router Configuration: rule-based decisions below this confidence go to the LLM
+ROUTER_CONFIDENCE_THRESHOLD = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", 0.9))
+
 # LLM Configuration
 GEMINI_MODEL = "gemini-1.5-flash"  # Updated to current model name
 # EMBEDDING_MODEL = "models/embedding-001"
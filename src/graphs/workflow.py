@@ -1,91 +1,591 @@
-from typing import Dict, TypedDict, Annotated
-from langgraph.graph import StateGraph, END
-from langgraph.graph.message import add_messages
-from langchain_google_genai import ChatGoogleGenerativeAI
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple, TypedDict, Annotated
+from concurrent.futures import Future, ThreadPoolExecutor
+import asyncio
+import threading
+import time
+from functools import cached_property
 from langchain_core.messages import BaseMessage
-from src.config.settings import GEMINI_MODEL, GOOGLE_API_KEY
+from src.config.settings import (
+    GEMINI_MODEL, GOOGLE_API_KEY, BATCH_MAX_CONCURRENCY,
+    CONTEXT_SCORE_THRESHOLD, CONTEXT_TOKEN_BUDGET,
+    RERANK_CANDIDATES, RERANK_TOP_K, MMR_LAMBDA, RERANKER_MODEL,
+    RESPONSE_CACHE_THRESHOLD, RESPONSE_CACHE_TTL, RESPONSE_CACHE_SIZE, METRICS_PORT
+)
+from src.agents.gazetteer import extract_city
 from src.agents.router_agent import RouterAgent
 from src.tools.weather_api import WeatherAPI
+from src.tools.clients import shared_client
+from src.tools.context_packer import ContextPacker
+from src.tools.conversation_memory import ConversationMemory
+from src.tools.lazy_import import LazyImport
+from src.tools.reranker import Reranker
+from src.tools.semantic_cache import SemanticCache
+from src.tools.tenancy import check_tenant
+from src.tools.tracing import token_usage, tracer
 from src.tools.vector_store import VectorStore
 
+# The Gemini SDK dominates import time, so it is loaded when the LLM is first used
+ChatGoogleGenerativeAI = LazyImport("langchain_google_genai", "ChatGoogleGenerativeAI")
+
+def add_messages(left, right):
+    """LangGraph's message reducer, imported on first use"""
+    from langgraph.graph.message import add_messages as merge
+    return merge(left, right)
+
+# Tag on the answer-generation LLM call; only its tokens are streamed to users
+ANSWER_TAG = "answer"
+
 class State(TypedDict):
+    # Recent turns of a conversation (runs with a thread_id); older ones are in summary
     messages: Annotated[list[BaseMessage], add_messages]
-    query: str
+    summary: str  # rolling summary of the turns that left the message window
+    query: str  # as the user typed it
+    search_query: str  # standalone rewrite of a follow-up query, searched instead of it
     route: str
+    slots: Dict[str, Optional[str]]
     response: str
+    context: Optional[Dict]  # context packing stats for generated document answers
+    tenant: Optional[str]  # whose documents are searched; None is the default tenant
 
 class WorkflowGraph:
-    def __init__(self):
-        self.router = RouterAgent()
-        self.weather_api = WeatherAPI()
-        self.vector_store = VectorStore()
-        self.llm = ChatGoogleGenerativeAI(
+    def __init__(self, checkpointer=None):
+        # Clients (router, weather_api, vector_store, llm) are created on first
+        # use, so constructing the workflow imports no SDK and opens no connection
+        self.response_cache = SemanticCache(
+            threshold=RESPONSE_CACHE_THRESHOLD,
+            ttl_seconds=RESPONSE_CACHE_TTL,
+            max_entries=RESPONSE_CACHE_SIZE
+        )
+        self.context_packer = ContextPacker(token_budget=CONTEXT_TOKEN_BUDGET)
+        self.reranker = None
+        if RERANK_CANDIDATES > 0:
+            self.reranker = Reranker(top_k=RERANK_TOP_K, mmr_lambda=MMR_LAMBDA, model_name=RERANKER_MODEL)
+        self.memory = ConversationMemory()
+        # LangGraph checkpointer holding conversations; a BoundedMemorySaver by default
+        self._checkpointer = checkpointer
+        self._graph = None
+        self._conversation_graph = None
+        self._graph_lock = threading.Lock()
+        if METRICS_PORT > 0:
+            try:
+                tracer.serve(METRICS_PORT)
+            except OSError as e:
+                # e.g. another Streamlit worker or main.py already serves metrics on this port
+                print(f"Not serving metrics on port {METRICS_PORT}: {e}")
+
+    @cached_property
+    def router(self) -> RouterAgent:
+        return shared_client(RouterAgent)
+
+    @cached_property
+    def weather_api(self) -> WeatherAPI:
+        return shared_client(WeatherAPI)
+
+    @cached_property
+    def vector_store(self) -> VectorStore:
+        return shared_client(VectorStore)
+
+    @cached_property
+    def llm(self):
+        return shared_client(
+            ChatGoogleGenerativeAI,
             model=GEMINI_MODEL,
             google_api_key=GOOGLE_API_KEY,
             temperature=0
         )
 
-    def process_weather(self, query: str) -> str:
+    def _format_weather(self, weather_data: Optional[Dict], units: str, slots: Dict) -> str:
+        result = self.weather_api.format_weather_data(weather_data, units)
+        date = slots.get("date")
+        if weather_data and date and date not in ("today", "now", "tonight"):
+            result += f"\n        (Showing current conditions; no forecast is available for {date}.)"
+        return result
+
+    @staticmethod
+    def _city_prompt(query: str, history: str = "") -> str:
+        # Within a conversation the city may only be named in earlier turns
+        if history:
+            return f"Conversation so far:\n{history}\n\nExtract just the city name the last query refers to: {query}"
+        return f"Extract just the city name from: {query}"
+
+    def process_weather(self, query: str, slots: Optional[Dict] = None, history: str = "") -> str:
         """Process weather-related queries"""
-        # Extract city from query using LLM
-        city_prompt = f"Extract just the city name from: {query}"
-        city_response = self.llm.invoke([{"role": "user", "content": city_prompt}])
-        city = city_response.content.strip()
+        slots = slots or {}
+        # Use the city extracted while routing, then the local gazetteer,
+        # and only fall back to an LLM call when neither found one
+        city = slots.get("city") or extract_city(query)
+        if not city:
+            city_prompt = self._city_prompt(query, history)
+            with tracer.span("llm.city") as span:
+                city_response = self.llm.invoke([{"role": "user", "content": city_prompt}])
+                span.set(**token_usage(city_response))
+            city = city_response.content.strip()
+        units = slots.get("units") or "metric"
         
         # Get weather data
-        weather_data = self.weather_api.get_weather(city)
-        return self.weather_api.format_weather_data(weather_data)
+        weather_data = self.weather_api.get_weather(city, units)
+        return self._format_weather(weather_data, units, slots)
 
-    def process_document(self, query: str) -> str:
-        """Process document-related queries"""
-        # Search vector store
-        results = self.vector_store.search(query)
+    async def aprocess_weather(self, query: str, slots: Optional[Dict] = None, history: str = "") -> str:
+        """Async version of process_weather"""
+        slots = slots or {}
+        city = slots.get("city") or extract_city(query)
+        if not city:
+            city_prompt = self._city_prompt(query, history)
+            with tracer.span("llm.city") as span:
+                city_response = await self.llm.ainvoke([{"role": "user", "content": city_prompt}])
+                span.set(**token_usage(city_response))
+            city = city_response.content.strip()
+        units = slots.get("units") or "metric"
         
+        weather_data = await self.weather_api.aget_weather(city, units)
+        return self._format_weather(weather_data, units, slots)
+
+    @staticmethod
+    def _document_prompt(query: str, results, history: str = "") -> str:
         # Format context
         context = "\n".join([r["text"] for r in results])
+        conversation = f"""
+        Conversation so far:
+        {history}
+        """ if history else ""
         
-        # Generate response using LLM
-        prompt = f"""
+        return f"""
         Based on the following context, answer the question: {query}
-        
+        {conversation}
         Context:
         {context}
         """
-        response = self.llm.invoke([{"role": "user", "content": prompt}])
-        return response.content
 
-    def create_graph(self) -> StateGraph:
-        """Create the workflow graph"""
+    def _search_options(self, tenant: Optional[str] = None) -> Dict:
+        """
+        Extra search arguments: the tenant if one is given, and with reranking,
+        over-fetched candidates along with their vectors
+        """
+        options = {} if tenant is None else {"tenant": tenant}
+        if self.reranker is not None:
+            options.update(limit=RERANK_CANDIDATES, with_vectors=True)
+        return options
+
+    def _context_prompt(self, query: str, results: List[Dict], timings: Optional[Dict[str, float]] = None,
+                        history: str = "") -> Tuple[str, Dict]:
+        """Rerank and pack search hits into the prompt; returns the prompt and context stats"""
+        timings = dict(timings or {})
+        # Only dense search returns cosine scores; BM25 and fused scores are on other scales
+        dense = self.vector_store.search_mode == "dense"
+        if self.reranker is not None:
+            with tracer.span("rerank", candidates=len(results)):
+                results, rerank_timings = self.reranker.rerank(query, results, normalize_scores=not dense)
+            timings.update(rerank_timings)
+        threshold = CONTEXT_SCORE_THRESHOLD if dense else float("-inf")
+        with tracer.span("pack") as span:
+            passages, stats = self.context_packer.pack(results, score_threshold=threshold)
+            span.set(passages=stats["passages"], tokens=stats["tokens_after"])
+        timings["pack"] = span.duration
+        stats["timings"] = timings
+        return self._document_prompt(query, passages, history), stats
+
+    def process_document(self, query: str, tenant: Optional[str] = None) -> str:
+        """Process document-related queries"""
+        return self._process_document(query, tenant)[0]
+
+    def _process_document(self, query: str, tenant: Optional[str] = None,
+                          history: str = "") -> Tuple[str, Optional[Dict]]:
+        """
+        Answer a document query; also returns context stats (None for cached
+        answers). Within a conversation (`history` given) the answer may
+        depend on earlier turns, so the semantic cache is not used.
+        """
+        timings = {}
+        if self.vector_store.search_mode == "lexical":
+            # Lexical search needs no embedding, so the semantic cache is skipped too
+            with tracer.span("search", mode="lexical") as span:
+                results = self.vector_store.search(query, **self._search_options(tenant))
+                span.set(hits=len(results))
+            timings["search"] = span.duration
+            return self._answer(query, results, timings=timings, history=history)
+
+        # Answer near-identical questions from the semantic cache
+        with tracer.span("embed") as span:
+            query_vector = self.vector_store.embed_query(query)
+        timings["embed"] = span.duration
+        if history:
+            with tracer.span("search", mode=self.vector_store.search_mode) as span:
+                results = self.vector_store.search(query, query_vector=query_vector, **self._search_options(tenant))
+                span.set(hits=len(results))
+            timings["search"] = span.duration
+            return self._answer(query, results, timings=timings, history=history)
+        generation = self.vector_store.generation
+        with tracer.span("response_cache") as span:
+            # Cached answers are only shared within a tenant
+            cached = self.response_cache.lookup(query_vector, generation, namespace=check_tenant(tenant))
+            span.set(cache_hit=cached is not None)
+        if cached is not None:
+            return cached, None
+
+        # Search vector store, reusing the query embedding
+        with tracer.span("search", mode=self.vector_store.search_mode) as span:
+            results = self.vector_store.search(query, query_vector=query_vector, **self._search_options(tenant))
+            span.set(hits=len(results))
+        timings["search"] = span.duration
+        return self._answer(query, results, query_vector, generation, timings, tenant)
+
+    def _answer(self, query: str, results: List[Dict], query_vector: Optional[List[float]] = None,
+                generation: int = 0, timings: Optional[Dict[str, float]] = None,
+                tenant: Optional[str] = None, history: str = "") -> Tuple[str, Dict]:
+        """Generate an answer from retrieved chunks and cache it under the query embedding, if given"""
+        prompt, context = self._context_prompt(query, results, timings, history)
+        with tracer.span("llm.generate") as span:
+            response = self.llm.invoke([{"role": "user", "content": prompt}], config={"tags": [ANSWER_TAG]})
+            span.set(**token_usage(response))
+        context["timings"]["generate"] = span.duration
+        if query_vector is not None:
+            self.response_cache.add(query_vector, response.content, generation, namespace=check_tenant(tenant))
+        return response.content, context
+
+    async def aprocess_document(self, query: str, tenant: Optional[str] = None) -> str:
+        """Async version of process_document"""
+        return (await self._aprocess_document(query, tenant))[0]
+
+    async def _aprocess_document(self, query: str, tenant: Optional[str] = None,
+                                 history: str = "") -> Tuple[str, Optional[Dict]]:
+        timings = {}
+        query_vector = None
+        generation = 0
+        if self.vector_store.search_mode != "lexical":
+            with tracer.span("embed") as span:
+                query_vector = await self.vector_store.aembed_query(query)
+            timings["embed"] = span.duration
+            generation = self.vector_store.generation
+            if not history:
+                with tracer.span("response_cache") as span:
+                    cached = self.response_cache.lookup(query_vector, generation, namespace=check_tenant(tenant))
+                    span.set(cache_hit=cached is not None)
+                if cached is not None:
+                    return cached, None
+
+        with tracer.span("search", mode=self.vector_store.search_mode) as span:
+            if query_vector is None:
+                results = await self.vector_store.asearch(query, **self._search_options(tenant))
+            else:
+                results = await self.vector_store.asearch(query, query_vector=query_vector,
+                                                          **self._search_options(tenant))
+            span.set(hits=len(results))
+        timings["search"] = span.duration
         
-        # Define node functions
+        if self.reranker is not None:
+            # A cross-encoder is CPU-bound; keep it off the event loop
+            prompt, context = await asyncio.to_thread(self._context_prompt, query, results, timings, history)
+        else:
+            prompt, context = self._context_prompt(query, results, timings, history)
+        with tracer.span("llm.generate") as span:
+            response = await self.llm.ainvoke([{"role": "user", "content": prompt}], config={"tags": [ANSWER_TAG]})
+            span.set(**token_usage(response))
+        context["timings"]["generate"] = span.duration
+        if query_vector is not None and not history:
+            self.response_cache.add(query_vector, response.content, generation, namespace=check_tenant(tenant))
+        return response.content, context
+
+    def _summarize(self, prompt: str) -> str:
+        """Fold turns leaving the conversation window into the summary"""
+        with tracer.span("llm.summarize") as span:
+            response = self.llm.invoke([{"role": "user", "content": prompt}])
+            span.set(**token_usage(response))
+        return response.content
+
+    async def _asummarize(self, prompt: str) -> str:
+        with tracer.span("llm.summarize") as span:
+            response = await self.llm.ainvoke([{"role": "user", "content": prompt}])
+            span.set(**token_usage(response))
+        return response.content
+
+    def _history(self, state: State) -> str:
+        return self.memory.render(state.get("messages") or [], state.get("summary") or "")
+
+    def create_graph(self, checkpointer=None):
+        """
+        Create the workflow graph; with a checkpointer, turns are also recorded
+        in the conversation memory of the run's thread
+        """
+        # langgraph and the runnables are imported here, when the graph is first built
+        from langchain_core.runnables import RunnableLambda
+        from langgraph.graph import StateGraph, END
+
+        # Define node functions; each node has a sync and an async
+        # implementation so the same graph serves invoke and ainvoke
+        def route_update(decision: Dict) -> State:
+            return {"route": decision["route"], "search_query": decision["query"],
+                    "slots": decision.get("slots") or {}}
+
         def route_node(state: State) -> State:
-            query = state["query"]
-            route_result = self.router.route_query(query)
-            return {"route": route_result[0], "query": route_result[1]}
+            history = self._history(state)
+            with tracer.span("node.router") as span:
+                # The history is only passed within a conversation
+                if history:
+                    decision = self.router.route(state["query"], history)
+                else:
+                    decision = self.router.route(state["query"])
+                span.set(route=decision["route"], tier=decision.get("tier"))
+            return route_update(decision)
+
+        async def aroute_node(state: State) -> State:
+            history = self._history(state)
+            with tracer.span("node.router") as span:
+                if history:
+                    decision = await self.router.aroute(state["query"], history)
+                else:
+                    decision = await self.router.aroute(state["query"])
+                span.set(route=decision["route"], tier=decision.get("tier"))
+            return route_update(decision)
 
         def process_node(state: State) -> State:
-            if state["route"] == "weather":
-                result = self.process_weather(state["query"])
-            else:
-                result = self.process_document(state["query"])
-            return {"response": result}
+            with tracer.span("node.processor", route=state["route"]):
+                if state["route"] == "weather":
+                    return {"response": self.process_weather(state["search_query"], state.get("slots"),
+                                                             self._history(state))}
+                result, context = self._process_document(state["search_query"], state.get("tenant"),
+                                                         self._history(state))
+                return {"response": result, "context": context}
+
+        async def aprocess_node(state: State) -> State:
+            with tracer.span("node.processor", route=state["route"]):
+                if state["route"] == "weather":
+                    return {"response": await self.aprocess_weather(state["search_query"], state.get("slots"),
+                                                                    self._history(state))}
+                result, context = await self._aprocess_document(state["search_query"], state.get("tenant"),
+                                                                self._history(state))
+                return {"response": result, "context": context}
+
+        def memory_node(state: State) -> State:
+            with tracer.span("node.memory"):
+                return self.memory.update(state.get("messages") or [], state.get("summary") or "",
+                                          state["query"], state["response"], self._summarize)
+
+        async def amemory_node(state: State) -> State:
+            with tracer.span("node.memory"):
+                return await self.memory.aupdate(state.get("messages") or [], state.get("summary") or "",
+                                                 state["query"], state["response"], self._asummarize)
 
         # Create workflow
         workflow = StateGraph(State)
         
         # Add nodes
-        workflow.add_node("router", route_node)
-        workflow.add_node("processor", process_node)
+        workflow.add_node("router", RunnableLambda(route_node, afunc=aroute_node, name="router"))
+        workflow.add_node("processor", RunnableLambda(process_node, afunc=aprocess_node, name="processor"))
         
         # Add edges
         workflow.add_edge("router", "processor")
-        workflow.add_edge("processor", END)
+        if checkpointer is None:
+            workflow.add_edge("processor", END)
+        else:
+            workflow.add_node("memory", RunnableLambda(memory_node, afunc=amemory_node, name="memory"))
+            workflow.add_edge("processor", "memory")
+            workflow.add_edge("memory", END)
         workflow.set_entry_point("router")
         
-        return workflow.compile()
+        return workflow.compile(checkpointer=checkpointer)
+
+    @property
+    def graph(self):
+        """Compiled workflow graph, built once on first use"""
+        if self._graph is None:
+            with self._graph_lock:
+                if self._graph is None:
+                    self._graph = self.create_graph()
+        return self._graph
+
+    @property
+    def checkpointer(self):
+        """Checkpointer holding the state of each conversation thread"""
+        if self._checkpointer is None:
+            with self._graph_lock:
+                if self._checkpointer is None:
+                    from src.tools.checkpointer import BoundedMemorySaver
+                    self._checkpointer = BoundedMemorySaver()
+        return self._checkpointer
+
+    @property
+    def conversation_graph(self):
+        """Workflow graph that remembers each thread's conversation, built once on first use"""
+        if self._conversation_graph is None:
+            checkpointer = self.checkpointer
+            with self._graph_lock:
+                if self._conversation_graph is None:
+                    self._conversation_graph = self.create_graph(checkpointer)
+        return self._conversation_graph
+
+    def _invocation(self, query: str, tenant: Optional[str], thread_id: Optional[str]) -> Tuple:
+        """Graph, input and config for a run; runs with a thread_id continue that conversation"""
+        state = self._initial_state(query, tenant)
+        if thread_id is None:
+            return self.graph, state, None
+        # Per-turn fields are reset; messages and summary carry over from the checkpoint
+        del state["messages"]
+        state["context"] = None
+        return self.conversation_graph, state, {"configurable": {"thread_id": thread_id}}
+
+    def conversation(self, thread_id: str) -> Dict:
+        """The remembered recent messages and summary of a conversation thread"""
+        values = self.conversation_graph.get_state({"configurable": {"thread_id": thread_id}}).values
+        return {"messages": values.get("messages") or [], "summary": values.get("summary") or ""}
+
+    def clear_conversation(self, thread_id: str):
+        """Forget a conversation thread"""
+        self.checkpointer.delete_thread(thread_id)
+
+    def run(self, query: str, tenant: Optional[str] = None, thread_id: Optional[str] = None) -> Dict:
+        """
+        Run the workflow, answering document queries from the tenant's
+        documents. With a thread_id the query continues that conversation:
+        its recent turns and summary inform routing and the answer.
+        """
+        graph, state, config = self._invocation(query, tenant, thread_id)
+        with tracer.span("workflow") as span:
+            result = graph.invoke(state, config)
+            span.set(route=result.get("route"))
+        return result
 
-    def run(self, query: str) -> Dict:
-        """Run the workflow"""
-        graph = self.create_graph()
-        result = graph.invoke({"query": query, "messages": []})
+    async def arun(self, query: str, tenant: Optional[str] = None, thread_id: Optional[str] = None) -> Dict:
+        """Run the workflow on the event loop without blocking it"""
+        graph, state, config = self._invocation(query, tenant, thread_id)
+        with tracer.span("workflow") as span:
+            result = await graph.ainvoke(state, config)
+            span.set(route=result.get("route"))
         return result
+
+    @staticmethod
+    def _initial_state(query: str, tenant: Optional[str]) -> Dict:
+        """Graph input; the tenant is validated before anything runs"""
+        return {"query": query, "messages": [], "tenant": None if tenant is None else check_tenant(tenant)}
+
+    def run_batch(self, queries: List[str], max_concurrency: int = BATCH_MAX_CONCURRENCY,
+                  tenant: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Answer many queries at once, yielding results in input order.
+
+        Queries are routed together (one batched LLM call for the ambiguous
+        ones), document queries are embedded in one call and searched in one
+        Qdrant request, and answer generation and weather lookups fan out over
+        at most max_concurrency threads. A failing query yields a result with
+        an "error" instead of stopping the batch.
+        """
+        namespace = check_tenant(tenant)
+        decisions = self.router.route_batch(queries, max_concurrency)
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as pool:
+            # Weather lookups start right away and overlap the retrieval below
+            futures = {
+                i: pool.submit(self.process_weather, decision["query"], decision.get("slots"))
+                for i, decision in enumerate(decisions) if decision["route"] == "weather"
+            }
+
+            documents = [i for i, decision in enumerate(decisions) if decision["route"] != "weather"]
+            if documents and self.vector_store.search_mode == "lexical":
+                for i in documents:
+                    futures[i] = pool.submit(self._process_document, decisions[i]["query"], tenant)
+            elif documents:
+                vectors = self.vector_store.embed_queries([decisions[i]["query"] for i in documents])
+                generation = self.vector_store.generation
+                misses = []
+                for i, vector in zip(documents, vectors):
+                    cached = self.response_cache.lookup(vector, generation, namespace=namespace)
+                    if cached is None:
+                        misses.append((i, vector))
+                        continue
+                    futures[i] = Future()
+                    futures[i].set_result((cached, None))
+
+                hits = self.vector_store.search_batch([vector for _, vector in misses],
+                                                      queries=[decisions[i]["query"] for i, _ in misses],
+                                                      **self._search_options(tenant))
+                for (i, vector), results in zip(misses, hits):
+                    futures[i] = pool.submit(self._answer, decisions[i]["query"], results,
+                                             vector, generation, None, tenant)
+
+            for i, decision in enumerate(decisions):
+                result = {"query": decision["query"], "route": decision["route"],
+                          "slots": decision.get("slots") or {}}
+                try:
+                    response = futures[i].result()
+                    if decision["route"] == "weather":
+                        result["response"] = response
+                    else:
+                        result["response"], result["context"] = response
+                except Exception as e:
+                    result["response"] = None
+                    result["error"] = str(e)
+                yield result
+
+    def stream(self, query: str, tenant: Optional[str] = None, thread_id: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Run the workflow, yielding events as they happen:
+        {"type": "node", ...} after each node, {"type": "token", ...} for each
+        answer chunk and a final {"type": "done", "response", "metrics"} with
+        time-to-first-token and tokens/sec
+        """
+        graph, state, config = self._invocation(query, tenant, thread_id)
+        meter = _StreamMeter()
+        for mode, event in graph.stream(state, config, stream_mode=["updates", "messages"]):
+            yield from meter.handle(mode, event)
+        yield meter.done()
+
+    async def astream(self, query: str, tenant: Optional[str] = None,
+                      thread_id: Optional[str] = None) -> AsyncIterator[Dict]:
+        """Async version of stream"""
+        graph, state, config = self._invocation(query, tenant, thread_id)
+        meter = _StreamMeter()
+        async for mode, event in graph.astream(state, config, stream_mode=["updates", "messages"]):
+            for item in meter.handle(mode, event):
+                yield item
+        yield meter.done()
+
+class _StreamMeter:
+    """Turns LangGraph stream events into workflow events and measures them"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.first_token_at = None
+        self.chars = 0
+        self.reported_tokens = 0
+        self.response = ""
+        self.context = None
+
+    def handle(self, mode: str, event) -> List[Dict]:
+        if mode == "updates":
+            events = []
+            for node, update in event.items():
+                if update and "response" in update:
+                    self.response = update["response"]
+                    self.context = update.get("context")
+                events.append({"type": "node", "node": node, "update": update,
+                               "elapsed": time.perf_counter() - self.start})
+            return events
+
+        chunk, metadata = event
+        content = chunk.content if isinstance(chunk.content, str) else ""
+        if ANSWER_TAG not in (metadata.get("tags") or []) or not content:
+            return []
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.chars += len(content)
+        usage = getattr(chunk, "usage_metadata", None)
+        if usage:
+            self.reported_tokens += usage.get("output_tokens", 0)
+        return [{"type": "token", "content": content}]
+
+    def done(self) -> Dict:
+        total = time.perf_counter() - self.start
+        # Prefer token counts reported by the model; otherwise ~4 characters per token
+        tokens = self.reported_tokens or -(-self.chars // 4)
+        ttft = self.first_token_at - self.start if self.first_token_at is not None else None
+        generation = total - ttft if ttft is not None else 0.0
+        return {
+            "type": "done",
+            "response": self.response,
+            "context": self.context,
+            "metrics": {
+                "time_to_first_token": ttft,
+                "total_seconds": total,
+                "tokens": tokens,
+                "tokens_per_sec": tokens / generation if generation > 0 else 0.0
+            }
+        }
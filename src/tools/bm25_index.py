@@ -0,0 +1,172 @@
+from typing import Dict, List, Optional, Tuple
+from collections import Counter
+import os
+import re
+import threading
+import numpy as np
+
+# Words, plus codes joined by - . / or _ (e.g. "XR-200", "v1.2") kept as one token
+TOKEN_PATTERN = re.compile(r"\w+(?:[-./]\w+)*")
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+class BM25Index:
+    """
+    Inverted BM25 index over chunk texts, keyed by point ID.
+
+    Writes go to per-document term counts; on the next search they are
+    compiled into CSR postings (one array slice per term), so scoring a query
+    is a few vectorized adds. save() writes the compiled postings as a
+    compressed .npz file, which is loaded without rebuilding anything.
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        # Term counts per document; loaded lazily from the postings on the first write
+        self._docs: Optional[Dict[str, Counter]] = {}
+        self._compiled = None
+        self._dirty = False
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with np.load(self.path, allow_pickle=False) as data:
+            terms = data["terms"].tolist()
+            self._compiled = {
+                "terms": {term: i for i, term in enumerate(terms)},
+                "term_list": terms,
+                "offsets": data["offsets"],
+                "postings": data["postings"],
+                "tfs": data["tfs"],
+                "doc_ids": data["doc_ids"].tolist(),
+                "doc_lens": data["doc_lens"]
+            }
+        self._docs = None
+
+    def _mutable_docs(self) -> Dict[str, Counter]:
+        """
+        Per-document term counts, rebuilt from the loaded postings if needed
+        """
+        if self._docs is None:
+            compiled = self._compiled
+            docs = {doc_id: Counter() for doc_id in compiled["doc_ids"]}
+            offsets = compiled["offsets"]
+            for i, term in enumerate(compiled["term_list"]):
+                for doc, tf in zip(compiled["postings"][offsets[i]:offsets[i + 1]].tolist(),
+                                   compiled["tfs"][offsets[i]:offsets[i + 1]].tolist()):
+                    docs[compiled["doc_ids"][doc]][term] = tf
+            self._docs = docs
+        return self._docs
+
+    def __len__(self) -> int:
+        with self._lock:
+            if self._docs is None:
+                return len(self._compiled["doc_ids"])
+            return len(self._docs)
+
+    def ids(self) -> List[str]:
+        """IDs of the indexed documents"""
+        with self._lock:
+            if self._docs is None:
+                return list(self._compiled["doc_ids"])
+            return list(self._docs)
+
+    def add(self, ids: List[str], texts: List[str]):
+        """
+        Index texts under point IDs, replacing earlier versions
+        """
+        with self._lock:
+            docs = self._mutable_docs()
+            for doc_id, text in zip(ids, texts):
+                docs[doc_id] = Counter(tokenize(text))
+            self._dirty = True
+
+    def remove(self, ids: List[str]):
+        with self._lock:
+            docs = self._mutable_docs()
+            for doc_id in ids:
+                docs.pop(doc_id, None)
+            self._dirty = True
+
+    def _compile(self):
+        """
+        Build CSR postings from the per-document term counts
+        """
+        doc_ids = list(self._docs)
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        for doc, doc_id in enumerate(doc_ids):
+            for term, tf in self._docs[doc_id].items():
+                postings.setdefault(term, []).append((doc, tf))
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(postings[term]) for term in terms])
+        flat = [entry for term in terms for entry in postings[term]]
+        self._compiled = {
+            "terms": {term: i for i, term in enumerate(terms)},
+            "term_list": terms,
+            "offsets": offsets,
+            "postings": np.array([doc for doc, _ in flat], dtype=np.uint32),
+            "tfs": np.array([min(tf, 65535) for _, tf in flat], dtype=np.uint16),
+            "doc_ids": doc_ids,
+            "doc_lens": np.array([sum(self._docs[doc_id].values()) for doc_id in doc_ids], dtype=np.uint32)
+        }
+        self._dirty = False
+
+    def _current(self) -> Dict:
+        with self._lock:
+            if self._dirty or self._compiled is None:
+                self._compile()
+            return self._compiled
+
+    def search(self, query: str, limit: int) -> List[Tuple[str, float]]:
+        """
+        Top-`limit` (point ID, BM25 score) pairs, best first
+        """
+        compiled = self._current()
+        doc_count = len(compiled["doc_ids"])
+        if doc_count == 0 or limit <= 0:
+            return []
+        doc_lens = compiled["doc_lens"].astype(np.float32)
+        norm = self.k1 * (1 - self.b + self.b * doc_lens / max(doc_lens.mean(), 1.0))
+        scores = np.zeros(doc_count, dtype=np.float32)
+        offsets = compiled["offsets"]
+        for term in set(tokenize(query)):
+            i = compiled["terms"].get(term)
+            if i is None:
+                continue
+            docs = compiled["postings"][offsets[i]:offsets[i + 1]]
+            tfs = compiled["tfs"][offsets[i]:offsets[i + 1]].astype(np.float32)
+            idf = np.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + norm[docs])
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(compiled["doc_ids"][doc], float(scores[doc])) for doc in matched]
+
+    def save(self):
+        """
+        Write the compiled postings to disk atomically
+        """
+        if not self.path:
+            return
+        compiled = self._current()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            terms=np.array(compiled["term_list"], dtype=str),
+            offsets=compiled["offsets"],
+            postings=compiled["postings"],
+            tfs=compiled["tfs"],
+            doc_ids=np.array(compiled["doc_ids"], dtype=str),
+            doc_lens=compiled["doc_lens"]
+        )
+        os.replace(tmp_path, self.path)
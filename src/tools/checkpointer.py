@@ -0,0 +1,62 @@
+from collections import OrderedDict
+import threading
+from langgraph.checkpoint.memory import InMemorySaver
+from src.config.settings import MEMORY_MAX_THREADS
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    In-memory LangGraph checkpointer that keeps only the latest checkpoints
+    of each thread, and at most `max_threads` threads.
+
+    InMemorySaver keeps every checkpoint (several per graph run) together
+    with every version of each channel, so a long conversation keeps growing
+    even when the graph state itself is bounded. Here each save drops the
+    thread's older checkpoints, their pending writes and the channel values
+    only they referenced, and the least recently used threads are deleted
+    beyond `max_threads`.
+    """
+
+    def __init__(self, max_threads: int = MEMORY_MAX_THREADS, keep_checkpoints: int = 2, **kwargs):
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.keep_checkpoints = max(1, keep_checkpoints)
+        self._threads: OrderedDict = OrderedDict()
+        self._prune_lock = threading.Lock()
+
+    def _channel_blobs(self, thread_id: str, checkpoint_ns: str, saved) -> set:
+        """Blob keys of the channel values a stored checkpoint refers to"""
+        checkpoint = self.serde.loads_typed(saved[0])
+        return {(thread_id, checkpoint_ns, channel, version)
+                for channel, version in checkpoint["channel_versions"].items()}
+
+    def _prune(self, thread_id: str, checkpoint_ns: str):
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        # Checkpoint IDs sort in creation order
+        ordered = sorted(checkpoints)
+        stale = ordered[:-self.keep_checkpoints]
+        if not stale:
+            return
+        live = set()
+        for checkpoint_id in ordered[-self.keep_checkpoints:]:
+            live |= self._channel_blobs(thread_id, checkpoint_ns, checkpoints[checkpoint_id])
+        for checkpoint_id in stale:
+            for key in self._channel_blobs(thread_id, checkpoint_ns, checkpoints.pop(checkpoint_id)) - live:
+                self.blobs.pop(key, None)
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        with self._prune_lock:
+            self._prune(thread_id, config["configurable"]["checkpoint_ns"])
+            self._threads[thread_id] = None
+            self._threads.move_to_end(thread_id)
+            while len(self._threads) > self.max_threads:
+                oldest, _ = self._threads.popitem(last=False)
+                super().delete_thread(oldest)
+        return saved
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._prune_lock:
+            self._threads.pop(thread_id, None)
+            super().delete_thread(thread_id)
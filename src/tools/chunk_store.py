@@ -0,0 +1,50 @@
+from typing import Dict, List
+import os
+import sqlite3
+import threading
+import zlib
+
+class ChunkStore:
+    """
+    Chunk text stored outside the vector database, keyed by point ID and
+    compressed with zlib, so collection payloads can stay small
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS chunks (id TEXT PRIMARY KEY, text BLOB NOT NULL)")
+        self._conn.commit()
+
+    def put_many(self, items: Dict[str, str]):
+        if not items:
+            return
+        rows = [(point_id, zlib.compress(text.encode("utf-8"))) for point_id, text in items.items()]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO chunks (id, text) VALUES (?, ?)", rows)
+            self._conn.commit()
+
+    def get_many(self, ids: List[str]) -> Dict[str, str]:
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound parameter limit
+            for i in range(0, len(ids), 500):
+                batch = ids[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                for point_id, blob in self._conn.execute(
+                        f"SELECT id, text FROM chunks WHERE id IN ({placeholders})", batch):
+                    found[point_id] = zlib.decompress(blob).decode("utf-8")
+        return found
+
+    def delete_many(self, ids: List[str]):
+        with self._lock:
+            self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(point_id,) for point_id in ids])
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
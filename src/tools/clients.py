@@ -0,0 +1,61 @@
+from typing import Any, Callable, Dict, Tuple
+import asyncio
+import threading
+import weakref
+
+# Process-wide client instances keyed by factory and constructor arguments
+_clients: Dict[Tuple, Any] = {}
+# Async clients are bound to the event loop they were created on
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, Any]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+# One lock per client, held while its factory runs: a slow factory (the Qdrant client
+# connects on construction) only blocks callers waiting for that same client, and
+# factories may create other shared clients
+_key_locks: Dict[Tuple, threading.Lock] = {}
+
+def shared_client(factory: Callable, *args, **kwargs) -> Any:
+    """
+    Return the process-wide instance created by `factory(*args, **kwargs)`,
+    creating it on first use.
+
+    Clients with identical factory and arguments are shared, so the router,
+    workflow LLM, Qdrant client and weather API are pooled across requests,
+    WorkflowGraph instances and Streamlit reruns.
+    """
+    key = (factory, args, tuple(sorted(kwargs.items())))
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            key_lock = _key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = factory(*args, **kwargs)
+                with _lock:
+                    _clients[key] = client
+    return client
+
+def shared_async_client(factory: Callable, *args, **kwargs) -> Any:
+    """
+    Like shared_client, but one instance per running event loop, since async
+    HTTP clients cannot be used from a loop other than their own
+    """
+    loop = asyncio.get_running_loop()
+    key = (factory, args, tuple(sorted(kwargs.items())))
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+    if client is None:
+        # Only this loop's thread uses its clients, so no other caller can be creating this one
+        client = factory(*args, **kwargs)
+        with _lock:
+            client = clients.setdefault(key, client)
+    return client
+
+def clear_clients():
+    """
+    Drop all shared clients (the next call creates fresh ones)
+    """
+    with _lock:
+        _clients.clear()
+        _async_clients.clear()
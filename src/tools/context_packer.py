@@ -0,0 +1,165 @@
+from typing import Dict, List, Optional, Tuple
+import re
+import threading
+
+# Word 3-grams used to spot near-identical passages
+SHINGLE_SIZE = 3
+# Shortest shared text treated as splitter overlap when chunks have no offsets
+MIN_TEXT_OVERLAP = 20
+
+def estimate_tokens(text: str) -> int:
+    """
+    Fast local token estimate (~4 characters per token for Gemini-style tokenizers)
+    """
+    return -(-len(text) // 4)
+
+def _shingles(text: str) -> set:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {tuple(words)}
+    return {tuple(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+def _text_overlap(left: str, right: str) -> int:
+    """
+    Length of the longest suffix of `left` that is a prefix of `right`
+    """
+    for size in range(min(len(left), len(right)), MIN_TEXT_OVERLAP - 1, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+class ContextPacker:
+    """
+    Turns search hits into the context passages sent to the LLM.
+
+    Hits below `score_threshold` are dropped, adjacent or overlapping chunks
+    from the same page are merged back together, near-identical passages are
+    deduplicated, and the best passages are packed into `token_budget`
+    estimated tokens. Running totals are kept in `stats`.
+    """
+
+    def __init__(self, score_threshold: float = 0.0, token_budget: int = 2000,
+                 dedupe_threshold: float = 0.9):
+        self.score_threshold = score_threshold
+        self.token_budget = token_budget
+        self.dedupe_threshold = dedupe_threshold
+        self._stats_lock = threading.Lock()
+        self.stats = {"queries": 0, "tokens_before": 0, "tokens_after": 0, "tokens_saved": 0}
+
+    @staticmethod
+    def _merge_group(passages: List[Dict]) -> Tuple[List[Dict], int]:
+        """
+        Merge passages from one page whose text is adjacent or overlaps
+        """
+        with_offsets = sorted((p for p in passages if p["start"] is not None), key=lambda p: p["start"])
+        merged, merges = [], 0
+        for passage in with_offsets:
+            last = merged[-1] if merged else None
+            if last is not None and passage["start"] <= last["start"] + len(last["text"]):
+                overlap = last["start"] + len(last["text"]) - passage["start"]
+                last["text"] += passage["text"][overlap:]
+                last["score"] = max(last["score"], passage["score"])
+                merges += 1
+            else:
+                merged.append(passage)
+
+        # Without offsets, fall back to finding the splitter overlap in the text
+        for passage in (p for p in passages if p["start"] is None):
+            for other in merged:
+                if other["start"] is not None:
+                    continue
+                after = _text_overlap(other["text"], passage["text"])
+                before = 0 if after else _text_overlap(passage["text"], other["text"])
+                if after:
+                    other["text"] += passage["text"][after:]
+                elif before:
+                    other["text"] = passage["text"] + other["text"][before:]
+                else:
+                    continue
+                other["score"] = max(other["score"], passage["score"])
+                merges += 1
+                break
+            else:
+                merged.append(passage)
+        return merged, merges
+
+    def _deduplicate(self, passages: List[Dict]) -> Tuple[List[Dict], int]:
+        """
+        Drop passages contained in or nearly identical to a better-scoring one
+        """
+        kept: List[Dict] = []
+        for passage in sorted(passages, key=lambda p: p["score"], reverse=True):
+            shingles = _shingles(passage["text"])
+            duplicate = False
+            for other in kept:
+                if passage["text"] in other["text"]:
+                    duplicate = True
+                    break
+                union = len(shingles | other["shingles"])
+                if union and len(shingles & other["shingles"]) / union >= self.dedupe_threshold:
+                    duplicate = True
+                    break
+            if not duplicate:
+                passage["shingles"] = shingles
+                kept.append(passage)
+        return kept, len(passages) - len(kept)
+
+    def _fit(self, passages: List[Dict]) -> Tuple[List[Dict], int]:
+        """
+        Greedily pack the best passages into the token budget
+        """
+        packed, used = [], 0
+        for passage in passages:
+            tokens = estimate_tokens(passage["text"])
+            if used + tokens <= self.token_budget:
+                packed.append(passage)
+                used += tokens
+            elif not packed:
+                # Always send something: truncate the best passage to the budget
+                packed.append(dict(passage, text=passage["text"][:self.token_budget * 4]))
+                used = estimate_tokens(packed[0]["text"])
+        return packed, len(passages) - len(packed)
+
+    def pack(self, hits: List[Dict], score_threshold: Optional[float] = None) -> Tuple[List[Dict], Dict]:
+        """
+        Pack search hits ({"text", "score", "metadata"}) into context passages,
+        best first. Returns the passages and this query's statistics.
+        """
+        threshold = self.score_threshold if score_threshold is None else score_threshold
+        tokens_before = sum(estimate_tokens(hit["text"]) for hit in hits)
+        kept = [hit for hit in hits if hit["score"] >= threshold]
+
+        groups: Dict[Tuple, List[Dict]] = {}
+        for hit in kept:
+            metadata = hit.get("metadata") or {}
+            key = (metadata.get("source"), metadata.get("page"))
+            groups.setdefault(key, []).append({
+                "text": hit["text"], "score": hit["score"], "metadata": metadata,
+                "start": metadata.get("start_index")
+            })
+        passages, merged = [], 0
+        for group in groups.values():
+            group_passages, group_merges = self._merge_group(group)
+            passages.extend(group_passages)
+            merged += group_merges
+
+        passages, deduplicated = self._deduplicate(passages)
+        passages, over_budget = self._fit(passages)
+        tokens_after = sum(estimate_tokens(p["text"]) for p in passages)
+
+        stats = {
+            "hits": len(hits),
+            "passages": len(passages),
+            "dropped_low_score": len(hits) - len(kept),
+            "merged": merged,
+            "deduplicated": deduplicated,
+            "dropped_over_budget": over_budget,
+            "tokens_before": tokens_before,
+            "tokens_after": tokens_after,
+            "tokens_saved": tokens_before - tokens_after
+        }
+        with self._stats_lock:
+            self.stats["queries"] += 1
+            for key in ("tokens_before", "tokens_after", "tokens_saved"):
+                self.stats[key] += stats[key]
+        return [{"text": p["text"], "score": p["score"], "metadata": p["metadata"]} for p in passages], stats
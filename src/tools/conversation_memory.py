@@ -0,0 +1,107 @@
+from typing import Awaitable, Callable, Dict, List, Tuple
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, RemoveMessage
+from src.config.settings import MEMORY_WINDOW_TURNS, MEMORY_TOKEN_BUDGET, MEMORY_SUMMARY_TOKENS
+from src.tools.context_packer import estimate_tokens
+
+ROLES = {"human": "User", "ai": "Assistant"}
+
+class ConversationMemory:
+    """
+    Bounded conversation history: the last `window_turns` turns verbatim
+    plus a rolling summary of everything older.
+
+    When a new turn pushes the window past `window_turns` turns or
+    `token_budget` estimated tokens, the oldest turns leave it and are folded
+    into the summary with one LLM call that rewrites the previous summary
+    with just those turns. Each turn therefore costs at most one short
+    summarization call, and the history sent with a prompt never exceeds
+    about token_budget + summary_tokens tokens however long the
+    conversation runs.
+    """
+
+    def __init__(self, window_turns: int = MEMORY_WINDOW_TURNS, token_budget: int = MEMORY_TOKEN_BUDGET,
+                 summary_tokens: int = MEMORY_SUMMARY_TOKENS):
+        self.window_turns = max(0, window_turns)
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+
+    @staticmethod
+    def _lines(messages: List[BaseMessage]) -> str:
+        return "\n".join(f"{ROLES.get(message.type, message.type)}: {message.content}" for message in messages)
+
+    def render(self, messages: List[BaseMessage], summary: str) -> str:
+        """
+        Conversation history for a prompt; "" for a new conversation
+        """
+        parts = []
+        if summary:
+            parts.append(f"Summary of earlier conversation: {summary}")
+        if messages:
+            parts.append(self._lines(messages))
+        return "\n".join(parts)
+
+    def window(self, messages: List[BaseMessage], query: str,
+               response: str) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+        """
+        Messages to add for a new turn, and the oldest messages that no
+        longer fit the window
+        """
+        turn = [HumanMessage(content=query), AIMessage(content=response or "")]
+        kept = list(messages) + turn
+        evicted = []
+        # Whole turns leave the window, oldest first
+        while kept and (len(kept) > 2 * self.window_turns
+                        or sum(estimate_tokens(message.content) for message in kept) > self.token_budget):
+            evicted.extend(kept[:2])
+            kept = kept[2:]
+        return turn, evicted
+
+    def summary_prompt(self, summary: str, evicted: List[BaseMessage]) -> str:
+        return f"""
+        Update the running summary of a conversation between a user and an assistant with the new lines.
+        Keep the names, places, documents and facts the user may refer back to.
+        Reply with the updated summary only, in at most {self.summary_tokens * 3 // 4} words.
+
+        Current summary:
+        {summary or "(none)"}
+
+        New lines:
+        {self._lines(evicted)}
+        """
+
+    def _clip(self, summary: str) -> str:
+        """Keep a summary within summary_tokens, cutting at a word boundary"""
+        summary = summary.strip()
+        limit = self.summary_tokens * 4
+        if len(summary) <= limit:
+            return summary
+        return summary[:limit].rsplit(" ", 1)[0] + " ..."
+
+    @staticmethod
+    def _update(turn: List[BaseMessage], evicted: List[BaseMessage], summary: str) -> Dict:
+        # Messages already in the state are removed by ID; ones from this turn are never added
+        removals = [RemoveMessage(id=message.id) for message in evicted if message.id]
+        added = [message for message in turn if not any(message is gone for gone in evicted)]
+        return {"messages": removals + added, "summary": summary}
+
+    def update(self, messages: List[BaseMessage], summary: str, query: str, response: str,
+               summarize: Callable[[str], str]) -> Dict:
+        """
+        State update recording a turn: the new messages, removals for the
+        evicted ones and the summary, extended with `summarize` (prompt ->
+        text) when turns were evicted
+        """
+        turn, evicted = self.window(messages, query, response)
+        if evicted:
+            summary = self._clip(summarize(self.summary_prompt(summary, evicted)))
+        return self._update(turn, evicted, summary)
+
+    async def aupdate(self, messages: List[BaseMessage], summary: str, query: str, response: str,
+                      summarize: Callable[[str], Awaitable[str]]) -> Dict:
+        """
+        Async version of update
+        """
+        turn, evicted = self.window(messages, query, response)
+        if evicted:
+            summary = self._clip(await summarize(self.summary_prompt(summary, evicted)))
+        return self._update(turn, evicted, summary)
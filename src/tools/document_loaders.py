@@ -0,0 +1,151 @@
+from typing import Callable, Dict, Iterable, List, Optional
+from html.parser import HTMLParser
+from xml.etree.ElementTree import iterparse
+import mimetypes
+import os
+import re
+import zipfile
+from langchain.docstore.document import Document
+from src.tools.pdf_loader import PDFLoader
+from src.tools.text_splitter import default_splitter
+
+# format (its first registered extension, e.g. ".md") -> function returning the chunks of a file
+LOADERS: Dict[str, Callable[[str], List[Document]]] = {}
+# extension (lower case, with the dot) -> format
+EXTENSIONS: Dict[str, str] = {}
+# MIME type -> format, for files whose extension is missing or unknown
+MIME_TYPES: Dict[str, str] = {}
+
+# Markdown is split at headings before paragraphs so chunks follow sections
+MARKDOWN_SEPARATORS = ["\n# ", "\n## ", "\n### ", "\n#### ", "\n\n", "\n", " ", ""]
+
+def register_loader(extensions: Iterable[str], loader: Callable[[str], List[Document]],
+                    mime_types: Iterable[str] = ()):
+    """
+    Register `loader` for files with the given extensions and MIME types
+    """
+    extensions = [ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in extensions]
+    LOADERS[extensions[0]] = loader
+    for ext in extensions:
+        EXTENSIONS[ext] = extensions[0]
+    for mime_type in mime_types:
+        MIME_TYPES[mime_type] = extensions[0]
+
+def document_format(path: str, mime_type: Optional[str] = None) -> Optional[str]:
+    """
+    Format used to load `path` (e.g. ".md" for notes.markdown), or None if no loader handles it
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in EXTENSIONS:
+        return EXTENSIONS[ext]
+    mime_type = mime_type or mimetypes.guess_type(path)[0]
+    return MIME_TYPES.get(mime_type)
+
+def is_supported(path: str) -> bool:
+    return document_format(path) is not None
+
+def load_document(path: str, mime_type: Optional[str] = None) -> List[Document]:
+    """
+    Load and split a file with the loader registered for its format
+    """
+    fmt = document_format(path, mime_type)
+    if fmt is None:
+        raise ValueError(f"No document loader registered for {os.path.basename(path)}")
+    return LOADERS[fmt](path)
+
+def split_text(path: str, text: str, separators: Optional[List[str]] = None) -> List[Document]:
+    """
+    Chunk extracted text with the ingestion splitter
+    """
+    return default_splitter(separators).create_documents([text], [{"source": str(path)}])
+
+def read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+def load_text(path: str) -> List[Document]:
+    return split_text(path, read_text(path))
+
+def load_markdown(path: str) -> List[Document]:
+    """
+    Markdown is indexed as written (the markup costs few tokens and keeps
+    offsets valid), split at headings first
+    """
+    return split_text(path, read_text(path), MARKDOWN_SEPARATORS)
+
+class _HTMLText(HTMLParser):
+    """
+    Collects the visible text of an HTML page, with block elements on their own paragraphs
+    """
+    BLOCK_TAGS = {"address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+                  "figcaption", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+                  "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table", "td", "th",
+                  "title", "tr", "ul"}
+    SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n\n")
+
+    def handle_data(self, data):
+        if not self._skipping:
+            self.parts.append(data)
+
+def html_to_text(html: str) -> str:
+    parser = _HTMLText()
+    parser.feed(html)
+    parser.close()
+    text = re.sub(r"[ \t\r\f\v]+", " ", "".join(parser.parts))
+    text = re.sub(r" ?\n ?", "\n", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+def load_html(path: str) -> List[Document]:
+    return split_text(path, html_to_text(read_text(path)))
+
+_WORD = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+def docx_to_text(path: str) -> str:
+    """
+    Paragraph text of a .docx file, streamed from word/document.xml
+    """
+    parts = []
+    with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as xml:
+        for _, element in iterparse(xml, events=("end",)):
+            tag = element.tag
+            if tag == f"{_WORD}t":
+                parts.append(element.text or "")
+            elif tag == f"{_WORD}tab":
+                parts.append("\t")
+            elif tag in (f"{_WORD}br", f"{_WORD}cr"):
+                parts.append("\n")
+            elif tag == f"{_WORD}p":
+                parts.append("\n\n")
+                # Paragraphs are done with; drop them to keep memory flat
+                element.clear()
+    return re.sub(r"\n{3,}", "\n\n", "".join(parts)).strip()
+
+def load_docx(path: str) -> List[Document]:
+    return split_text(path, docx_to_text(path))
+
+def load_pdf(path: str) -> List[Document]:
+    return PDFLoader().load_and_split(path)
+
+register_loader([".pdf"], load_pdf, ["application/pdf"])
+register_loader([".md", ".markdown"], load_markdown, ["text/markdown", "text/x-markdown"])
+register_loader([".txt", ".text"], load_text, ["text/plain"])
+register_loader([".html", ".htm"], load_html, ["text/html", "application/xhtml+xml"])
+register_loader([".docx"], load_docx,
+                ["application/vnd.openxmlformats-officedocument.wordprocessingml.document"])
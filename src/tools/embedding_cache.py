@@ -0,0 +1,287 @@
+from typing import Dict, List, Optional
+from array import array
+from collections import OrderedDict
+import asyncio
+import hashlib
+import inspect
+import os
+import sqlite3
+import threading
+import time
+from src.tools.tracing import tracer
+
+class LRUCache:
+    """
+    Thread-safe in-memory LRU mapping of cache key to vector
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._data.get(key)
+            if vector is not None:
+                self._data.move_to_end(key)
+            return vector
+
+    def put(self, key: str, vector: List[float]):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = vector
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class SQLiteVectorCache:
+    """
+    On-disk vector cache stored as float32 blobs in SQLite.
+
+    When the stored vectors exceed `max_bytes`, the least recently used
+    entries are evicted.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON embeddings(last_access)")
+        self._conn.commit()
+        self.total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]):
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, array("f", vector).tobytes(), now) for key, vector in items.items()]
+        with self._lock:
+            # Bytes of entries being replaced, so the running total stays exact
+            replaced = 0
+            for i in range(0, len(rows), 500):
+                batch = [row[0] for row in rows[i:i + 500]]
+                placeholders = ",".join("?" * len(batch))
+                replaced += self._conn.execute(
+                    f"SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings WHERE key IN ({placeholders})",
+                    batch
+                ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_access) VALUES (?, ?, ?)", rows
+            )
+            self.total_bytes += sum(len(row[1]) for row in rows) - replaced
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """
+        Drop least recently used entries until under the size limit
+        """
+        while self.total_bytes > self.max_bytes:
+            victims = self._conn.execute(
+                "SELECT key, LENGTH(vector) FROM embeddings ORDER BY last_access LIMIT 256"
+            ).fetchall()
+            if not victims:
+                self.total_bytes = 0
+                return
+            freed = 0
+            for key, size in victims:
+                if self.total_bytes - freed <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM embeddings WHERE key = ?", (key,))
+                freed += size
+            self.total_bytes -= freed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class CachedEmbeddings:
+    """
+    Embeddings wrapper with an in-memory LRU tier and an optional on-disk
+    SQLite tier, keyed by model name, embedding kind and text hash.
+
+    Implements LangChain's Embeddings interface (embed_documents, embed_query
+    and their async versions) without subclassing it, since importing
+    langchain_core.embeddings loads langsmith.
+    """
+
+    def __init__(self, embeddings, model: str, max_entries: int = 10000,
+                 disk_path: Optional[str] = None, max_disk_bytes: int = 512 * 1024 * 1024):
+        self.embeddings = embeddings
+        self.model = model
+        self.memory = LRUCache(max_entries)
+        self.disk = SQLiteVectorCache(disk_path, max_disk_bytes) if disk_path else None
+        self._stats_lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    def _key(self, kind: str, text: str) -> str:
+        # Query and document embeddings use different task types, so they are cached separately
+        return hashlib.sha256(f"{self.model}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def _cached(self, kind: str, texts: List[str], disk: bool = True):
+        """
+        Resolve texts from the memory tier and, with `disk`, the disk tier;
+        returns the keys, the vectors found, where each came from and the
+        distinct texts to embed
+        """
+        keys = [self._key(kind, text) for text in texts]
+        vectors: Dict[str, List[float]] = {}
+        source: Dict[str, str] = {}
+        for key in dict.fromkeys(keys):
+            vector = self.memory.get(key)
+            if vector is not None:
+                vectors[key] = vector
+                source[key] = "memory_hits"
+
+        # Embed each distinct missing text once
+        pending = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                pending.setdefault(key, text)
+        if disk:
+            self._from_disk(vectors, source, pending)
+        return keys, vectors, source, pending
+
+    def _from_disk(self, vectors: Dict[str, List[float]], source: Dict[str, str], pending: Dict[str, str]):
+        """
+        Move pending keys found in the disk tier into `vectors`
+        """
+        if not pending or self.disk is None:
+            return
+        for key, vector in self.disk.get_many(list(pending)).items():
+            vectors[key] = vector
+            source[key] = "disk_hits"
+            self.memory.put(key, vector)
+            del pending[key]
+
+    async def _acached(self, kind: str, texts: List[str]):
+        """
+        Async version of _cached; SQLite reads run in a thread, off the event loop
+        """
+        keys, vectors, source, pending = self._cached(kind, texts, disk=False)
+        if pending and self.disk is not None:
+            await asyncio.to_thread(self._from_disk, vectors, source, pending)
+        return keys, vectors, source, pending
+
+    def _complete(self, keys: List[str], vectors: Dict[str, List[float]], source: Dict[str, str],
+                  computed: Dict[str, List[float]], disk: bool = True) -> List[List[float]]:
+        """
+        Store newly computed vectors (in the disk tier too with `disk`),
+        update counters and assemble the result
+        """
+        for key, vector in computed.items():
+            self.memory.put(key, vector)
+            source[key] = "misses"
+        if disk and computed and self.disk is not None:
+            self.disk.put_many(computed)
+        vectors.update(computed)
+
+        with self._stats_lock:
+            for key in keys:
+                self.stats[source[key]] += 1
+        return [vectors[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, vectors, source, pending = self._cached("document", texts)
+        computed = {}
+        if pending:
+            computed = dict(zip(pending, self.embeddings.embed_documents(list(pending.values()))))
+        return self._complete(keys, vectors, source, computed)
+
+    def embed_query(self, text: str) -> List[float]:
+        keys, vectors, source, pending = self._cached("query", [text])
+        tracer.annotate(cache_hit=not pending)
+        computed = {}
+        if pending:
+            with tracer.span("embedding.api", texts=1):
+                computed = {key: self.embeddings.embed_query(text) for key in pending}
+        return self._complete(keys, vectors, source, computed)[0]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed many queries, with one batched call for the misses when the
+        wrapped model accepts a task type for its batch endpoint
+        """
+        keys, vectors, source, pending = self._cached("query", texts)
+        tracer.annotate(cache_hit=not pending)
+        computed = {}
+        if pending:
+            missing = list(pending.values())
+            try:
+                parameters = inspect.signature(self.embeddings.embed_documents).parameters
+            except (TypeError, ValueError):
+                parameters = {}
+            with tracer.span("embedding.api", texts=len(missing)):
+                if "task_type" in parameters:
+                    embedded = self.embeddings.embed_documents(missing, task_type="RETRIEVAL_QUERY")
+                else:
+                    embedded = [self.embeddings.embed_query(text) for text in missing]
+            computed = dict(zip(pending, embedded))
+        return self._complete(keys, vectors, source, computed)
+
+    async def _acomplete(self, keys: List[str], vectors: Dict[str, List[float]], source: Dict[str, str],
+                         computed: Dict[str, List[float]]) -> List[List[float]]:
+        """
+        Async version of _complete; SQLite writes run in a thread, off the event loop
+        """
+        if computed and self.disk is not None:
+            await asyncio.to_thread(self.disk.put_many, computed)
+        return self._complete(keys, vectors, source, computed, disk=False)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, vectors, source, pending = await self._acached("document", texts)
+        computed = {}
+        if pending:
+            computed = dict(zip(pending, await self.embeddings.aembed_documents(list(pending.values()))))
+        return await self._acomplete(keys, vectors, source, computed)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, vectors, source, pending = await self._acached("query", [text])
+        tracer.annotate(cache_hit=not pending)
+        computed = {}
+        if pending:
+            with tracer.span("embedding.api", texts=1):
+                computed = {key: await self.embeddings.aembed_query(text) for key in pending}
+        return (await self._acomplete(keys, vectors, source, computed))[0]
@@ -0,0 +1,88 @@
+from typing import Dict, List, Optional
+import hashlib
+import json
+import os
+import threading
+
+class IndexManifest:
+    """
+    Persisted record of indexed files: content hash, mtime, size and the IDs
+    of the chunks stored for each file. Used to skip unchanged files and to
+    delete only the stale chunks of changed ones.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable index manifest {path}: {e}")
+
+    @staticmethod
+    def file_hash(path: str) -> str:
+        """
+        SHA-256 of a file's contents
+        """
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def check(self, path: str) -> Optional[str]:
+        """
+        Return None if the file is unchanged since it was indexed, otherwise
+        the file's current content hash.
+
+        The mtime and size are compared first so unchanged files are not
+        re-read; a touched file with identical content is still skipped.
+        """
+        stat = os.stat(path)
+        entry = self.entries.get(path)
+        if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            return None
+        sha256 = self.file_hash(path)
+        if entry and entry["sha256"] == sha256:
+            with self._lock:
+                entry["mtime"], entry["size"] = stat.st_mtime, stat.st_size
+            return None
+        return sha256
+
+    def chunk_ids(self, path: str) -> List[str]:
+        entry = self.entries.get(path)
+        return list(entry["chunk_ids"]) if entry else []
+
+    def update(self, path: str, sha256: str, chunk_ids: List[str]):
+        stat = os.stat(path)
+        with self._lock:
+            self.entries[path] = {
+                "sha256": sha256,
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "chunk_ids": list(chunk_ids)
+            }
+
+    def remove(self, path: str):
+        with self._lock:
+            self.entries.pop(path, None)
+
+    def clear(self):
+        with self._lock:
+            self.entries = {}
+
+    def save(self):
+        """
+        Atomically write the manifest to disk
+        """
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,40 @@
+from typing import Any, Optional
+import importlib
+import threading
+
+class LazyImport:
+    """
+    Stand-in for a module, or a name in a module, that is imported on first use.
+
+    Calling it or reading an attribute imports the target, so heavy SDKs
+    (langgraph, qdrant_client, langchain_google_genai) are only loaded by the
+    code paths that need them. Being an ordinary module-level name, it can
+    still be replaced with unittest.mock.patch.
+    """
+
+    def __init__(self, module: str, name: Optional[str] = None):
+        self._module = module
+        self._name = name
+        self._target = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Any:
+        """Import and return the target"""
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    target = importlib.import_module(self._module)
+                    self._target = getattr(target, self._name) if self._name else target
+        return self._target
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        target = f"{self._module}.{self._name}" if self._name else self._module
+        return f"<LazyImport {target}{'' if self._target is None else ' (loaded)'}>"
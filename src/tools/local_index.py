@@ -0,0 +1,425 @@
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import json
+import os
+import re
+import sqlite3
+import threading
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # optional; brute-force search is used without it
+    hnswlib = None
+from src.tools.tenancy import INDEXED_FIELDS, payload_value
+
+# Payload keys usable in `where` conditions; they are inlined into SQL so
+# that the expressions match the indexes
+PAYLOAD_KEY_PATTERN = re.compile(r"[A-Za-z0-9_]+(\.[A-Za-z0-9_]+)*")
+# Field codes of rows without the field, and of condition values no row has
+MISSING = -1
+NO_MATCH = -2
+
+class LocalVectorIndex:
+    """
+    In-process vector backend: float32 vectors in a memory-mapped matrix on
+    disk, with point IDs and payloads in a side SQLite store.
+
+    Vectors are stored normalized, so cosine similarity is a single matrix
+    product over the mapped rows. When hnswlib is installed and the index
+    holds at least `hnsw_threshold` points, searches use an HNSW graph that
+    is built on first use and saved next to the vectors.
+
+    Each row's values of the INDEXED_FIELDS are also kept in memory as
+    integer codes, so a `where` condition on them becomes a row mask without
+    touching SQLite (other fields are looked up through SQLite). A filter
+    matching every point is dropped; a small matching set is scored on its
+    own rows, a large one by masking a full scan or, above the HNSW
+    threshold, by filtering the HNSW search.
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, path: str, hnsw_threshold: int = 50000):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.hnsw_threshold = hnsw_threshold
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._hnsw_path = os.path.join(path, "hnsw.bin")
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(path, "payloads.sqlite"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS points ("
+            "row INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, payload TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        for key in INDEXED_FIELDS:
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS points_{key.replace('.', '_')} ON points ({self._field_sql(key)})"
+            )
+        self._conn.commit()
+        meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        self.dim: Optional[int] = int(meta["dim"]) if "dim" in meta else None
+        # Bumped on every write; tells whether a saved HNSW graph is current
+        self.version = int(meta.get("version", 0))
+        self._hnsw_version = int(meta.get("hnsw_version", -1))
+
+        # SQLite is the source of truth for which rows are live, so vectors
+        # written without a committed payload are ignored after a crash
+        self._ids: Dict[str, int] = {
+            point_id: row for row, point_id in self._conn.execute("SELECT row, id FROM points")
+        }
+        self._count = max(self._ids.values(), default=-1) + 1
+        used = set(self._ids.values())
+        self._free = [row for row in range(self._count) if row not in used]
+        self._vectors: Optional[np.memmap] = None
+        self._live = np.zeros(0, dtype=bool)
+        # Per indexed field: value -> code, and the code of each row
+        self._field_values: Dict[str, Dict] = {key: {} for key in INDEXED_FIELDS}
+        self._field_codes: Dict[str, np.ndarray] = {key: np.zeros(0, dtype=np.int32) for key in INDEXED_FIELDS}
+        self._hnsw = None
+        if self.dim is not None:
+            self._reserve(self._count)
+            self._load_field_codes()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _reserve(self, rows: int):
+        """
+        Map the vector file with room for at least `rows` rows, growing it
+        by doubling
+        """
+        row_bytes = self.dim * 4
+        size = os.path.getsize(self._vectors_path) if os.path.exists(self._vectors_path) else 0
+        capacity = size // row_bytes
+        if self._vectors is not None and capacity >= rows:
+            return
+        if capacity < rows:
+            capacity = max(self.INITIAL_CAPACITY, capacity)
+            while capacity < rows:
+                capacity *= 2
+            with open(self._vectors_path, "ab") as f:
+                f.truncate(capacity * row_bytes)
+        if self._vectors is not None:
+            self._vectors.flush()
+        # Loading is just a mapping; pages are read on demand
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+",
+                                  shape=(capacity, self.dim))
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(self._live)] = self._live[:capacity]
+        if len(self._live) == 0 and self._ids:
+            live[list(self._ids.values())] = True
+        self._live = live
+        for key, old in self._field_codes.items():
+            codes = np.full(capacity, MISSING, dtype=np.int32)
+            codes[:len(old)] = old[:capacity]
+            self._field_codes[key] = codes
+        if self._hnsw is not None:
+            self._hnsw.resize_index(capacity)
+
+    def _code(self, key: str, value) -> int:
+        """
+        Code of an indexed field's value, assigned on first sight
+        """
+        if value is None:
+            return MISSING
+        if isinstance(value, (dict, list)):
+            # As json_extract returns them
+            value = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        values = self._field_values[key]
+        code = values.get(value)
+        if code is None:
+            code = values[value] = len(values)
+        return code
+
+    def _load_field_codes(self):
+        fields = list(self._field_codes)
+        columns = ", ".join(self._field_sql(key) for key in fields)
+        for row, *values in self._conn.execute(f"SELECT row, {columns} FROM points"):
+            for key, value in zip(fields, values):
+                self._field_codes[key][row] = self._code(key, value)
+
+    def _set_meta(self, **values):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(key, str(value)) for key, value in values.items()]
+        )
+
+    def ensure_collection(self, size: int) -> bool:
+        """
+        Create the index for vectors of `size` dimensions; returns True if it
+        did not exist yet
+        """
+        with self._lock:
+            if self.dim is not None:
+                if self.dim != size:
+                    raise ValueError(f"Local index at {self.path} holds {self.dim}-dimensional vectors, not {size}")
+                return False
+            self.dim = size
+            self._set_meta(dim=size)
+            self._conn.commit()
+            self._reserve(self.INITIAL_CAPACITY)
+            return True
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def upsert(self, ids: List[str], vectors: List[List[float]], payloads: List[Dict]):
+        """
+        Insert or overwrite points
+        """
+        if not ids:
+            return
+        matrix = self._normalize(vectors)
+        with self._lock:
+            rows = []
+            for point_id in ids:
+                row = self._ids.get(point_id)
+                if row is None:
+                    if self._free:
+                        row = self._free.pop()
+                    else:
+                        row = self._count
+                        self._count += 1
+                    self._ids[point_id] = row
+                rows.append(row)
+            self._reserve(self._count)
+            self._vectors[rows] = matrix
+            self._vectors.flush()
+            self._live[rows] = True
+            for key, codes in self._field_codes.items():
+                codes[rows] = [self._code(key, payload_value(payload, key)) for payload in payloads]
+            self.version += 1
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO points (row, id, payload) VALUES (?, ?, ?)",
+                [(row, point_id, json.dumps(payload, default=str))
+                 for row, point_id, payload in zip(rows, ids, payloads)]
+            )
+            self._set_meta(version=self.version)
+            self._conn.commit()
+            if self._hnsw is not None:
+                self._hnsw.add_items(matrix, rows)
+
+    def delete(self, ids: List[str]):
+        """
+        Delete points by ID
+        """
+        with self._lock:
+            rows = [self._ids.pop(point_id) for point_id in ids if point_id in self._ids]
+            if not rows:
+                return
+            self._live[rows] = False
+            self._free.extend(rows)
+            self.version += 1
+            self._conn.executemany("DELETE FROM points WHERE row = ?", [(row,) for row in rows])
+            self._set_meta(version=self.version)
+            self._conn.commit()
+            if self._hnsw is not None:
+                for row in rows:
+                    self._hnsw.mark_deleted(row)
+
+    @staticmethod
+    def _field_sql(key: str) -> str:
+        if not PAYLOAD_KEY_PATTERN.fullmatch(key):
+            raise ValueError(f"Invalid payload key: {key!r}")
+        return f"json_extract(payload, '$.{key}')"
+
+    def _where_sql(self, where: Dict) -> Tuple[str, List]:
+        """
+        SQL condition and parameters for a `where` payload condition
+        """
+        clauses, params = [], []
+        for key, expected in where.items():
+            field = self._field_sql(key)
+            allowed = list(expected) if isinstance(expected, (list, tuple)) else [expected]
+            values = [value for value in allowed if value is not None]
+            alternatives = []
+            if values:
+                alternatives.append(f"{field} IN ({','.join('?' * len(values))})")
+                params.extend(values)
+            if len(values) < len(allowed):
+                alternatives.append(f"{field} IS NULL")
+            clauses.append(f"({' OR '.join(alternatives)})" if alternatives else "0")
+        return " AND ".join(clauses) or "1", params
+
+    def _matching_rows(self, where: Dict) -> np.ndarray:
+        condition, params = self._where_sql(where)
+        rows = self._conn.execute(f"SELECT row FROM points WHERE {condition}", params).fetchall()
+        return np.array(sorted(row for row, in rows), dtype=np.int64)
+
+    def _where_mask(self, where: Dict, count: int) -> np.ndarray:
+        """
+        Mask of the live rows among the first `count` that match `where`
+        """
+        mask = self._live[:count].copy()
+        if not all(key in self._field_codes for key in where):
+            # Conditions on other payload fields go through SQLite
+            matching = np.zeros(count, dtype=bool)
+            rows = self._matching_rows(where)
+            matching[rows[rows < count]] = True
+            return mask & matching
+        for key, expected in where.items():
+            allowed = expected if isinstance(expected, (list, tuple)) else [expected]
+            values = self._field_values[key]
+            codes = [MISSING if value is None else values.get(value, NO_MATCH) for value in allowed]
+            mask &= np.isin(self._field_codes[key][:count], codes)
+        return mask
+
+    def delete_where(self, where: Dict):
+        """
+        Delete every point matching a payload condition
+        """
+        condition, params = self._where_sql(where)
+        with self._lock:
+            ids = [point_id for point_id, in self._conn.execute(
+                f"SELECT id FROM points WHERE {condition}", params)]
+            self.delete(ids)
+
+    def drop_collection(self):
+        """
+        Delete every point; the index files are kept and reused
+        """
+        with self._lock:
+            self.delete(list(self._ids))
+
+    def retrieve(self, ids: List[str]) -> Dict[str, Dict]:
+        """
+        Payloads of points by ID
+        """
+        found = {}
+        ids = list(ids)
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                batch = ids[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                for point_id, payload in self._conn.execute(
+                        f"SELECT id, payload FROM points WHERE id IN ({placeholders})", batch):
+                    found[point_id] = json.loads(payload)
+        return found
+
+    def _hnsw_index(self):
+        """
+        HNSW graph over the live rows, loaded from disk when current and
+        otherwise built and saved
+        """
+        if self._hnsw is None:
+            index = hnswlib.Index(space="cosine", dim=self.dim)
+            if self._hnsw_version == self.version and os.path.exists(self._hnsw_path):
+                index.load_index(self._hnsw_path, max_elements=len(self._live))
+            else:
+                index.init_index(max_elements=len(self._live), ef_construction=200, M=16)
+                rows = np.flatnonzero(self._live)
+                index.add_items(self._vectors[rows], rows)
+                index.save_index(self._hnsw_path)
+                self._hnsw_version = self.version
+                self._set_meta(hnsw_version=self.version)
+                self._conn.commit()
+            self._hnsw = index
+        return self._hnsw
+
+    def _top_rows(self, queries: np.ndarray, limit: int,
+                  where: Optional[Dict] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rows and cosine scores of the `limit` best matches for each query,
+        among the points matching `where` if given
+        """
+        empty = np.zeros((len(queries), 0), dtype=np.int64), np.zeros((len(queries), 0))
+        with self._lock:
+            count = self._count
+            live_count = len(self._ids)
+            mask = None
+            if where and live_count:
+                mask = self._where_mask(where, count)
+                matching = int(np.count_nonzero(mask))
+                if matching == live_count:
+                    # Every point matches (e.g. a single tenant), so the filter is a no-op
+                    mask = None
+                live_count = matching
+            k = min(limit, live_count)
+            if k <= 0:
+                return empty
+            if hnswlib is not None and self.hnsw_threshold and live_count >= self.hnsw_threshold:
+                index = self._hnsw_index()
+                index.set_ef(max(64, k))
+                if mask is None:
+                    rows, distances = index.knn_query(queries, k=k)
+                else:
+                    rows, distances = index.knn_query(queries, k=k, filter=lambda row: bool(mask[row]))
+                return rows, 1.0 - distances
+            # Snapshot under the lock; gathering and the product run without it
+            vectors = self._vectors
+            if mask is None:
+                mask = self._live[:count].copy()
+
+        candidates = np.flatnonzero(mask)
+        if 2 * len(candidates) >= count:
+            # Most rows are candidates: one product over all of them, masking the rest
+            scores = queries @ vectors[:count].T
+            scores[:, ~mask] = -np.inf
+            candidates = None
+        else:
+            scores = queries @ vectors[candidates].T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top, top_scores = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+        return (top if candidates is None else candidates[top]), top_scores
+
+    def _points(self, rows, with_vectors: bool = False) -> Dict[int, Tuple]:
+        rows = sorted({int(row) for row in rows})
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound parameter limit
+            for i in range(0, len(rows), 500):
+                batch = rows[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                for row, point_id, payload in self._conn.execute(
+                        f"SELECT row, id, payload FROM points WHERE row IN ({placeholders})", batch):
+                    found[row] = (point_id, json.loads(payload))
+            if with_vectors:
+                for row in found:
+                    found[row] += (self._vectors[row].tolist(),)
+        return found
+
+    def search_batch(self, vectors: List[List[float]], limit: int,
+                     with_vectors: bool = False, where: Optional[Dict] = None) -> List[List[Tuple]]:
+        """
+        Top-`limit` (id, payload, score) hits for each query vector, best
+        first; with_vectors appends each point's (normalized) vector
+        """
+        if not len(vectors):
+            return []
+        rows, scores = self._top_rows(self._normalize(vectors), limit, where)
+        points = self._points(rows.ravel(), with_vectors)
+        # Points deleted while searching are dropped
+        return [
+            [points[int(row)][:2] + (float(score),) + points[int(row)][2:]
+             for row, score in zip(query_rows, query_scores) if int(row) in points]
+            for query_rows, query_scores in zip(rows, scores)
+        ]
+
+    def search(self, vector: List[float], limit: int, with_vectors: bool = False,
+               where: Optional[Dict] = None) -> List[Tuple]:
+        """
+        Top-`limit` (id, payload, score) hits for one query vector, best first
+        """
+        return self.search_batch([vector], limit, with_vectors, where)[0]
+
+    async def asearch(self, vector: List[float], limit: int, with_vectors: bool = False,
+                      where: Optional[Dict] = None) -> List[Tuple]:
+        """
+        Async version of search, run off the event loop
+        """
+        return await asyncio.to_thread(self.search, vector, limit, with_vectors, where)
+
+    def close(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._conn.close()
@@ -1,21 +1,139 @@
-from typing import List
-from langchain_community.document_loaders import PyPDFium2Loader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from typing import Iterator, List, Tuple
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import threading
+import pypdfium2
 from langchain.docstore.document import Document
+from src.config.settings import PDF_PAGE_WORKERS, PDF_PAGES_PER_TASK
+from src.tools.text_splitter import default_splitter
+
+# pdfium is not thread-safe, so every call into it is serialized
+_PDFIUM_LOCK = threading.Lock()
+
+# Joins the unfinished tail of one page to the start of the next
+PAGE_SEPARATOR = "\n\n"
+
+def _page_text(pdf, number: int) -> str:
+    page = pdf[number]
+    text_page = page.get_textpage()
+    try:
+        # Same normalization as LangChain's PyPDFium2Loader (\r\n -> \n)
+        return "\n".join(text_page.get_text_range().splitlines()).strip()
+    finally:
+        text_page.close()
+        page.close()
+
+def read_page_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """
+    Text of pages [start, stop) (runs inside a worker process when parsing in parallel)
+    """
+    with _PDFIUM_LOCK:
+        pdf = pypdfium2.PdfDocument(pdf_path)
+        try:
+            return [_page_text(pdf, number) for number in range(start, min(stop, len(pdf)))]
+        finally:
+            pdf.close()
 
 class PDFLoader:
-    def __init__(self):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            length_function=len
+    def __init__(self, page_workers: int = PDF_PAGE_WORKERS, pages_per_task: int = PDF_PAGES_PER_TASK):
+        # Same chunks as RecursiveCharacterTextSplitter, computed on offsets;
+        # the offsets let retrieval merge overlapping chunks back together
+        self.text_splitter = default_splitter()
+        # With more than one worker, large PDFs are read in page ranges across processes
+        self.page_workers = max(1, page_workers)
+        self.pages_per_task = max(1, pages_per_task)
+
+    def iter_pages(self, pdf_path: str) -> Iterator[Tuple[int, str, int]]:
+        """
+        (page number, text, total pages) for every page, in order.
+
+        Pages are read one at a time, or in ranges of `pages_per_task` by
+        `page_workers` processes with at most `page_workers + 1` ranges in
+        flight, so memory does not grow with the document.
+        """
+        with _PDFIUM_LOCK:
+            pdf = pypdfium2.PdfDocument(pdf_path)
+            total = len(pdf)
+        try:
+            if self.page_workers > 1 and total >= 2 * self.pages_per_task:
+                yield from self._iter_pages_parallel(pdf_path, total)
+                return
+            for number in range(total):
+                with _PDFIUM_LOCK:
+                    text = _page_text(pdf, number)
+                yield number, text, total
+        finally:
+            with _PDFIUM_LOCK:
+                pdf.close()
+
+    def _iter_pages_parallel(self, pdf_path: str, total: int) -> Iterator[Tuple[int, str, int]]:
+        starts = iter(range(0, total, self.pages_per_task))
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=self.page_workers) as pool:
+
+            def submit():
+                start = next(starts, None)
+                if start is not None:
+                    pending.append((start, pool.submit(read_page_range, pdf_path, start,
+                                                       start + self.pages_per_task)))
+
+            for _ in range(self.page_workers + 1):
+                submit()
+            while pending:
+                start, future = pending.popleft()
+                texts = future.result()
+                submit()
+                for offset, text in enumerate(texts):
+                    yield start + offset, text, total
+
+    def iter_chunks(self, pdf_path: str) -> Iterator[Document]:
+        """
+        Yield chunks page by page.
+
+        The last chunk of each page is held back and split again together
+        with the next page, so text running across a page break is chunked
+        as one piece. Each chunk is attributed to the page it starts on, with
+        `start_index` counted from the start of that page.
+        """
+        # The held-back text can itself span page breaks (a chunk built from
+        # short pages), so it keeps the (offset, page, start on that page) of
+        # each page it contains
+        carry, carry_pages = "", []
+        total = 0
+        for number, text, total in self.iter_pages(pdf_path):
+            if not text:
+                continue
+            prefix = carry + PAGE_SEPARATOR if carry else ""
+            combined = prefix + text
+            pages = carry_pages + [(len(prefix), number, 0)]
+            offsets = [offset for offset, _, _ in pages]
+            spans = self.text_splitter.split_spans(combined)
+            for start, end in spans[:-1]:
+                offset, page, page_start = pages[bisect_right(offsets, start) - 1]
+                yield self._document(pdf_path, combined[start:end], page, page_start + start - offset, total)
+            start, end = spans[-1]
+            carry = combined[start:end]
+            # Re-base the pages the new carry overlaps onto its first character
+            first = bisect_right(offsets, start) - 1
+            offset, page, page_start = pages[first]
+            carry_pages = [(0, page, page_start + start - offset)] + [
+                (offset - start, page, page_start) for offset, page, page_start in pages[first + 1:]
+                if offset < end
+            ]
+        if carry:
+            _, page, start = carry_pages[0]
+            yield self._document(pdf_path, carry, page, start, total)
+
+    @staticmethod
+    def _document(pdf_path: str, content: str, page: int, start: int, total: int) -> Document:
+        return Document(
+            page_content=content,
+            metadata={"source": str(pdf_path), "page": page, "total_pages": total, "start_index": start}
         )
 
     def load_and_split(self, pdf_path: str) -> List[Document]:
         """
         Load PDF and split into chunks using PyPDFium2 (Windows compatible)
         """
-        loader = PyPDFium2Loader(pdf_path)
-        pages = loader.load()
-        chunks = self.text_splitter.split_documents(pages)
-        return chunks
+        return list(self.iter_chunks(pdf_path))
@@ -0,0 +1,111 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+import threading
+import time
+import numpy as np
+
+try:
+    from sentence_transformers import CrossEncoder
+except ImportError:  # optional; reranking uses the search scores without it
+    CrossEncoder = None
+
+def maximal_marginal_relevance(relevance: Sequence[float], vectors: Sequence[Optional[Sequence[float]]],
+                               limit: int, lambda_mult: float = 0.7, normalize: bool = False) -> List[int]:
+    """
+    Indices of up to `limit` candidates picked greedily by
+    lambda * relevance - (1 - lambda) * max similarity to those already picked.
+
+    Relevance should be on the cosine scale; pass normalize=True to min-max
+    scale scores that are not (BM25, reciprocal rank). Similarity is the
+    cosine of the candidate vectors; candidates without a vector are never
+    treated as redundant.
+    """
+    count = len(relevance)
+    if count == 0 or limit <= 0:
+        return []
+    relevance = np.asarray(relevance, dtype=np.float32)
+    if normalize:
+        spread = relevance.max() - relevance.min()
+        relevance = (relevance - relevance.min()) / spread if spread > 0 else np.ones(count, dtype=np.float32)
+
+    present = [i for i, vector in enumerate(vectors) if vector is not None]
+    similarity = np.zeros((count, count), dtype=np.float32)
+    if present:
+        matrix = np.asarray([vectors[i] for i in present], dtype=np.float32)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        similarity[np.ix_(present, present)] = matrix @ matrix.T
+
+    selected: List[int] = []
+    redundancy = np.zeros(count, dtype=np.float32)
+    available = np.ones(count, dtype=bool)
+    for _ in range(min(limit, count)):
+        scores = np.where(available, lambda_mult * relevance - (1 - lambda_mult) * redundancy, -np.inf)
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        redundancy = np.maximum(redundancy, similarity[best])
+    return selected
+
+class Reranker:
+    """
+    Second retrieval stage between search and generation.
+
+    Takes an over-fetched candidate list and keeps `top_k` hits. When
+    `model_name` names a cross-encoder (and sentence-transformers is
+    installed) it rescores every (query, passage) pair on the CPU first;
+    maximal marginal relevance then picks relevant but non-redundant
+    passages using the vectors returned with the search hits, so no extra
+    embedding calls are made.
+    """
+
+    def __init__(self, top_k: int = 5, mmr_lambda: float = 0.7, model_name: str = ""):
+        self.top_k = top_k
+        self.mmr_lambda = mmr_lambda
+        self.model_name = model_name
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def _cross_encoder(self):
+        """
+        Cross-encoder loaded on first use, or None when not configured
+        """
+        if not self.model_name:
+            return None
+        with self._model_lock:
+            if self._model is None:
+                if CrossEncoder is None:
+                    print(f"Reranker model {self.model_name} needs sentence-transformers; "
+                          "reranking with search scores only")
+                    self.model_name = ""
+                    return None
+                self._model = CrossEncoder(self.model_name)
+            return self._model
+
+    def rerank(self, query: str, hits: List[Dict],
+               normalize_scores: bool = False) -> Tuple[List[Dict], Dict[str, float]]:
+        """
+        The `top_k` best hits, best first, without their vectors, and the
+        seconds spent in each stage. Set normalize_scores when the hit
+        scores are not cosine similarities.
+        """
+        timings = {}
+        relevance = [hit["score"] for hit in hits]
+        model = self._cross_encoder()
+        if model is not None and hits:
+            start = time.perf_counter()
+            # Single-label cross-encoders return probabilities in [0, 1]
+            relevance = [float(score) for score in model.predict([(query, hit["text"]) for hit in hits])]
+            timings["cross_encoder"] = time.perf_counter() - start
+            normalize_scores = False
+
+        start = time.perf_counter()
+        order = maximal_marginal_relevance(relevance, [hit.get("vector") for hit in hits],
+                                           self.top_k, self.mmr_lambda, normalize_scores)
+        timings["mmr"] = time.perf_counter() - start
+
+        reranked = []
+        for i in order:
+            hit = {key: value for key, value in hits[i].items() if key != "vector"}
+            if model is not None:
+                hit["rerank_score"] = relevance[i]
+            reranked.append(hit)
+        return reranked, timings
@@ -0,0 +1,107 @@
+from typing import Dict, List, Optional
+import threading
+import time
+import numpy as np
+
+class SemanticCache:
+    """
+    Answer cache keyed by query embedding.
+
+    A lookup returns the cached answer of the most similar previous query
+    when its cosine similarity is at least `threshold`. Entries expire after
+    `ttl_seconds`, the least recently used entry is evicted beyond
+    `max_entries`, and the whole cache is dropped when the collection
+    generation changes. Entries added under a namespace (such as a tenant)
+    only answer lookups in the same namespace.
+    """
+
+    def __init__(self, threshold: float = 0.95, ttl_seconds: float = 3600, max_entries: int = 1000):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: List[Dict] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._generation = None
+        self._tick = 0  # recency counter for LRU eviction
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def _drop(self, keep: List[Dict]):
+        self._entries = keep
+        self._matrix = None
+
+    def _prepare(self, generation, now: float):
+        """
+        Apply collection invalidation and TTL expiry
+        """
+        if generation != self._generation:
+            if self._entries:
+                self.stats["invalidations"] += 1
+            self._generation = generation
+            self._drop([])
+        live = [e for e in self._entries if now - e["created_at"] < self.ttl_seconds]
+        if len(live) != len(self._entries):
+            self._drop(live)
+
+    def lookup(self, vector: List[float], generation=None, namespace: Optional[str] = None) -> Optional[str]:
+        """
+        Return a cached answer for a sufficiently similar query, if any
+        """
+        now = time.time()
+        with self._lock:
+            self._prepare(generation, now)
+            if self._entries:
+                if self._matrix is None:
+                    self._matrix = np.stack([e["vector"] for e in self._entries])
+                similarities = self._matrix @ self._normalize(vector)
+                other = np.array([e["namespace"] != namespace for e in self._entries])
+                similarities[other] = -np.inf
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    entry = self._entries[best]
+                    self._tick += 1
+                    entry["last_used"] = self._tick
+                    self.stats["hits"] += 1
+                    return entry["answer"]
+            self.stats["misses"] += 1
+            return None
+
+    def add(self, vector: List[float], answer: str, generation=None, namespace: Optional[str] = None):
+        """
+        Cache an answer for a query embedding
+        """
+        if self.max_entries <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            self._prepare(generation, now)
+            entries = self._entries
+            if len(entries) >= self.max_entries:
+                entries = sorted(entries, key=lambda e: e["last_used"])[len(entries) - self.max_entries + 1:]
+            self._tick += 1
+            entries.append({
+                "vector": self._normalize(vector),
+                "answer": answer,
+                "namespace": namespace,
+                "created_at": now,
+                "last_used": self._tick
+            })
+            self._drop(entries)
+
+    def clear(self):
+        with self._lock:
+            self._drop([])
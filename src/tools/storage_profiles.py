@@ -0,0 +1,124 @@
+from typing import Dict, Optional
+from src.tools.lazy_import import LazyImport
+
+models = LazyImport("qdrant_client.http.models")
+
+# Collection storage profiles. None leaves a setting at Qdrant's default.
+#   quantization:     None, "scalar" (int8, 4x smaller) or "binary" (1 bit per dimension, 32x smaller)
+#   on_disk:          keep original float32 vectors on disk; quantized vectors stay in RAM
+#   on_disk_payload:  keep payloads on disk
+#   hnsw_m, hnsw_ef_construct, hnsw_on_disk: HNSW graph parameters
+#   search_ef:        HNSW beam width at query time
+#   oversampling:     candidates fetched per result before rescoring with the original vectors
+#   slim_payload:     store chunk text in the local chunk store and only source/page/offset in the payload
+STORAGE_PROFILES: Dict[str, Dict] = {
+    "default": {
+        "quantization": None, "on_disk": None, "on_disk_payload": None,
+        "hnsw_m": None, "hnsw_ef_construct": None, "hnsw_on_disk": None,
+        "search_ef": None, "oversampling": None, "slim_payload": False
+    },
+    "scalar": {
+        "quantization": "scalar", "on_disk": True, "on_disk_payload": None,
+        "hnsw_m": None, "hnsw_ef_construct": None, "hnsw_on_disk": None,
+        "search_ef": None, "oversampling": 2.0, "slim_payload": False
+    },
+    "binary": {
+        "quantization": "binary", "on_disk": True, "on_disk_payload": None,
+        "hnsw_m": None, "hnsw_ef_construct": None, "hnsw_on_disk": None,
+        "search_ef": None, "oversampling": 3.0, "slim_payload": False
+    },
+    "compact": {
+        "quantization": "scalar", "on_disk": True, "on_disk_payload": True,
+        "hnsw_m": 8, "hnsw_ef_construct": 64, "hnsw_on_disk": True,
+        "search_ef": 128, "oversampling": 2.0, "slim_payload": True
+    }
+}
+
+# Metadata kept in slim payloads
+SLIM_METADATA_KEYS = ("source", "page", "start_index")
+
+# Qdrant's default number of HNSW links per node
+DEFAULT_HNSW_M = 16
+
+def get_profile(name: str) -> Dict:
+    """
+    Storage profile by name
+    """
+    try:
+        return STORAGE_PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown storage profile: {name} (choose from {', '.join(STORAGE_PROFILES)})")
+
+def collection_config(profile: Dict, size: int) -> Dict:
+    """
+    Keyword arguments for QdrantClient.create_collection under a profile
+    """
+    config = {
+        "vectors_config": models.VectorParams(
+            size=size,
+            distance=models.Distance.COSINE,
+            on_disk=profile["on_disk"]
+        )
+    }
+    if profile["on_disk_payload"] is not None:
+        config["on_disk_payload"] = profile["on_disk_payload"]
+    hnsw = {key: profile[f"hnsw_{key}"] for key in ("m", "ef_construct", "on_disk")
+            if profile[f"hnsw_{key}"] is not None}
+    if hnsw:
+        config["hnsw_config"] = models.HnswConfigDiff(**hnsw)
+    if profile["quantization"] == "scalar":
+        config["quantization_config"] = models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    elif profile["quantization"] == "binary":
+        config["quantization_config"] = models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=True)
+        )
+    return config
+
+def search_params(profile: Dict) -> Optional["models.SearchParams"]:
+    """
+    Query-time parameters for a profile, rescoring quantized candidates
+    with the original vectors
+    """
+    if profile["quantization"] is None and profile["search_ef"] is None:
+        return None
+    quantization = None
+    if profile["quantization"] is not None:
+        quantization = models.QuantizationSearchParams(rescore=True, oversampling=profile["oversampling"])
+    return models.SearchParams(hnsw_ef=profile["search_ef"], quantization=quantization)
+
+def slim_payload(payload: Dict) -> Dict:
+    """
+    Payload without the chunk text and with only the fields needed for filtering
+    """
+    metadata = payload.get("metadata") or {}
+    slim = {"metadata": {key: metadata[key] for key in SLIM_METADATA_KEYS if key in metadata}}
+    if "tenant" in payload:
+        slim["tenant"] = payload["tenant"]
+    return slim
+
+def estimate_bytes_per_chunk(profile: Dict, size: int, payload_bytes: int) -> Dict[str, int]:
+    """
+    Approximate bytes per stored chunk held in RAM and served from disk
+    under a profile
+    """
+    vector = size * 4
+    if profile["quantization"] == "scalar":
+        quantized = size
+    elif profile["quantization"] == "binary":
+        quantized = -(-size // 8)
+    else:
+        quantized = 0
+    # Level-0 HNSW links: 2 * m neighbour IDs of 4 bytes each
+    graph = 2 * (profile["hnsw_m"] or DEFAULT_HNSW_M) * 4
+
+    ram = quantized
+    disk = 0
+    for part, on_disk in ((vector, profile["on_disk"]), (graph, profile["hnsw_on_disk"]),
+                          (payload_bytes, profile["on_disk_payload"])):
+        if on_disk:
+            disk += part
+        else:
+            ram += part
+    return {"ram": ram, "disk": disk}
@@ -0,0 +1,68 @@
+from typing import Any, Dict, Optional
+import os
+import re
+from src.config.settings import COLLECTION_NAME, DEFAULT_TENANT
+
+# Tenant IDs end up in collection names and file paths
+TENANT_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+# Payload fields indexed by every backend, with their index type; filtered
+# searches on them stay fast however many tenants share a collection
+INDEXED_FIELDS = {"tenant": "keyword", "metadata.source": "keyword", "metadata.page": "integer"}
+
+def check_tenant(tenant: Optional[str]) -> str:
+    """
+    Validated tenant ID; None means the default tenant
+    """
+    if tenant is None:
+        return DEFAULT_TENANT
+    if not isinstance(tenant, str) or not TENANT_PATTERN.fullmatch(tenant):
+        raise ValueError(f"Invalid tenant ID {tenant!r}: use 1-64 letters, digits, '-' or '_'")
+    return tenant
+
+def tenant_collection(tenant: str, base: str = COLLECTION_NAME) -> str:
+    """
+    Collection holding a tenant's points when each tenant has its own; the
+    default tenant keeps the base collection
+    """
+    return base if tenant == DEFAULT_TENANT else f"{base}__{tenant}"
+
+def tenant_path(path: str, tenant: str) -> str:
+    """
+    Per-tenant variant of a file or directory path ("data/bm25_index.npz" ->
+    "data/bm25_index.acme.npz"); the default tenant keeps the path unchanged
+    """
+    if not path or tenant == DEFAULT_TENANT:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{tenant}{ext}"
+
+def tenant_where(tenant: str, untagged: bool = True) -> Dict[str, Any]:
+    """
+    Payload condition selecting a tenant's points. Points stored before
+    tenants existed have no tenant field and belong to the default tenant;
+    pass `untagged=False` for a collection that cannot hold any, so the
+    default tenant is matched on its value alone.
+    """
+    return {"tenant": [DEFAULT_TENANT, None] if tenant == DEFAULT_TENANT and untagged else tenant}
+
+def payload_value(payload: Dict, key: str) -> Any:
+    """Value at a dotted payload path such as "metadata.source", or None"""
+    value = payload
+    for part in key.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+def payload_matches(payload: Dict, where: Optional[Dict[str, Any]]) -> bool:
+    """
+    Whether a payload satisfies a `where` condition: every dotted key must
+    equal its value, or one of them when given a list (None matching a
+    missing field)
+    """
+    for key, expected in (where or {}).items():
+        allowed = expected if isinstance(expected, (list, tuple)) else [expected]
+        if payload_value(payload, key) not in allowed:
+            return False
+    return True
@@ -0,0 +1,168 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from operator import sub
+import re
+from langchain.docstore.document import Document
+from src.config.settings import CHUNK_TOKENS, CHUNK_TOKEN_OVERLAP
+from src.tools.context_packer import estimate_tokens
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+class FastTextSplitter:
+    """
+    Drop-in replacement for LangChain's RecursiveCharacterTextSplitter (with
+    its defaults: separators kept at the start of the following piece,
+    whitespace stripped) that produces the same chunks.
+
+    Because separators stay attached to the pieces, every chunk is one
+    contiguous span of the input. The splitter therefore works on
+    (start, end) offsets: separators are located within the span without
+    slicing it, chunk boundaries are found by bisecting running piece lengths, and
+    a string is only sliced out once per finished chunk. The offsets are exact, so start_index needs no
+    searching.
+    """
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200,
+                 separators: Optional[List[str]] = None,
+                 length_function: Optional[Callable[[str], int]] = None):
+        if chunk_overlap > chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) is larger than chunk_size ({chunk_size})")
+        self._chunk_size = chunk_size
+        self._chunk_overlap = chunk_overlap
+        self._separators = separators or DEFAULT_SEPARATORS
+        # None measures characters, which needs no slicing
+        self._length_function = length_function
+        self._patterns = {}
+
+    def _boundaries(self, text: str, start: int, end: int, separator: str) -> List[int]:
+        """
+        Offsets splitting text[start:end] before each occurrence of separator:
+        piece i is text[bounds[i]:bounds[i + 1]]
+        """
+        if separator == "":
+            return list(range(start, end + 1))
+        pattern = self._patterns.get(separator)
+        if pattern is None:
+            pattern = self._patterns[separator] = re.compile(re.escape(separator))
+        bounds = [start]
+        bounds.extend(match.start() for match in pattern.finditer(text, start, end))
+        if len(bounds) > 1 and bounds[1] == start:
+            # Text starting with the separator has no empty first piece
+            del bounds[0]
+        bounds.append(end)
+        return bounds
+
+    def _emit(self, text: str, start: int, end: int, spans: List[Tuple[int, int]]):
+        # Strip whitespace by moving the offsets
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if end > start:
+            spans.append((start, end))
+
+    def _merge(self, text: str, bounds: List[int], lengths: List[int], spans: List[Tuple[int, int]]):
+        """
+        Combine a run of adjacent pieces into chunks of up to chunk_size,
+        starting each chunk with up to chunk_overlap of the previous one.
+
+        Equivalent to LangChain's piece-by-piece merge, but each chunk boundary
+        is found by bisecting the running length totals.
+        """
+        totals = list(accumulate(lengths, initial=0))
+        count = len(lengths)
+        first = 0
+        while True:
+            # Pieces first..last-1 fit; piece `last` would overflow the chunk
+            last = bisect_right(totals, totals[first] + self._chunk_size) - 1
+            if last >= count:
+                self._emit(text, bounds[first], bounds[count], spans)
+                return
+            self._emit(text, bounds[first], bounds[last], spans)
+            # Drop leading pieces until the rest fits in the overlap and leaves room for piece `last`
+            first = max(first,
+                        bisect_left(totals, totals[last] - self._chunk_overlap),
+                        bisect_left(totals, totals[last + 1] - self._chunk_size))
+            first = min(first, last)
+
+    def _split(self, text: str, start: int, end: int, separators: List[str], spans: List[Tuple[int, int]]):
+        separator = separators[-1]
+        remaining: List[str] = []
+        for i, candidate in enumerate(separators):
+            if candidate == "":
+                separator = candidate
+                break
+            if text.find(candidate, start, end) != -1:
+                separator = candidate
+                remaining = separators[i + 1:]
+                break
+
+        bounds = self._boundaries(text, start, end, separator)
+        if self._length_function is None:
+            lengths = list(map(sub, bounds[1:], bounds))
+        else:
+            lengths = [self._length_function(text[a:b]) for a, b in zip(bounds, bounds[1:])]
+
+        # Runs of pieces shorter than chunk_size are merged; longer pieces are split further
+        count = len(lengths)
+        first = 0
+        for i in [i for i, length in enumerate(lengths) if length >= self._chunk_size] + [count]:
+            if i > first:
+                self._merge(text, bounds[first:i + 1], lengths[first:i], spans)
+            if i == count:
+                break
+            if remaining:
+                self._split(text, bounds[i], bounds[i + 1], remaining, spans)
+            else:
+                self._emit(text, bounds[i], bounds[i + 1], spans)
+            first = i + 1
+
+    def split_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        (start, end) character offsets of each chunk of text
+        """
+        spans: List[Tuple[int, int]] = []
+        self._split(text, 0, len(text), self._separators, spans)
+        return spans
+
+    def split_text(self, text: str) -> List[str]:
+        return [text[start:end] for start, end in self.split_spans(text)]
+
+    def create_documents(self, texts: List[str], metadatas: Optional[List[Dict]] = None) -> List[Document]:
+        """
+        Chunk documents with start_index and end_index character offsets in their metadata
+        """
+        documents = []
+        for i, text in enumerate(texts):
+            for start, end in self.split_spans(text):
+                metadata = dict(metadatas[i]) if metadatas else {}
+                metadata.update(start_index=start, end_index=end)
+                documents.append(Document(page_content=text[start:end], metadata=metadata))
+        return documents
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        return self.create_documents([doc.page_content for doc in documents],
+                                     [doc.metadata for doc in documents])
+
+class TokenTextSplitter(FastTextSplitter):
+    """
+    FastTextSplitter with chunk_size and chunk_overlap counted in tokens.
+
+    `count_tokens` defaults to the same local estimate used for the context
+    token budget; pass a real tokenizer's counter for exact sizes.
+    """
+
+    def __init__(self, chunk_size: int = 256, chunk_overlap: int = 50,
+                 count_tokens: Callable[[str], int] = estimate_tokens,
+                 separators: Optional[List[str]] = None):
+        super().__init__(chunk_size, chunk_overlap, separators, length_function=count_tokens)
+
+def default_splitter(separators: Optional[List[str]] = None) -> FastTextSplitter:
+    """
+    The ingestion splitter: 1000 characters with 200 overlap, or
+    CHUNK_TOKENS estimated tokens when that is set
+    """
+    if CHUNK_TOKENS > 0:
+        return TokenTextSplitter(chunk_size=CHUNK_TOKENS, chunk_overlap=CHUNK_TOKEN_OVERLAP, separators=separators)
+    return FastTextSplitter(chunk_size=1000, chunk_overlap=200, separators=separators)
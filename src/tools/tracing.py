@@ -0,0 +1,250 @@
+from typing import Dict, Iterable, Iterator, List, Optional
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from src.config.settings import TRACE_PATH, TRACE_MAX_SAMPLES
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+class Span:
+    """A timed operation; `attributes` holds extra facts such as token counts or cache hits"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "duration", "attributes", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self.duration = 0.0
+        self.attributes = attributes
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict:
+        return {"name": self.name, "trace_id": self.trace_id, "span_id": self.span_id,
+                "parent_id": self.parent_id, "start": self.start, "duration": self.duration,
+                "attributes": self.attributes, "error": self.error}
+
+def token_usage(message) -> Dict[str, int]:
+    """
+    Input and output token counts reported on an LLM response, if any
+    """
+    usage = getattr(message, "usage_metadata", None)
+    if not isinstance(usage, dict):
+        return {}
+    return {"input_tokens": usage.get("input_tokens", 0), "output_tokens": usage.get("output_tokens", 0)}
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def summarize(spans: Iterable[Dict]) -> Dict[str, Dict]:
+    """
+    Count, mean and p50/p95/p99 duration per span name
+    """
+    durations = defaultdict(list)
+    for span in spans:
+        durations[span["name"]].append(span["duration"])
+    return {
+        name: {"count": len(values), "mean": sum(values) / len(values),
+               "p50": percentile(values, 50), "p95": percentile(values, 95), "p99": percentile(values, 99)}
+        for name, values in sorted(durations.items())
+    }
+
+def format_summary(summary: Dict[str, Dict]) -> str:
+    lines = [f"{'span':<20}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}"]
+    for name, stats in summary.items():
+        lines.append(f"{name:<20}{stats['count']:>8}{stats['p50'] * 1000:>10.1f}{stats['p95'] * 1000:>10.1f}"
+                     f"{stats['p99'] * 1000:>10.1f}{stats['mean'] * 1000:>10.1f}")
+    return "\n".join(lines)
+
+class Tracer:
+    """
+    Records spans for graph nodes, pipeline stages and external calls (LLM,
+    embeddings, vector search, OpenWeatherMap), without LangSmith or a
+    network connection.
+
+    Parents are tracked per thread / asyncio task, so nested spans share a
+    trace ID. Finished spans update Prometheus-style counters (see `serve`),
+    keep the last `max_samples` durations per span name for percentiles and
+    are appended to the JSONL `trace_path` when one is set; summarize a
+    trace file with `python -m src.tools.tracing data/traces.jsonl`.
+    """
+
+    def __init__(self, trace_path: Optional[str] = TRACE_PATH, max_samples: int = TRACE_MAX_SAMPLES):
+        self.trace_path = trace_path or None
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._file = None
+        self._server = None
+        self.reset()
+
+    def reset(self):
+        """Forget recorded samples and counters"""
+        with self._lock:
+            self._samples: Dict[str, deque] = {}
+            self._buckets: Dict[str, List[int]] = {}
+            self._sums: Dict[str, float] = defaultdict(float)
+            self._counts: Dict[str, int] = defaultdict(int)
+            self._errors: Dict[str, int] = defaultdict(int)
+            self._tokens: Dict[tuple, int] = defaultdict(int)
+            self._cache: Dict[tuple, int] = defaultdict(int)
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        """
+        Time the enclosed block; `span.duration` is set when it exits
+        """
+        span = Span(name, _current_span.get(), attributes)
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration = time.perf_counter() - start
+            _current_span.reset(token)
+            self._record(span)
+
+    @staticmethod
+    def current() -> Optional[Span]:
+        return _current_span.get()
+
+    def annotate(self, **attributes):
+        """Add attributes to the innermost active span, if any"""
+        span = _current_span.get()
+        if span is not None:
+            span.set(**attributes)
+
+    def _record(self, span: Span):
+        with self._lock:
+            samples = self._samples.get(span.name)
+            if samples is None:
+                samples = self._samples[span.name] = deque(maxlen=self.max_samples)
+                self._buckets[span.name] = [0] * len(BUCKETS)
+            samples.append(span.duration)
+            for i, bound in enumerate(BUCKETS):
+                if span.duration <= bound:
+                    self._buckets[span.name][i] += 1
+            self._sums[span.name] += span.duration
+            self._counts[span.name] += 1
+            if span.error:
+                self._errors[span.name] += 1
+            for kind in ("input_tokens", "output_tokens"):
+                if span.attributes.get(kind):
+                    self._tokens[(span.name, kind[:-len("_tokens")])] += span.attributes[kind]
+            if "cache_hit" in span.attributes:
+                self._cache[(span.name, "hit" if span.attributes["cache_hit"] else "miss")] += 1
+            if self.trace_path:
+                if self._file is None:
+                    directory = os.path.dirname(self.trace_path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    self._file = open(self.trace_path, "a", encoding="utf-8", buffering=1)
+                self._file.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        p50/p95/p99 per span name over the recent samples
+        """
+        with self._lock:
+            spans = [{"name": name, "duration": duration}
+                     for name, samples in self._samples.items() for duration in samples]
+        return summarize(spans)
+
+    def prometheus(self) -> str:
+        """
+        Metrics in the Prometheus text exposition format
+        """
+        with self._lock:
+            lines = ["# HELP rag_span_duration_seconds Duration of workflow stages and external calls",
+                     "# TYPE rag_span_duration_seconds histogram"]
+            for name in sorted(self._counts):
+                for bound, count in zip(BUCKETS, self._buckets[name]):
+                    lines.append(f'rag_span_duration_seconds_bucket{{span="{name}",le="{bound}"}} {count}')
+                lines.append(f'rag_span_duration_seconds_bucket{{span="{name}",le="+Inf"}} {self._counts[name]}')
+                lines.append(f'rag_span_duration_seconds_sum{{span="{name}"}} {self._sums[name]}')
+                lines.append(f'rag_span_duration_seconds_count{{span="{name}"}} {self._counts[name]}')
+            lines += ["# HELP rag_span_errors_total Spans that raised an exception",
+                      "# TYPE rag_span_errors_total counter"]
+            lines += [f'rag_span_errors_total{{span="{name}"}} {count}' for name, count in sorted(self._errors.items())]
+            lines += ["# HELP rag_tokens_total LLM tokens reported by the model",
+                      "# TYPE rag_tokens_total counter"]
+            lines += [f'rag_tokens_total{{span="{name}",kind="{kind}"}} {count}'
+                      for (name, kind), count in sorted(self._tokens.items())]
+            lines += ["# HELP rag_cache_lookups_total Cache lookups by result",
+                      "# TYPE rag_cache_lookups_total counter"]
+            lines += [f'rag_cache_lookups_total{{span="{name}",result="{result}"}} {count}'
+                      for (name, result), count in sorted(self._cache.items())]
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve /metrics on a background thread (once per tracer)
+        """
+        with self._lock:
+            if self._server is not None:
+                return self._server
+            tracer = self
+
+            class MetricsHandler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = tracer.prometheus().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+            threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+            return self._server
+
+# Process-wide tracer used by the workflow and its clients
+tracer = Tracer()
+
+def read_trace(path: str) -> Iterator[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a JSONL trace file: p50/p95/p99 latency per span")
+    parser.add_argument("path", nargs="?", default=TRACE_PATH, help="trace file (defaults to TRACE_PATH)")
+    parser.add_argument("--since", type=float, default=0.0, help="only spans started in the last N seconds")
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("no trace file given and TRACE_PATH is not set")
+
+    cutoff = time.time() - args.since if args.since else 0.0
+    spans = [span for span in read_trace(args.path) if span["start"] >= cutoff]
+    if not spans:
+        print("No spans recorded")
+        return
+    print(format_summary(summarize(spans)))
+
+if __name__ == "__main__":
+    main()
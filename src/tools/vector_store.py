@@ -1,61 +1,678 @@
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import os
+import threading
+import time
 import uuid
-from qdrant_client import QdrantClient
-from qdrant_client.http import models
-from src.config.settings import QDRANT_HOST, QDRANT_PORT, COLLECTION_NAME, GOOGLE_API_KEY
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from concurrent.futures import ThreadPoolExecutor
+from src.config.settings import (
+    QDRANT_HOST, QDRANT_PORT, COLLECTION_NAME, GOOGLE_API_KEY,
+    VECTOR_BACKEND, LOCAL_INDEX_PATH, LOCAL_INDEX_HNSW_THRESHOLD,
+    STORAGE_PROFILE, CHUNK_STORE_PATH, TENANCY, DEFAULT_TENANT,
+    SEARCH_MODE, BM25_INDEX_PATH, HYBRID_CANDIDATES, RRF_K, STORE_VERSION_PATH,
+    EMBEDDING_BATCH_SIZE, EMBEDDING_MAX_IN_FLIGHT,
+    EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_BYTES
+)
+from src.tools.bm25_index import BM25Index
+from src.tools.chunk_store import ChunkStore
+from src.tools.clients import shared_async_client, shared_client
+from src.tools.embedding_cache import CachedEmbeddings
+from src.tools.lazy_import import LazyImport
+from src.tools.local_index import LocalVectorIndex
+from src.tools.storage_profiles import collection_config, get_profile, search_params, slim_payload
+from src.tools.tenancy import (
+    INDEXED_FIELDS, check_tenant, payload_matches, tenant_collection, tenant_path, tenant_where
+)
+from src.tools.tracing import tracer
 
-class VectorStore:
-    def __init__(self):
-        self.client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
-        self.embeddings = GoogleGenerativeAIEmbeddings(
-            google_api_key=GOOGLE_API_KEY,
-            model="models/embedding-001"
-        )
-        self._create_collection()
+# The Qdrant and Google SDKs take over a second to import, so they are loaded on first use
+QdrantClient = LazyImport("qdrant_client", "QdrantClient")
+AsyncQdrantClient = LazyImport("qdrant_client", "AsyncQdrantClient")
+models = LazyImport("qdrant_client.http.models")
+GoogleGenerativeAIEmbeddings = LazyImport("langchain_google_genai", "GoogleGenerativeAIEmbeddings")
+
+EMBEDDING_DIMENSION = 768  # Google embedding-001 dimension
+
+class QdrantBackend:
+    """
+    Vector backend storing points in a Qdrant collection.
+
+    Backends share one interface: ensure_collection, upsert, delete,
+    delete_where, drop_collection, retrieve, and search/search_batch/asearch
+    returning (id, payload, score) hits, or (id, payload, score, vector) hits
+    with with_vectors=True. Searches take an optional `where` payload
+    condition (see tenancy.payload_matches) that runs on the payload indexes
+    created with the collection. The storage profile sets quantization,
+    on-disk storage and HNSW parameters when the collection is created, and
+    rescoring at query time.
+
+    With `partitioned`, the collection is shared by tenants: the tenant index
+    is marked as the tenant key and HNSW graphs are built per tenant instead
+    of over all points, so every search must filter on a tenant.
+
+    Pass `client_factory` instead of `client` to create the client on first
+    use; QdrantClient contacts the server when it is constructed.
 
-    def _create_collection(self):
+    `untagged_points` tells whether the collection may hold points stored
+    before tenants existed, which have no tenant field. It is False for
+    collections created by ensure_collection and for partitioned ones (only
+    created since tenants exist), so default-tenant searches filter on one
+    tenant value and use that tenant's HNSW graph.
+    """
+
+    def __init__(self, client: Optional[QdrantClient] = None, async_client: Optional[Callable] = None,
+                 collection_name: str = COLLECTION_NAME, profile: str = "default",
+                 partitioned: bool = False, client_factory: Optional[Callable] = None):
+        if client is None and client_factory is None:
+            raise ValueError("QdrantBackend needs a client or a client_factory")
+        self._client = client
+        self._client_factory = client_factory
+        # Returns the async client for the running event loop; without one
+        # async searches run the sync client in a thread
+        self._async_client = async_client
+        self.collection_name = collection_name
+        self.profile = get_profile(profile)
+        self.partitioned = partitioned
+        self._search_params = search_params(self.profile)
+        # Known once ensure_collection has run
+        self.untagged_points = True
+
+    @property
+    def client(self) -> QdrantClient:
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    def ensure_collection(self, size: int) -> bool:
         """
-        Create or validate collection existence
+        Create or validate collection existence and its payload indexes;
+        returns True if the collection was created
         """
         try:
-            self.client.get_collection(COLLECTION_NAME)
+            info = self.client.get_collection(self.collection_name)
+            created = False
+            try:
+                hnsw = info.config.hnsw_config
+                self.untagged_points = not (hnsw.m == 0 and hnsw.payload_m)
+            except AttributeError:
+                self.untagged_points = True
         except:
-            self.client.create_collection(
-                collection_name=COLLECTION_NAME,
-                vectors_config=models.VectorParams(
-                    size=768,  # Google embedding-001 dimension
-                    distance=models.Distance.COSINE
-                )
+            config = collection_config(self.profile, size)
+            if self.partitioned:
+                hnsw = config.get("hnsw_config")
+                params = hnsw.model_dump(exclude_none=True) if hnsw is not None else {}
+                params.update(payload_m=params.get("m") or 16, m=0)
+                config["hnsw_config"] = models.HnswConfigDiff(**params)
+            self.client.create_collection(collection_name=self.collection_name, **config)
+            created = True
+            self.untagged_points = False
+        # Also indexes collections created before the fields were indexed; re-creating is a no-op
+        for field, kind in INDEXED_FIELDS.items():
+            if kind == "keyword":
+                schema = models.KeywordIndexParams(type="keyword", is_tenant=self.partitioned and field == "tenant")
+            else:
+                schema = models.IntegerIndexParams(type="integer", lookup=True, range=False)
+            self.client.create_payload_index(collection_name=self.collection_name, field_name=field,
+                                             field_schema=schema)
+        return created
+
+    def upsert(self, ids: List[str], vectors: List[List[float]], payloads: List[Dict]):
+        points = [
+            models.PointStruct(id=point_id, vector=vector, payload=payload)
+            for point_id, vector, payload in zip(ids, vectors, payloads)
+        ]
+        self.client.upsert(collection_name=self.collection_name, points=points)
+
+    def delete(self, ids: List[str]):
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=models.PointIdsList(points=list(ids))
+        )
+
+    def delete_where(self, where: Dict):
+        """
+        Delete every point matching a payload condition, server-side
+        """
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=models.FilterSelector(filter=self._filter(where))
+        )
+
+    def drop_collection(self):
+        """
+        Delete the collection; ensure_collection creates it again
+        """
+        self.client.delete_collection(collection_name=self.collection_name)
+
+    @staticmethod
+    def _filter(where: Optional[Dict]):
+        """
+        Qdrant filter for a `where` condition: each key must match its value
+        or one of its values, None standing for an empty field
+        """
+        if not where:
+            return None
+        must = []
+        for key, expected in where.items():
+            allowed = list(expected) if isinstance(expected, (list, tuple)) else [expected]
+            values = [value for value in allowed if value is not None]
+            conditions = []
+            if len(values) == 1:
+                conditions.append(models.FieldCondition(key=key, match=models.MatchValue(value=values[0])))
+            elif values:
+                conditions.append(models.FieldCondition(key=key, match=models.MatchAny(any=values)))
+            if len(values) < len(allowed):
+                conditions.append(models.IsEmptyCondition(is_empty=models.PayloadField(key=key)))
+            must.append(conditions[0] if len(conditions) == 1 else models.Filter(should=conditions))
+        return models.Filter(must=must)
+
+    @staticmethod
+    def _hits(points, with_vectors: bool = False) -> List[Tuple]:
+        if with_vectors:
+            return [(str(hit.id), hit.payload, hit.score, hit.vector) for hit in points]
+        return [(str(hit.id), hit.payload, hit.score) for hit in points]
+
+    def retrieve(self, ids: List[str]) -> Dict[str, Dict]:
+        """
+        Payloads of points by ID
+        """
+        records = self.client.retrieve(collection_name=self.collection_name, ids=list(ids), with_payload=True)
+        return {str(record.id): record.payload for record in records}
+
+    def search(self, vector: List[float], limit: int, with_vectors: bool = False,
+               where: Optional[Dict] = None) -> List[Tuple]:
+        with tracer.span("qdrant.search", limit=limit):
+            response = self.client.query_points(
+                collection_name=self.collection_name,
+                query=vector,
+                query_filter=self._filter(where),
+                limit=limit,
+                search_params=self._search_params,
+                with_payload=True,
+                with_vectors=with_vectors
             )
+        return self._hits(response.points, with_vectors)
 
-    def store_documents(self, documents: List):
+    def search_batch(self, vectors: List[List[float]], limit: int,
+                     with_vectors: bool = False, where: Optional[Dict] = None) -> List[List[Tuple]]:
         """
-        Store documents in vector store
+        Search for many query vectors with one request to Qdrant's batch endpoint
         """
-        for doc in documents:
-            vector = self.embeddings.embed_query(doc.page_content)
-            # Generate a UUID for the point ID to ensure it's valid
-            point_id = str(uuid.uuid4())
-            self.client.upsert(
-                collection_name=COLLECTION_NAME,
-                points=[
-                    models.PointStruct(
-                        id=point_id,
-                        vector=vector,
-                        payload={"text": doc.page_content, "metadata": doc.metadata}
-                    )
+        query_filter = self._filter(where)
+        with tracer.span("qdrant.search", limit=limit, queries=len(vectors)):
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=[
+                    models.QueryRequest(query=vector, filter=query_filter, limit=limit,
+                                        params=self._search_params, with_payload=True,
+                                        with_vector=with_vectors)
+                    for vector in vectors
                 ]
             )
+        return [self._hits(response.points, with_vectors) for response in responses]
+
+    async def asearch(self, vector: List[float], limit: int, with_vectors: bool = False,
+                      where: Optional[Dict] = None) -> List[Tuple]:
+        if self._async_client is None:
+            return await asyncio.to_thread(self.search, vector, limit, with_vectors, where)
+        with tracer.span("qdrant.search", limit=limit):
+            response = await self._async_client().query_points(
+                collection_name=self.collection_name,
+                query=vector,
+                query_filter=self._filter(where),
+                limit=limit,
+                search_params=self._search_params,
+                with_payload=True,
+                with_vectors=with_vectors
+            )
+        return self._hits(response.points, with_vectors)
+
+def create_backend(name: str = VECTOR_BACKEND, profile: str = STORAGE_PROFILE,
+                   tenant: str = DEFAULT_TENANT, tenancy: str = TENANCY):
+    """
+    Vector backend selected by name: "qdrant" (server at QDRANT_HOST:QDRANT_PORT)
+    or "local" (in-process index at LOCAL_INDEX_PATH, which always stores
+    full float32 vectors). With collection-per-tenant tenancy, each tenant
+    gets its own collection or index directory.
+    """
+    per_tenant = tenancy == "collection"
+    if name == "local":
+        path = tenant_path(LOCAL_INDEX_PATH, tenant) if per_tenant else LOCAL_INDEX_PATH
+        return shared_client(LocalVectorIndex, path, hnsw_threshold=LOCAL_INDEX_HNSW_THRESHOLD)
+    if name == "qdrant":
+        return QdrantBackend(
+            client_factory=lambda: shared_client(QdrantClient, host=QDRANT_HOST, port=QDRANT_PORT),
+            async_client=lambda: shared_async_client(AsyncQdrantClient, host=QDRANT_HOST, port=QDRANT_PORT),
+            collection_name=tenant_collection(tenant) if per_tenant else COLLECTION_NAME,
+            profile=profile,
+            partitioned=tenancy == "payload"
+        )
+    raise ValueError(f"Unknown vector backend: {name}")
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked ID lists, scoring each ID by the sum of 1 / (k + rank)
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, point_id in enumerate(ranking, start=1):
+            scores[point_id] = scores.get(point_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+class VectorStore:
+    """
+    Chunk store over a vector backend, with BM25 lexical and hybrid search.
+
+    Every read and write takes an optional `tenant` (None is DEFAULT_TENANT).
+    With "payload" tenancy all tenants share one collection and searches
+    filter on the indexed "tenant" payload field; with "collection" tenancy
+    each tenant has its own collection, created on first use. Either way each
+    tenant has its own BM25 index, so a search only ever scores that tenant's
+    chunks and its latency does not grow with the number of tenants.
+    """
+
+    def __init__(self, backend=None, profile: str = STORAGE_PROFILE, search_mode: str = SEARCH_MODE,
+                 tenancy: str = TENANCY, backend_factory: Optional[Callable] = None):
+        if tenancy not in ("payload", "collection"):
+            raise ValueError(f"Unknown tenancy: {tenancy} (choose from payload, collection)")
+        self.tenancy = tenancy
+        self._backend = backend if backend is not None else create_backend(profile=profile, tenancy=tenancy)
+        # Backend for another tenant's collection under collection tenancy
+        self._backend_factory = backend_factory or (
+            lambda tenant: create_backend(profile=profile, tenant=tenant, tenancy=tenancy)
+        )
+        self._tenant_backends: Dict[str, object] = {}
+        # With slim payloads the chunk text lives in a local chunk store
+        self.chunk_store = None
+        if get_profile(profile)["slim_payload"]:
+            self.chunk_store = shared_client(ChunkStore, CHUNK_STORE_PATH)
+        embedding_model = "models/embedding-001"
+        self.embeddings = CachedEmbeddings(
+            GoogleGenerativeAIEmbeddings(
+                google_api_key=GOOGLE_API_KEY,
+                model=embedding_model
+            ),
+            model=embedding_model,
+            max_entries=EMBEDDING_CACHE_SIZE,
+            disk_path=EMBEDDING_CACHE_PATH,
+            max_disk_bytes=EMBEDDING_CACHE_MAX_BYTES
+        )
+        # Writes made by this process, and the version file recording writes by any process
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        self._version_path = STORE_VERSION_PATH
+        # The collection is checked (and created if missing) on first use, not here,
+        # so building the store makes no round trip to the server
+        self._created_collection: Optional[bool] = None
+        self._collection_lock = threading.Lock()
+        if search_mode not in ("dense", "hybrid", "lexical"):
+            raise ValueError(f"Unknown search mode: {search_mode}")
+        self.search_mode = search_mode
+        # BM25 indexes over the same chunks, one per tenant, kept up to date by store_documents
+        self._lexical: Dict[str, BM25Index] = {}
+        self._lexical_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lexical")
+
+    @property
+    def client(self):
+        """Qdrant client when using the Qdrant backend (created on first access)"""
+        return getattr(self._backend, "client", None)
+
+    @property
+    def generation(self):
+        """
+        Changes after every write to the store, including writes by other
+        processes sharing STORE_VERSION_PATH, so caches derived from the
+        collection can be invalidated
+        """
+        if not self._version_path:
+            return self._writes
+        try:
+            # The file is replaced on each write, so its inode changes even where mtimes are coarse
+            stat = os.stat(self._version_path)
+            version = (stat.st_ino, stat.st_mtime_ns)
+        except OSError:
+            version = None
+        return self._writes, version
+
+    def _bump_generation(self):
+        with self._writes_lock:
+            self._writes += 1
+            if not self._version_path:
+                return
+            directory = os.path.dirname(self._version_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            token = uuid.uuid4().hex
+            tmp_path = f"{self._version_path}.{token}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(token)
+            os.replace(tmp_path, self._version_path)
+
+    @property
+    def created_collection(self) -> bool:
+        """True if the collection did not exist and was created by this store"""
+        if self._created_collection is None:
+            with self._collection_lock:
+                if self._created_collection is None:
+                    self._created_collection = self._backend.ensure_collection(EMBEDDING_DIMENSION)
+        return self._created_collection
+
+    @property
+    def backend(self):
+        """The vector backend, with its collection checked once before the first call"""
+        if self._created_collection is None:
+            self.created_collection
+        return self._backend
+
+    def backend_for(self, tenant: Optional[str] = None):
+        """
+        The vector backend holding a tenant's points: the shared backend, or
+        under collection tenancy the tenant's own, created on first use
+        """
+        tenant = check_tenant(tenant)
+        if self.tenancy == "payload" or tenant == DEFAULT_TENANT:
+            return self.backend
+        with self._collection_lock:
+            backend = self._tenant_backends.get(tenant)
+            if backend is None:
+                backend = self._backend_factory(tenant)
+                backend.ensure_collection(EMBEDDING_DIMENSION)
+                self._tenant_backends[tenant] = backend
+        return backend
+
+    def lexical_index(self, tenant: Optional[str] = None) -> BM25Index:
+        """
+        A tenant's BM25 index, saved at its variant of BM25_INDEX_PATH
+        """
+        tenant = check_tenant(tenant)
+        with self._collection_lock:
+            index = self._lexical.get(tenant)
+            if index is None:
+                path = tenant_path(BM25_INDEX_PATH, tenant)
+                index = shared_client(BM25Index, path) if path else BM25Index()
+                self._lexical[tenant] = index
+        return index
+
+    @property
+    def lexical(self) -> BM25Index:
+        """The default tenant's BM25 index"""
+        return self.lexical_index()
 
-    def search(self, query: str, limit: int = 5) -> List[Dict]:
+    def _where(self, tenant: Optional[str], where: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Payload condition for a search: `where` plus, with payload tenancy,
+        the tenant's partition
+        """
+        conditions = dict(where or {})
+        if self.tenancy == "payload":
+            conditions.update(self._tenant_where(check_tenant(tenant)))
+        return conditions or None
+
+    def _tenant_where(self, tenant: str) -> Dict:
+        """
+        Condition on the shared collection selecting a tenant's points
+        """
+        return tenant_where(tenant, untagged=getattr(self.backend, "untagged_points", True))
+
+    def store_documents(self, documents: List, batch_size: int = EMBEDDING_BATCH_SIZE,
+                        max_in_flight: int = EMBEDDING_MAX_IN_FLIGHT, tenant: Optional[str] = None) -> Dict:
+        """
+        Store documents in vector store
+
+        Chunks are grouped into batches of `batch_size`; each batch is embedded
+        with a single embed_documents call and written with a single multi-point
+        upsert. Up to `max_in_flight` batches are processed concurrently.
+        Returns throughput statistics for the run.
+        """
+        tenant = check_tenant(tenant)
+        batch_size = max(1, batch_size)
+        batches = [documents[i:i + batch_size] for i in range(0, len(documents), batch_size)]
+        in_flight = {"current": 0, "peak": 0}
+        lock = threading.Lock()
+
+        def store_batch(batch: List):
+            with lock:
+                in_flight["current"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+            try:
+                self._store_batch(batch, tenant)
+            finally:
+                with lock:
+                    in_flight["current"] -= 1
+
+        start = time.perf_counter()
+        if max_in_flight > 1 and len(batches) > 1:
+            with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+                # Consume results so that batch errors are raised here
+                list(executor.map(store_batch, batches))
+        else:
+            for batch in batches:
+                store_batch(batch)
+        elapsed = time.perf_counter() - start
+
+        return {
+            "chunks": len(documents),
+            "batches": len(batches),
+            "batch_size": batch_size,
+            "max_in_flight": max_in_flight,
+            "peak_in_flight": in_flight["peak"],
+            "seconds": elapsed,
+            "chunks_per_sec": len(documents) / elapsed if elapsed > 0 else 0.0
+        }
+
+    @staticmethod
+    def point_id(doc, tenant: Optional[str] = None) -> str:
+        """
+        Deterministic point ID derived from the chunk's tenant, source and
+        content, so re-ingesting the same chunk overwrites instead of
+        duplicating it, and tenants sharing a collection never collide
+        """
+        source = str(doc.metadata.get("source", ""))
+        key = f"{source}\0{doc.page_content}"
+        tenant = check_tenant(tenant)
+        if tenant != DEFAULT_TENANT:
+            # Default-tenant IDs are unchanged from before tenants existed
+            key = f"{tenant}\0{key}"
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        # Qdrant point IDs must be unsigned integers or UUIDs
+        return str(uuid.UUID(digest[:32]))
+
+    def delete_points(self, point_ids: List[str], tenant: Optional[str] = None):
+        """
+        Delete points by ID
+        """
+        if point_ids:
+            self.backend_for(tenant).delete(list(point_ids))
+            self.lexical_index(tenant).remove(list(point_ids))
+            if self.chunk_store is not None:
+                self.chunk_store.delete_many(list(point_ids))
+            self._bump_generation()
+
+    def delete_tenant(self, tenant: str):
+        """
+        Delete all of a tenant's points: its collection under collection
+        tenancy, its partition of the shared collection otherwise
+        """
+        tenant = check_tenant(tenant)
+        lexical = self.lexical_index(tenant)
+        point_ids = lexical.ids()
+        if self.tenancy == "collection":
+            self.backend_for(tenant).drop_collection()
+            with self._collection_lock:
+                # Checked (and created empty) again on next use
+                if tenant == DEFAULT_TENANT:
+                    self._created_collection = None
+                else:
+                    self._tenant_backends.pop(tenant, None)
+        else:
+            self.backend.delete_where(self._tenant_where(tenant))
+        lexical.remove(point_ids)
+        lexical.save()
+        if self.chunk_store is not None:
+            self.chunk_store.delete_many(point_ids)
+        self._bump_generation()
+
+    def _store_batch(self, batch: List, tenant: str = DEFAULT_TENANT):
+        """
+        Embed and upsert one batch of documents
+        """
+        vectors = self.embeddings.embed_documents([doc.page_content for doc in batch])
+        ids = [self.point_id(doc, tenant) for doc in batch]
+        payloads = [{"text": doc.page_content, "metadata": doc.metadata, "tenant": tenant} for doc in batch]
+        if self.chunk_store is not None:
+            # Text goes first so a stored point always has its text
+            self.chunk_store.put_many({point_id: doc.page_content for point_id, doc in zip(ids, batch)})
+            payloads = [slim_payload(payload) for payload in payloads]
+        self.backend_for(tenant).upsert(ids, vectors, payloads)
+        self.lexical_index(tenant).add(ids, [doc.page_content for doc in batch])
+        self._bump_generation()
+
+    def flush(self):
+        """
+        Persist the lexical indexes; call after a round of writes
+        """
+        for index in list(self._lexical.values()):
+            index.save()
+
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a search query
+        """
+        return self.embeddings.embed_query(query)
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        Embed many search queries at once
+        """
+        return self.embeddings.embed_queries(queries)
+
+    async def aembed_query(self, query: str) -> List[float]:
+        """
+        Async version of embed_query
+        """
+        return await self.embeddings.aembed_query(query)
+
+    def _format_hits(self, hits: List[Tuple]) -> List[Dict]:
+        texts = {}
+        if self.chunk_store is not None:
+            texts = self.chunk_store.get_many([point_id for point_id, payload, *_ in hits
+                                               if "text" not in payload])
+        formatted = []
+        for point_id, payload, score, *vector in hits:
+            hit = {"text": payload["text"] if "text" in payload else texts.get(point_id, ""), "score": score,
+                   "metadata": payload.get("metadata") or {}}
+            if vector:
+                hit["vector"] = vector[0]
+            formatted.append(hit)
+        return formatted
+
+    def _lexical_hits(self, query: str, limit: int, tenant: Optional[str] = None,
+                      where: Optional[Dict] = None) -> List[Tuple[str, Dict, float]]:
+        # With extra conditions, over-fetch and keep the matching hits
+        ranked = self.lexical_index(tenant).search(query, max(limit, HYBRID_CANDIDATES) if where else limit)
+        payloads = self.backend_for(tenant).retrieve([point_id for point_id, _ in ranked]) if ranked else {}
+        return [(point_id, payloads[point_id], score) for point_id, score in ranked
+                if point_id in payloads and payload_matches(payloads[point_id], where)][:limit]
+
+    def _fuse(self, lexical: List[Tuple[str, float]], dense: List[Tuple], limit: int,
+              tenant: Optional[str] = None, where: Optional[Dict] = None) -> List[Dict]:
+        """
+        Combine lexical and dense rankings with reciprocal-rank fusion
+        """
+        backend = self.backend_for(tenant)
+        payloads = {hit[0]: hit[1] for hit in dense}
+        if where:
+            # Dense hits are filtered by the backend; lexical ones are filtered here
+            missing = [point_id for point_id, _ in lexical if point_id not in payloads]
+            if missing:
+                payloads.update(backend.retrieve(missing))
+            lexical = [(point_id, score) for point_id, score in lexical
+                       if point_id in payloads and payload_matches(payloads[point_id], where)]
+        fused = reciprocal_rank_fusion([[point_id for point_id, _ in lexical],
+                                        [hit[0] for hit in dense]])[:limit]
+        # Vectors come with dense hits only; lexical-only hits have none
+        vectors = {hit[0]: hit[3:] for hit in dense}
+        missing = [point_id for point_id, _ in fused if point_id not in payloads]
+        if missing:
+            payloads.update(backend.retrieve(missing))
+        return self._format_hits([(point_id, payloads[point_id], score) + vectors.get(point_id, ())
+                                  for point_id, score in fused if point_id in payloads])
+
+    def search(self, query: str, limit: int = 5, query_vector: Optional[List[float]] = None,
+               mode: Optional[str] = None, with_vectors: bool = False,
+               tenant: Optional[str] = None, where: Optional[Dict] = None) -> List[Dict]:
         """
         Search for similar documents
+
+        `mode` is "dense" (vector search), "lexical" (BM25 only, no embedding
+        call) or "hybrid" (both, run concurrently and fused by reciprocal rank);
+        it defaults to the store's search_mode. Pass `query_vector` to reuse an
+        embedding that was already computed. With `with_vectors`, hits from
+        vector search carry their stored "vector" for reranking. Only the
+        tenant's chunks are searched; `where` narrows them further on payload
+        fields, e.g. {"metadata.source": "manual.pdf"}.
         """
-        query_vector = self.embeddings.embed_query(query)
-        results = self.client.search(
-            collection_name=COLLECTION_NAME,
-            query_vector=query_vector,
-            limit=limit
-        )
-        return [{"text": hit.payload["text"], "score": hit.score} for hit in results]
+        mode = mode or self.search_mode
+        backend = self.backend_for(tenant)
+        conditions = self._where(tenant, where)
+        if mode == "lexical":
+            return self._format_hits(self._lexical_hits(query, limit, tenant, where))
+        if mode == "hybrid":
+            candidates = max(limit, HYBRID_CANDIDATES)
+            # The local BM25 lookup runs while the embedding and vector search are in flight
+            lexical = self._lexical_pool.submit(self.lexical_index(tenant).search, query, candidates)
+            if query_vector is None:
+                query_vector = self.embed_query(query)
+            dense = backend.search(query_vector, candidates, with_vectors=with_vectors, where=conditions)
+            return self._fuse(lexical.result(), dense, limit, tenant, where)
+        if query_vector is None:
+            query_vector = self.embed_query(query)
+        return self._format_hits(backend.search(query_vector, limit, with_vectors=with_vectors, where=conditions))
+
+    def search_batch(self, query_vectors: List[List[float]], limit: int = 5,
+                     queries: Optional[List[str]] = None, with_vectors: bool = False,
+                     tenant: Optional[str] = None, where: Optional[Dict] = None) -> List[List[Dict]]:
+        """
+        Search for many query vectors at once
+
+        In hybrid mode, pass the query texts to fuse in BM25 results as well.
+        """
+        if not query_vectors:
+            return []
+        backend = self.backend_for(tenant)
+        conditions = self._where(tenant, where)
+        if self.search_mode != "hybrid" or queries is None:
+            return [self._format_hits(hits)
+                    for hits in backend.search_batch(query_vectors, limit, with_vectors=with_vectors,
+                                                     where=conditions)]
+        candidates = max(limit, HYBRID_CANDIDATES)
+        lexical_index = self.lexical_index(tenant)
+        lexical = [self._lexical_pool.submit(lexical_index.search, query, candidates) for query in queries]
+        dense = backend.search_batch(query_vectors, candidates, with_vectors=with_vectors, where=conditions)
+        return [self._fuse(future.result(), hits, limit, tenant, where)
+                for query, future, hits in zip(queries, lexical, dense)]
+
+    async def asearch(self, query: str, limit: int = 5, query_vector: Optional[List[float]] = None,
+                      mode: Optional[str] = None, with_vectors: bool = False,
+                      tenant: Optional[str] = None, where: Optional[Dict] = None) -> List[Dict]:
+        """
+        Async version of search
+        """
+        mode = mode or self.search_mode
+        if mode == "lexical":
+            return self._format_hits(await asyncio.to_thread(self._lexical_hits, query, limit, tenant, where))
+        backend = self.backend_for(tenant)
+        conditions = self._where(tenant, where)
+
+        async def dense(candidates: int):
+            vector = query_vector if query_vector is not None else await self.aembed_query(query)
+            return await backend.asearch(vector, candidates, with_vectors=with_vectors, where=conditions)
+
+        if mode == "hybrid":
+            candidates = max(limit, HYBRID_CANDIDATES)
+            lexical, dense_hits = await asyncio.gather(
+                asyncio.to_thread(self.lexical_index(tenant).search, query, candidates), dense(candidates)
+            )
+            return await asyncio.to_thread(self._fuse, lexical, dense_hits, limit, tenant, where)
+        return self._format_hits(await dense(limit))
@@ -1,30 +1,259 @@
+import asyncio
+import httpx
 import requests
-from typing import Dict, Optional
-from src.config.settings import OPENWEATHER_API_KEY
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from src.tools.clients import shared_async_client
+from src.tools.tracing import tracer
+from src.config.settings import (
+    OPENWEATHER_API_KEY, WEATHER_TIMEOUT, WEATHER_POOL_SIZE, WEATHER_CACHE_TTL,
+    WEATHER_STALE_TTL, WEATHER_CACHE_SIZE, WEATHER_RATE_LIMIT_PER_MINUTE
+)
+
+# Temperature symbol for each OpenWeatherMap units system
+TEMPERATURE_UNITS = {"metric": "°C", "imperial": "°F", "standard": "K"}
+
+class _InFlight:
+    """A pending upstream request that concurrent callers wait on"""
 
-class WeatherAPI:
     def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[Dict] = None
+
+class WeatherAPI:
+    def __init__(self, cache_ttl: float = WEATHER_CACHE_TTL, stale_ttl: float = WEATHER_STALE_TTL,
+                 rate_limit_per_minute: int = WEATHER_RATE_LIMIT_PER_MINUTE,
+                 timeout: float = WEATHER_TIMEOUT):
         self.api_key = OPENWEATHER_API_KEY
         self.base_url = "http://api.openweathermap.org/data/2.5/weather"
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.stale_ttl = stale_ttl
+        self.rate_limit_per_minute = rate_limit_per_minute
+
+        # Keep-alive connections are reused across requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=WEATHER_POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, Dict]]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, str], _InFlight] = {}
+        self._async_in_flight: Dict[Tuple, asyncio.Future] = {}
+        self._background_tasks = set()
+        self._calls = deque()  # monotonic timestamps of upstream calls in the last minute
+        self._cooldown_until = 0.0
+        self.stats = {
+            "hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+            "upstream_calls": 0, "rate_limited": 0, "errors": 0
+        }
+
+    @staticmethod
+    def _cache_key(city: str, units: str) -> Tuple[str, str]:
+        return " ".join(city.lower().split()), units
+
+    def _count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def _lookup(self, key: Tuple[str, str]) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Cached data for a key and whether it is "fresh" or "stale"
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age < self.cache_ttl:
+                self._count("hits")
+                return entry[1], "fresh"
+            if age < self.stale_ttl:
+                self._count("stale_hits")
+                return entry[1], "stale"
+        self._count("misses")
+        return None, None
 
-    def get_weather(self, city: str) -> Optional[Dict]:
+    def get_weather(self, city: str, units: str = "metric") -> Optional[Dict]:
         """
         Fetch weather data for a given city
+
+        Fresh cached data is returned directly. Data older than the TTL but
+        within the stale window is returned immediately while a background
+        refresh runs. Concurrent requests for the same city share one
+        upstream call.
+        """
+        key = self._cache_key(city, units)
+        with tracer.span("weather", cache_hit=False) as span:
+            weather_data, state = self._lookup(key)
+            if state == "stale":
+                self._refresh_in_background(key, city, units)
+            if state is not None:
+                span.set(cache_hit=True, stale=state == "stale")
+                return weather_data
+            return self._fetch_coalesced(key, city, units)
+
+    async def aget_weather(self, city: str, units: str = "metric") -> Optional[Dict]:
+        """
+        Async version of get_weather, sharing its cache and rate limit
+        """
+        key = self._cache_key(city, units)
+        with tracer.span("weather", cache_hit=False) as span:
+            weather_data, state = self._lookup(key)
+            if state == "stale" and self._async_key(key) not in self._async_in_flight:
+                task = asyncio.create_task(self._afetch_coalesced(key, city, units))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+            if state is not None:
+                span.set(cache_hit=True, stale=state == "stale")
+                return weather_data
+            return await self._afetch_coalesced(key, city, units)
+
+    @staticmethod
+    def _async_key(key: Tuple[str, str]) -> Tuple:
+        return id(asyncio.get_running_loop()), key
+
+    async def _afetch_coalesced(self, key: Tuple[str, str], city: str, units: str) -> Optional[Dict]:
+        async_key = self._async_key(key)
+        pending = self._async_in_flight.get(async_key)
+        if pending is not None:
+            self._count("coalesced")
+            return await asyncio.shield(pending)
+        pending = asyncio.get_running_loop().create_future()
+        self._async_in_flight[async_key] = pending
+        try:
+            pending.set_result(await self._afetch(key, city, units))
+        except BaseException:
+            # Only cancellation gets here; waiting callers are cancelled too
+            pending.cancel()
+            raise
+        finally:
+            self._async_in_flight.pop(async_key, None)
+        return pending.result()
+
+    def _refresh_in_background(self, key: Tuple[str, str], city: str, units: str):
+        with self._lock:
+            if key in self._in_flight:
+                return
+        threading.Thread(target=self._fetch_coalesced, args=(key, city, units), daemon=True).start()
+
+    def _fetch_coalesced(self, key: Tuple[str, str], city: str, units: str) -> Optional[Dict]:
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlight()
+                self._in_flight[key] = call
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            call.done.wait()
+            return call.result
+        try:
+            call.result = self._fetch(key, city, units)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def _acquire_rate_slot(self) -> bool:
+        """
+        Reserve an upstream call within the per-minute quota
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now < self._cooldown_until:
+                return False
+            while self._calls and now - self._calls[0] >= 60:
+                self._calls.popleft()
+            if len(self._calls) >= self.rate_limit_per_minute:
+                return False
+            self._calls.append(now)
+            self.stats["upstream_calls"] += 1
+            return True
+
+    def _stale(self, key: Tuple[str, str]) -> Optional[Dict]:
+        """
+        Cached data still inside the stale window, if any
+        """
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.stale_ttl:
+            return entry[1]
+        return None
+
+    def _params(self, city: str, units: str) -> Dict:
+        return {
+            'q': city,
+            'appid': self.api_key,
+            'units': units
+        }
+
+    def _check_response(self, response) -> Dict:
+        """
+        Honour 429 Retry-After and return the JSON body (requests or httpx response)
         """
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After", "60")
+            retry_after = float(retry_after) if retry_after.isdigit() else 60.0
+            with self._lock:
+                self._cooldown_until = time.monotonic() + retry_after
+        response.raise_for_status()
+        return response.json()
+
+    def _rate_limited(self, key: Tuple[str, str]) -> Optional[Dict]:
+        self._count("rate_limited")
+        print("Weather API rate limit reached, serving cached data if available")
+        return self._stale(key)
+
+    def _failed(self, key: Tuple[str, str], error: Exception) -> Optional[Dict]:
+        self._count("errors")
+        print(f"Error fetching weather data: {error}")
+        return self._stale(key)
+
+    def _new_async_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=WEATHER_POOL_SIZE, max_keepalive_connections=WEATHER_POOL_SIZE)
+        )
+
+    def _fetch(self, key: Tuple[str, str], city: str, units: str) -> Optional[Dict]:
+        if not self._acquire_rate_slot():
+            return self._rate_limited(key)
+        try:
+            with tracer.span("weather.api"):
+                response = self.session.get(self.base_url, params=self._params(city, units), timeout=self.timeout)
+                weather_data = self._check_response(response)
+        except Exception as e:
+            return self._failed(key, e)
+        self._store(key, weather_data)
+        return weather_data
+
+    async def _afetch(self, key: Tuple[str, str], city: str, units: str) -> Optional[Dict]:
+        if not self._acquire_rate_slot():
+            return self._rate_limited(key)
         try:
-            params = {
-                'q': city,
-                'appid': self.api_key,
-                'units': 'metric'
-            }
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.RequestException as e:
-            print(f"Error fetching weather data: {e}")
-            return None
-
-    def format_weather_data(self, weather_data: Dict) -> str:
+            client = shared_async_client(self._new_async_client)
+            with tracer.span("weather.api"):
+                response = await client.get(self.base_url, params=self._params(city, units))
+                weather_data = self._check_response(response)
+        except Exception as e:
+            return self._failed(key, e)
+        self._store(key, weather_data)
+        return weather_data
+
+    def _store(self, key: Tuple[str, str], weather_data: Dict):
+        with self._lock:
+            self._cache[key] = (time.monotonic(), weather_data)
+            self._cache.move_to_end(key)
+            while len(self._cache) > WEATHER_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def format_weather_data(self, weather_data: Dict, units: str = "metric") -> str:
         """
         Format weather data into a readable string
         """
@@ -33,11 +262,12 @@ class WeatherAPI:
 
         main = weather_data.get('main', {})
         weather = weather_data.get('weather', [{}])[0]
+        symbol = TEMPERATURE_UNITS.get(units, "°C")
         
         return f"""
         City: {weather_data.get('name')}
-        Temperature: {main.get('temp')}°C
-        Feels like: {main.get('feels_like')}°C
+        Temperature: {main.get('temp')}{symbol}
+        Feels like: {main.get('feels_like')}{symbol}
         Humidity: {main.get('humidity')}%
         Weather: {weather.get('description')}
         """
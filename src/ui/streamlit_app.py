@@ -1,5 +1,6 @@
 import sys
 import os
+import uuid
 
 # Add project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
@@ -8,33 +9,63 @@ import streamlit as st
 from src.graphs.workflow import WorkflowGraph
 
 
+@st.cache_resource
+def get_workflow() -> WorkflowGraph:
+    """Create the workflow once per process and reuse it across reruns"""
+    return WorkflowGraph()
+
+
 def main():
     st.title("Weather & Document Assistant")
     
     # Initialize workflow
-    workflow = WorkflowGraph()
+    workflow = get_workflow()
     
-    # Create chat interface
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
+    # Each browser session is one conversation thread; the workflow's
+    # checkpointer keeps its recent turns and a summary of older ones
+    if "thread_id" not in st.session_state:
+        st.session_state.thread_id = str(uuid.uuid4())
+    if st.sidebar.button("New conversation"):
+        workflow.clear_conversation(st.session_state.thread_id)
+        st.session_state.thread_id = str(uuid.uuid4())
 
-    # Display chat history
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
+    # Display the remembered part of the conversation
+    conversation = workflow.conversation(st.session_state.thread_id)
+    if conversation["summary"]:
+        st.caption(f"Earlier in this conversation: {conversation['summary']}")
+    for message in conversation["messages"]:
+        with st.chat_message("user" if message.type == "human" else "assistant"):
+            st.markdown(message.content)
 
     # Chat input
     if prompt := st.chat_input("What would you like to know?"):
-        # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": prompt})
         with st.chat_message("user"):
             st.markdown(prompt)
 
-        # Get response from workflow
+        # Stream the response from the workflow as it is generated
         with st.chat_message("assistant"):
-            response = workflow.run(prompt)
-            st.markdown(response["response"])
-            st.session_state.messages.append({"role": "assistant", "content": response["response"]})
+            final = {}
+
+            def tokens():
+                for event in workflow.stream(prompt, thread_id=st.session_state.thread_id):
+                    if event["type"] == "token":
+                        yield event["content"]
+                    elif event["type"] == "done":
+                        final.update(event)
+
+            streamed = st.write_stream(tokens())
+            response = final["response"]
+            if not streamed:
+                # Weather answers and cached answers are not generated token by token
+                st.markdown(response)
+            metrics = final["metrics"]
+            if metrics["time_to_first_token"] is not None:
+                st.caption(f"First token {metrics['time_to_first_token']:.2f}s · "
+                           f"{metrics['tokens_per_sec']:.0f} tokens/s")
+            context = final.get("context")
+            if context and context["tokens_saved"]:
+                st.caption(f"Context {context['tokens_after']} tokens "
+                           f"({context['tokens_saved']} saved by packing)")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,10 @@
+import os
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+@pytest.fixture(autouse=True)
+def embedding_cache_in_tmp_path(tmp_path, monkeypatch):
+    """Keep the on-disk embedding cache of any VectorStore a test builds out of the checkout"""
+    monkeypatch.setattr('src.tools.vector_store.EMBEDDING_CACHE_PATH', str(tmp_path / "embeddings.sqlite"))
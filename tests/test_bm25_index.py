@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.bm25_index import BM25Index, tokenize
+
+class TestBM25Index(unittest.TestCase):
+    def setUp(self):
+        self.index = BM25Index()
+        self.index.add(
+            ["a", "b", "c"],
+            ["The XR-200 pump manual covers maintenance.",
+             "Maintenance schedules for pumps and valves.",
+             "Quarterly report on revenue and growth."]
+        )
+
+    def test_tokenize_keeps_codes_together(self):
+        self.assertEqual(tokenize("Order XR-200 and v1.2 now"), ["order", "xr-200", "and", "v1.2", "now"])
+
+    def test_exact_term_ranks_first(self):
+        results = self.index.search("xr-200", limit=3)
+
+        self.assertEqual([doc_id for doc_id, _ in results], ["a"])
+
+    def test_rare_terms_weigh_more(self):
+        results = self.index.search("maintenance pump", limit=3)
+
+        self.assertEqual([doc_id for doc_id, _ in results], ["a", "b"])
+        self.assertGreater(results[0][1], results[1][1])
+
+    def test_replace_and_remove(self):
+        self.index.add(["a"], ["Nothing relevant here"])
+        self.index.remove(["b"])
+
+        self.assertEqual(self.index.search("maintenance", limit=3), [])
+        self.assertEqual(len(self.index), 2)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "bm25.npz")
+            self.index.path = path
+            self.index.save()
+
+            loaded = BM25Index(path)
+            self.assertEqual(len(loaded), 3)
+            self.assertEqual(loaded.search("revenue growth", limit=2), self.index.search("revenue growth", limit=2))
+
+            # Writes after loading keep the persisted documents
+            loaded.add(["d"], ["Revenue forecast"])
+            self.assertEqual([doc_id for doc_id, _ in loaded.search("revenue", limit=5)], ["d", "c"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+import threading
+import asyncio
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.clients import shared_async_client, shared_client, clear_clients
+
+class TestSharedClients(unittest.TestCase):
+    def tearDown(self):
+        clear_clients()
+
+    def test_same_arguments_share_instance(self):
+        factory = Mock(side_effect=lambda **kwargs: object())
+
+        first = shared_client(factory, host="localhost", port=6333)
+        second = shared_client(factory, port=6333, host="localhost")
+
+        self.assertIs(first, second)
+        factory.assert_called_once_with(host="localhost", port=6333)
+
+    def test_different_arguments_get_different_instances(self):
+        factory = Mock(side_effect=lambda **kwargs: object())
+
+        first = shared_client(factory, model="a")
+        second = shared_client(factory, model="b")
+
+        self.assertIsNot(first, second)
+
+    def test_concurrent_first_use_creates_one_instance(self):
+        factory = Mock(side_effect=lambda: object())
+        results = []
+
+        threads = [threading.Thread(target=lambda: results.append(shared_client(factory))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        factory.assert_called_once()
+        self.assertEqual(len({id(r) for r in results}), 1)
+
+    def test_factory_can_create_shared_clients(self):
+        inner_factory = Mock(side_effect=lambda: object())
+
+        class Outer:
+            def __init__(self):
+                self.inner = shared_client(inner_factory)
+
+        outer = shared_client(Outer)
+
+        self.assertIs(outer.inner, shared_client(inner_factory))
+
+    def test_slow_factory_does_not_block_other_clients(self):
+        release = threading.Event()
+        slow_factory = Mock(side_effect=lambda: release.wait(5) and object())
+        fast_factory = Mock(side_effect=lambda: object())
+        slow = threading.Thread(target=shared_client, args=(slow_factory,))
+        slow.start()
+        try:
+            while not slow_factory.called:
+                threading.Event().wait(0.001)
+            fast = threading.Thread(target=shared_client, args=(fast_factory,))
+            fast.start()
+            fast.join(1)
+
+            self.assertFalse(fast.is_alive())
+            fast_factory.assert_called_once()
+        finally:
+            release.set()
+            slow.join()
+
+    def test_async_clients_are_per_event_loop(self):
+        factory = Mock(side_effect=lambda: object())
+
+        async def get():
+            return shared_async_client(factory), shared_async_client(factory)
+
+        first, same = asyncio.run(get())
+        other, _ = asyncio.run(get())
+
+        self.assertIs(first, same)
+        self.assertIsNot(first, other)
+
+    def test_clear_clients(self):
+        factory = Mock(side_effect=lambda: object())
+        first = shared_client(factory)
+        clear_clients()
+        self.assertIsNot(first, shared_client(factory))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.context_packer import ContextPacker, estimate_tokens
+
+def hit(text, score, **metadata):
+    return {"text": text, "score": score, "metadata": metadata}
+
+class TestContextPacker(unittest.TestCase):
+
+    def test_estimate_tokens(self):
+        """Test the ~4 characters per token estimate"""
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("abcd"), 1)
+        self.assertEqual(estimate_tokens("abcde"), 2)
+
+    def test_drops_hits_below_threshold(self):
+        """Test that weak hits are dropped"""
+        packer = ContextPacker(score_threshold=0.5)
+        passages, stats = packer.pack([hit("strong match", 0.8), hit("weak match", 0.2)])
+        
+        self.assertEqual([p["text"] for p in passages], ["strong match"])
+        self.assertEqual(stats["dropped_low_score"], 1)
+        
+        # A per-call threshold overrides the default
+        passages, _ = packer.pack([hit("weak match", 0.2)], score_threshold=float("-inf"))
+        self.assertEqual(len(passages), 1)
+
+    def test_merges_overlapping_chunks_by_offset(self):
+        """Test that chunks from the same page are stitched back together"""
+        text = "The quick brown fox jumps over the lazy dog near the river bank."
+        hits = [
+            hit(text[20:45], 0.7, source="a.pdf", page=0, start_index=20),
+            hit(text[0:30], 0.9, source="a.pdf", page=0, start_index=0),
+            hit(text[45:], 0.6, source="a.pdf", page=0, start_index=45),
+            hit(text[0:30], 0.5, source="a.pdf", page=1, start_index=0)
+        ]
+        
+        passages, stats = ContextPacker().pack(hits)
+        
+        self.assertEqual(passages[0]["text"], text)
+        self.assertEqual(passages[0]["score"], 0.9)
+        self.assertEqual(passages[0]["metadata"]["start_index"], 0)
+        # The same text on another page is a duplicate, not a merge
+        self.assertEqual(len(passages), 1)
+        self.assertEqual((stats["merged"], stats["deduplicated"]), (2, 1))
+
+    def test_merges_overlapping_chunks_by_text(self):
+        """Test the text overlap fallback for chunks stored without offsets"""
+        shared = "splitter overlap that both chunks share"
+        hits = [hit(f"{shared} and the second half.", 0.8, source="a.pdf", page=0),
+                hit(f"The first half and the {shared}", 0.6, source="a.pdf", page=0)]
+        
+        passages, stats = ContextPacker().pack(hits)
+        
+        self.assertEqual([p["text"] for p in passages], [f"The first half and the {shared} and the second half."])
+        self.assertEqual(stats["merged"], 1)
+
+    def test_deduplicates_near_identical_passages(self):
+        """Test that near-identical passages keep only the best scoring copy"""
+        base = "Quarterly revenue grew by twelve percent while operating costs fell slightly"
+        hits = [hit(base + " overall.", 0.6, source="a.pdf", page=1),
+                hit(base + " overall!", 0.9, source="b.pdf", page=4),
+                hit("Headcount stayed flat across all regions.", 0.5, source="a.pdf", page=2)]
+        
+        passages, stats = ContextPacker().pack(hits)
+        
+        self.assertEqual([p["metadata"]["source"] for p in passages], ["b.pdf", "a.pdf"])
+        self.assertEqual(stats["deduplicated"], 1)
+
+    def test_packs_best_passages_into_budget(self):
+        """Test that lower ranked passages are dropped once the budget is used"""
+        hits = [hit("a" * 40, 0.9, page=1), hit("b" * 40, 0.8, page=2), hit("c" * 40, 0.7, page=3)]
+        
+        passages, stats = ContextPacker(token_budget=20).pack(hits)
+        
+        self.assertEqual([p["text"][0] for p in passages], ["a", "b"])
+        self.assertEqual(stats["dropped_over_budget"], 1)
+        self.assertEqual((stats["tokens_before"], stats["tokens_after"], stats["tokens_saved"]), (30, 20, 10))
+
+    def test_truncates_single_oversized_passage(self):
+        """Test that the best passage is truncated rather than sending no context"""
+        passages, stats = ContextPacker(token_budget=5).pack([hit("x" * 100, 0.9)])
+        
+        self.assertEqual(passages[0]["text"], "x" * 20)
+        self.assertEqual(stats["tokens_after"], 5)
+
+    def test_running_stats(self):
+        """Test that tokens saved accumulate across queries"""
+        packer = ContextPacker(token_budget=10)
+        packer.pack([hit("a" * 40, 0.9, page=1), hit("b" * 40, 0.8, page=2)])
+        packer.pack([])
+        
+        self.assertEqual(packer.stats, {"queries": 2, "tokens_before": 20, "tokens_after": 10, "tokens_saved": 10})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import Mock
+import asyncio
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
+from src.tools.conversation_memory import ConversationMemory
+
+def turns(count: int):
+    messages = []
+    for i in range(count):
+        messages += [HumanMessage(content=f"question {i}", id=f"q{i}"), AIMessage(content=f"answer {i}", id=f"a{i}")]
+    return messages
+
+class TestConversationMemory(unittest.TestCase):
+
+    def test_recent_turns_need_no_summary(self):
+        memory = ConversationMemory(window_turns=3, token_budget=1000)
+        summarize = Mock()
+
+        update = memory.update(turns(2), "", "question 2", "answer 2", summarize)
+
+        summarize.assert_not_called()
+        self.assertEqual([m.content for m in update["messages"]], ["question 2", "answer 2"])
+        self.assertEqual(update["summary"], "")
+
+    def test_oldest_turns_are_folded_into_summary(self):
+        memory = ConversationMemory(window_turns=3, token_budget=1000)
+        summarize = Mock(return_value="User asked questions 0 and 1.")
+
+        update = memory.update(turns(3), "User asked question 0.", "question 3", "answer 3", summarize)
+
+        prompt = summarize.call_args[0][0]
+        self.assertIn("User asked question 0.", prompt)
+        self.assertIn("User: question 0\nAssistant: answer 0", prompt)
+        self.assertNotIn("question 1", prompt)
+        removals = [m for m in update["messages"] if isinstance(m, RemoveMessage)]
+        self.assertEqual([m.id for m in removals], ["q0", "a0"])
+        self.assertEqual(update["summary"], "User asked questions 0 and 1.")
+
+    def test_token_budget_evicts_long_turns(self):
+        memory = ConversationMemory(window_turns=10, token_budget=50, summary_tokens=5)
+        long_answer = "word " * 100
+
+        update = memory.update(turns(1), "", "question 1", long_answer, lambda prompt: "a very long summary " * 10)
+
+        # The new turn alone is over budget, so nothing is kept verbatim
+        self.assertEqual([m.id for m in update["messages"]], ["q0", "a0"])
+        self.assertLessEqual(len(update["summary"]), 5 * 4 + 4)
+
+    def test_render(self):
+        memory = ConversationMemory()
+
+        self.assertEqual(memory.render([], ""), "")
+        self.assertEqual(memory.render(turns(1), "Talked about pumps."),
+                         "Summary of earlier conversation: Talked about pumps.\nUser: question 0\nAssistant: answer 0")
+
+    def test_async_update(self):
+        memory = ConversationMemory(window_turns=1)
+
+        async def summarize(prompt):
+            return "summary"
+
+        update = asyncio.run(memory.aupdate(turns(1), "", "question 1", "answer 1", summarize))
+
+        self.assertEqual(update["summary"], "summary")
+        self.assertEqual([type(m) for m in update["messages"]], [RemoveMessage, RemoveMessage, HumanMessage, AIMessage])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import tempfile
+import zipfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools import document_loaders
+from src.tools.document_loaders import (
+    document_format, docx_to_text, html_to_text, is_supported, load_document, register_loader
+)
+
+DOCX_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+  <w:body>
+    <w:p><w:r><w:t>Quarterly</w:t></w:r><w:r><w:t xml:space="preserve"> report</w:t></w:r></w:p>
+    <w:p><w:r><w:t>Revenue</w:t><w:tab/><w:t>12%</w:t></w:r></w:p>
+    <w:tbl><w:tr><w:tc><w:p><w:r><w:t>Cell text</w:t></w:r></w:p></w:tc></w:tr></w:tbl>
+  </w:body>
+</w:document>"""
+
+class TestDocumentLoaders(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_formats_by_extension_and_mime_type(self):
+        """Test that files are matched by extension, then by MIME type"""
+        self.assertEqual(document_format("notes.MD"), ".md")
+        self.assertEqual(document_format("page.htm"), ".html")
+        self.assertEqual(document_format("report.docx"), ".docx")
+        self.assertEqual(document_format("upload", mime_type="text/plain"), ".txt")
+        self.assertIsNone(document_format("image.png"))
+        self.assertTrue(is_supported("sample_document.pdf"))
+        self.assertFalse(is_supported("archive.zip"))
+        with self.assertRaises(ValueError):
+            load_document("image.png")
+
+    def test_text_and_markdown(self):
+        """Test that text formats are chunked with offsets and no PDF rendering"""
+        paragraph = "Retrieval works on chunks of text. " * 20
+        path = self.write("notes.txt", f"{paragraph}\n\n{paragraph}\n\n{paragraph}")
+        with patch.object(document_loaders, "PDFLoader") as mock_pdf_loader:
+            chunks = load_document(path)
+        mock_pdf_loader.assert_not_called()
+
+        self.assertGreater(len(chunks), 1)
+        text = open(path, encoding="utf-8").read()
+        for chunk in chunks:
+            self.assertEqual(chunk.metadata["source"], path)
+            start = chunk.metadata["start_index"]
+            self.assertEqual(text[start:start + len(chunk.page_content)], chunk.page_content)
+
+        # Markdown is split at headings before paragraphs
+        section = "Details of the section. " * 30
+        path = self.write("guide.md", f"# Guide\n\n## Install\n\n{section}\n\n## Usage\n\n{section}")
+        chunks = load_document(path)
+        self.assertTrue(any(chunk.page_content.startswith("## Usage") for chunk in chunks))
+
+    def test_html(self):
+        """Test that visible HTML text is extracted with block structure"""
+        html = ("<html><head><title>Pumps</title><style>p {color: red}</style></head>"
+                "<body><h1>Model&nbsp;XR-200</h1><p>Replace the   seal &amp; valve.</p>"
+                "<script>var x = 1;</script><ul><li>Step one</li><li>Step two</li></ul></body></html>")
+
+        self.assertEqual(html_to_text(html),
+                         "Pumps\n\nModel\xa0XR-200\n\nReplace the seal & valve.\n\nStep one\n\nStep two")
+        chunks = load_document(self.write("pump.html", html))
+        self.assertEqual(len(chunks), 1)
+        self.assertNotIn("color", chunks[0].page_content)
+
+    def test_docx(self):
+        """Test that paragraph text is read from the document XML"""
+        path = os.path.join(self.tmp_dir.name, "report.docx")
+        with zipfile.ZipFile(path, "w") as archive:
+            archive.writestr("word/document.xml", DOCX_XML)
+
+        self.assertEqual(docx_to_text(path), "Quarterly report\n\nRevenue\t12%\n\nCell text")
+        chunks = load_document(path)
+        self.assertEqual(chunks[0].metadata["source"], path)
+
+    def test_register_loader(self):
+        """Test that new formats can be registered"""
+        def load_csv(path):
+            return document_loaders.split_text(path, open(path, encoding="utf-8").read().replace(",", " "))
+
+        with patch.dict(document_loaders.LOADERS), patch.dict(document_loaders.EXTENSIONS), \
+                patch.dict(document_loaders.MIME_TYPES):
+            register_loader(["csv"], load_csv, ["text/csv"])
+            chunks = load_document(self.write("table.csv", "a,b\n1,2"))
+            self.assertEqual(chunks[0].page_content, "a b\n1 2")
+            self.assertEqual(document_format("data", mime_type="text/csv"), ".csv")
+        self.assertFalse(is_supported("table.csv"))
+
+    def test_sample_documents(self):
+        """Test loading the shipped sample documents"""
+        docs_dir = os.path.join(os.path.dirname(__file__), '..', 'data', 'documents')
+        for name in ("sample_document.md", "sample_document.pdf"):
+            path = os.path.join(docs_dir, name)
+            if not os.path.exists(path):
+                continue
+            chunks = load_document(path)
+            self.assertGreater(len(chunks), 0)
+            self.assertTrue(any("Machine Learning" in chunk.page_content for chunk in chunks))
+
+if __name__ == '__main__':
+    unittest.main()
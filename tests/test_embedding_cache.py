@@ -0,0 +1,162 @@
+import unittest
+from unittest.mock import AsyncMock, Mock
+import asyncio
+import sys
+import os
+import tempfile
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.embedding_cache import CachedEmbeddings, LRUCache, SQLiteVectorCache
+
+def make_embeddings():
+    """Mock embeddings returning a distinct vector per text"""
+    mock_embeddings = Mock()
+    mock_embeddings.embed_query.side_effect = lambda text: [float(len(text)), 1.0]
+    mock_embeddings.embed_documents.side_effect = lambda texts: [[float(len(t)), 0.0] for t in texts]
+    return mock_embeddings
+
+class TestEmbeddingCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.disk_path = os.path.join(self.tmp_dir.name, "cache.sqlite")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_repeated_query_hits_memory(self):
+        mock_embeddings = make_embeddings()
+        cache = CachedEmbeddings(mock_embeddings, model="test-model")
+
+        first = cache.embed_query("What is AI?")
+        second = cache.embed_query("What is AI?")
+
+        self.assertEqual(first, second)
+        mock_embeddings.embed_query.assert_called_once_with("What is AI?")
+        self.assertEqual(cache.stats, {"memory_hits": 1, "disk_hits": 0, "misses": 1})
+        self.assertEqual(cache.hit_rate, 0.5)
+
+    def test_embed_documents_only_embeds_misses(self):
+        mock_embeddings = make_embeddings()
+        cache = CachedEmbeddings(mock_embeddings, model="test-model")
+
+        cache.embed_documents(["a", "bb"])
+        vectors = cache.embed_documents(["bb", "ccc", "ccc"])
+
+        mock_embeddings.embed_documents.assert_called_with(["ccc"])
+        self.assertEqual(vectors, [[2.0, 0.0], [3.0, 0.0], [3.0, 0.0]])
+
+    def test_query_and_document_embeddings_are_cached_separately(self):
+        mock_embeddings = make_embeddings()
+        cache = CachedEmbeddings(mock_embeddings, model="test-model")
+
+        cache.embed_documents(["same text"])
+        cache.embed_query("same text")
+
+        mock_embeddings.embed_query.assert_called_once()
+
+    def test_embed_queries_batches_misses(self):
+        calls = []
+
+        class TaskTypeEmbeddings:
+            def embed_query(self, text):
+                return [float(len(text)), 1.0]
+
+            def embed_documents(self, texts, task_type=None):
+                calls.append((texts, task_type))
+                return [[float(len(t)), 1.0] for t in texts]
+
+        cache = CachedEmbeddings(TaskTypeEmbeddings(), model="test-model")
+        cache.embed_query("a")
+
+        vectors = cache.embed_queries(["a", "bb", "ccc"])
+
+        self.assertEqual(calls, [(["bb", "ccc"], "RETRIEVAL_QUERY")])
+        self.assertEqual(vectors, [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0]])
+        self.assertEqual(cache.embed_query("bb"), [2.0, 1.0])
+
+    def test_embed_queries_falls_back_to_embed_query(self):
+        mock_embeddings = make_embeddings()
+        cache = CachedEmbeddings(mock_embeddings, model="test-model")
+
+        vectors = cache.embed_queries(["a", "bb"])
+
+        self.assertEqual(vectors, [[1.0, 1.0], [2.0, 1.0]])
+        mock_embeddings.embed_documents.assert_not_called()
+
+    def test_disk_tier_persists_across_instances(self):
+        cache = CachedEmbeddings(make_embeddings(), model="test-model", disk_path=self.disk_path)
+        cache.embed_documents(["persisted"])
+        cache.disk.close()
+
+        mock_embeddings = make_embeddings()
+        reopened = CachedEmbeddings(mock_embeddings, model="test-model", disk_path=self.disk_path)
+        vectors = reopened.embed_documents(["persisted"])
+
+        mock_embeddings.embed_documents.assert_not_called()
+        self.assertEqual(vectors, [[9.0, 0.0]])
+        self.assertEqual(reopened.stats["disk_hits"], 1)
+        reopened.disk.close()
+
+    def test_async_disk_tier_runs_off_the_event_loop(self):
+        mock_embeddings = make_embeddings()
+        mock_embeddings.aembed_query = AsyncMock(return_value=[1.0, 1.0])
+        cache = CachedEmbeddings(mock_embeddings, model="test-model", disk_path=self.disk_path)
+        self.addCleanup(cache.disk.close)
+        disk_threads = []
+        for name in ("get_many", "put_many"):
+            method = getattr(cache.disk, name)
+            setattr(cache.disk, name, lambda *args, method=method: disk_threads.append(threading.get_ident())
+                    or method(*args))
+
+        async def embed():
+            vector = await cache.aembed_query("What is AI?")
+            cache.memory = LRUCache(10)
+            return vector, await cache.aembed_query("What is AI?"), threading.get_ident()
+
+        first, second, loop_thread = asyncio.run(embed())
+
+        self.assertEqual(first, second)
+        mock_embeddings.aembed_query.assert_awaited_once()
+        self.assertEqual(cache.stats, {"memory_hits": 0, "disk_hits": 1, "misses": 1})
+        self.assertEqual(len(disk_threads), 3)
+        self.assertNotIn(loop_thread, disk_threads)
+
+    def test_model_name_is_part_of_key(self):
+        cache = CachedEmbeddings(make_embeddings(), model="model-a", disk_path=self.disk_path)
+        cache.embed_query("hello")
+        cache.disk.close()
+
+        mock_embeddings = make_embeddings()
+        other = CachedEmbeddings(mock_embeddings, model="model-b", disk_path=self.disk_path)
+        other.embed_query("hello")
+
+        mock_embeddings.embed_query.assert_called_once()
+        other.disk.close()
+
+    def test_lru_evicts_least_recently_used(self):
+        lru = LRUCache(max_entries=2)
+        lru.put("a", [1.0])
+        lru.put("b", [2.0])
+        lru.get("a")
+        lru.put("c", [3.0])
+
+        self.assertIsNotNone(lru.get("a"))
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(len(lru), 2)
+
+    def test_disk_tier_evicts_by_size(self):
+        # Each two-dimensional float32 vector takes 8 bytes
+        disk = SQLiteVectorCache(self.disk_path, max_bytes=16)
+        disk.put_many({"a": [1.0, 1.0]})
+        disk.put_many({"b": [2.0, 2.0]})
+        disk.get_many(["a"])
+        disk.put_many({"c": [3.0, 3.0]})
+
+        found = disk.get_many(["a", "b", "c"])
+        self.assertEqual(set(found), {"a", "c"})
+        self.assertLessEqual(disk.total_bytes, 16)
+        disk.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.agents.gazetteer import extract_city, extract_slots
+
+class TestGazetteer(unittest.TestCase):
+
+    def test_extracts_known_city(self):
+        self.assertEqual(extract_city("What's the weather like in london?"), "London")
+
+    def test_prefers_longest_city_name(self):
+        self.assertEqual(extract_city("Weather in New Delhi today"), "New Delhi")
+        self.assertEqual(extract_city("Is it raining in New York?"), "New York")
+
+    def test_unknown_city(self):
+        self.assertIsNone(extract_city("What's the weather in Springfield?"))
+
+    def test_extracts_units_and_date(self):
+        slots = extract_slots("Temperature in Tokyo tomorrow in fahrenheit")
+        self.assertEqual(slots, {"city": "Tokyo", "units": "imperial", "date": "tomorrow"})
+
+    def test_missing_slots_are_none(self):
+        slots = extract_slots("Weather in Paris")
+        self.assertEqual(slots, {"city": "Paris", "units": None, "date": None})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.index_manifest import IndexManifest
+
+class TestIndexManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.manifest_path = os.path.join(self.tmp_dir.name, "manifest.json")
+        self.doc_path = os.path.join(self.tmp_dir.name, "doc.txt")
+        with open(self.doc_path, "w") as f:
+            f.write("original content")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_new_file_is_changed(self):
+        manifest = IndexManifest(self.manifest_path)
+        self.assertEqual(manifest.check(self.doc_path), IndexManifest.file_hash(self.doc_path))
+
+    def test_indexed_file_is_unchanged_after_reload(self):
+        manifest = IndexManifest(self.manifest_path)
+        sha256 = manifest.check(self.doc_path)
+        manifest.update(self.doc_path, sha256, ["a", "b"])
+        manifest.save()
+
+        reloaded = IndexManifest(self.manifest_path)
+        self.assertIsNone(reloaded.check(self.doc_path))
+        self.assertEqual(reloaded.chunk_ids(self.doc_path), ["a", "b"])
+
+    def test_touched_file_with_same_content_is_unchanged(self):
+        manifest = IndexManifest(self.manifest_path)
+        manifest.update(self.doc_path, manifest.check(self.doc_path), ["a"])
+        os.utime(self.doc_path, (0, 0))
+        self.assertIsNone(manifest.check(self.doc_path))
+
+    def test_modified_file_is_changed(self):
+        manifest = IndexManifest(self.manifest_path)
+        manifest.update(self.doc_path, manifest.check(self.doc_path), ["a"])
+        with open(self.doc_path, "w") as f:
+            f.write("new and longer content")
+        self.assertIsNotNone(manifest.check(self.doc_path))
+
+if __name__ == '__main__':
+    unittest.main()
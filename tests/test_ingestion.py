@@ -0,0 +1,183 @@
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+import tempfile
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain.docstore.document import Document
+from src.tools.index_manifest import IndexManifest
+from src.tools.ingestion import IngestionPipeline
+from src.tools.vector_store import VectorStore
+
+def fake_parse(path):
+    """Return two fake chunks for a path"""
+    doc = Mock()
+    doc.page_content = f"Content of {path}"
+    doc.metadata = {"source": path}
+    return path, [doc, doc], 0.01
+
+def parse_lines(path):
+    """Return one chunk per line of a text file"""
+    with open(path) as f:
+        chunks = [Document(page_content=line.strip(), metadata={"source": path}) for line in f]
+    return path, chunks, 0.01
+
+class TestIngestionPipeline(unittest.TestCase):
+
+    def test_ingests_all_files(self):
+        """Test that every file is parsed and stored"""
+        mock_vector_store = Mock()
+        mock_vector_store.store_documents.side_effect = lambda chunks: {"chunks": len(chunks)}
+        progress = []
+
+        pipeline = IngestionPipeline(mock_vector_store, parse_workers=2, embed_workers=2,
+                                     parse_fn=fake_parse, use_processes=False)
+        stats = pipeline.run([f"doc{i}.pdf" for i in range(10)],
+                             progress=lambda done, total, path: progress.append(done))
+
+        self.assertEqual(stats["files_done"], 10)
+        self.assertEqual(stats["chunks"], 20)
+        self.assertEqual(stats["files_failed"], 0)
+        self.assertEqual(mock_vector_store.store_documents.call_count, 10)
+        mock_vector_store.flush.assert_called_once()
+        self.assertEqual(progress, list(range(1, 11)))
+        self.assertGreater(stats["parse_seconds"], 0)
+        self.assertEqual(stats["formats"][".pdf"]["files"], 10)
+        self.assertEqual(stats["formats"][".pdf"]["chunks"], 20)
+
+    def test_backpressure_bounds_files_in_flight(self):
+        """Test that slow storage limits how many files are parsed ahead"""
+        lock = threading.Lock()
+        counters = {"parsed": 0, "stored": 0, "peak": 0}
+
+        def counting_parse(path):
+            with lock:
+                counters["parsed"] += 1
+                counters["peak"] = max(counters["peak"], counters["parsed"] - counters["stored"])
+            return fake_parse(path)
+
+        def slow_store(chunks):
+            time.sleep(0.01)
+            with lock:
+                counters["stored"] += 1
+            return {"chunks": len(chunks)}
+
+        mock_vector_store = Mock()
+        mock_vector_store.store_documents.side_effect = slow_store
+
+        pipeline = IngestionPipeline(mock_vector_store, parse_workers=2, embed_workers=1,
+                                     queue_size=2, parse_fn=counting_parse, use_processes=False)
+        stats = pipeline.run([f"doc{i}.pdf" for i in range(20)])
+
+        self.assertEqual(stats["files_done"], 20)
+        self.assertLessEqual(counters["peak"], 4)
+
+    def test_failed_file_is_reported(self):
+        """Test that a parse failure is recorded without stopping the run"""
+        def flaky_parse(path):
+            if path == "bad.pdf":
+                raise ValueError("corrupt file")
+            return fake_parse(path)
+
+        mock_vector_store = Mock()
+        mock_vector_store.store_documents.side_effect = lambda chunks: {"chunks": len(chunks)}
+
+        pipeline = IngestionPipeline(mock_vector_store, parse_fn=flaky_parse, use_processes=False)
+        stats = pipeline.run(["good.pdf", "bad.pdf"])
+
+        self.assertEqual(stats["files_done"], 1)
+        self.assertEqual(stats["files_failed"], 1)
+        self.assertIn("corrupt file", stats["errors"]["bad.pdf"])
+
+    def test_process_pool_with_sample_pdf(self):
+        """Test parsing the sample PDF in a worker process"""
+        pdf_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'documents', 'sample_document.pdf')
+        if not os.path.exists(pdf_path):
+            self.skipTest("Sample PDF not found")
+
+        mock_vector_store = Mock()
+        mock_vector_store.store_documents.side_effect = lambda chunks: {"chunks": len(chunks)}
+
+        pipeline = IngestionPipeline(mock_vector_store, parse_workers=1, embed_workers=1)
+        stats = pipeline.run([pdf_path])
+
+        self.assertEqual(stats["files_done"], 1, stats["errors"])
+        self.assertGreater(stats["chunks"], 0)
+
+    def test_mixed_formats(self):
+        """Test that text formats go through the same pipeline with per-format metrics"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = []
+            for name, content in [("a.md", "# Title\n\nSome text."), ("b.txt", "Plain text."),
+                                  ("c.html", "<p>Web page</p>")]:
+                path = os.path.join(tmp_dir, name)
+                with open(path, "w") as f:
+                    f.write(content)
+                paths.append(path)
+
+            mock_vector_store = Mock()
+            mock_vector_store.store_documents.side_effect = lambda chunks: {"chunks": len(chunks)}
+
+            pipeline = IngestionPipeline(mock_vector_store, use_processes=False)
+            stats = pipeline.run(paths)
+
+            self.assertEqual(stats["files_done"], 3, stats["errors"])
+            self.assertEqual(sorted(stats["formats"]), [".html", ".md", ".txt"])
+            self.assertEqual(stats["formats"][".txt"]["bytes"], len("Plain text."))
+            self.assertEqual(stats["formats"][".html"]["chunks"], 1)
+            stored = [call[0][0][0].page_content for call in mock_vector_store.store_documents.call_args_list]
+            self.assertIn("Web page", stored)
+
+    def test_incremental_reindexing(self):
+        """Test that unchanged files are skipped and only changed chunks are touched"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            paths = []
+            for name in ("a.txt", "b.txt"):
+                path = os.path.join(tmp_dir, name)
+                with open(path, "w") as f:
+                    f.write(f"{name} first\n{name} second\n")
+                paths.append(path)
+
+            mock_vector_store = Mock()
+            mock_vector_store.point_id.side_effect = VectorStore.point_id
+            mock_vector_store.store_documents.side_effect = lambda chunks: {"chunks": len(chunks)}
+            manifest_path = os.path.join(tmp_dir, "manifest.json")
+
+            def run():
+                pipeline = IngestionPipeline(mock_vector_store, parse_fn=parse_lines, use_processes=False,
+                                             manifest=IndexManifest(manifest_path))
+                return pipeline.run(paths)
+
+            stats = run()
+            self.assertEqual(stats["chunks"], 4)
+
+            # Nothing changed: everything is skipped
+            mock_vector_store.store_documents.reset_mock()
+            stats = run()
+            self.assertEqual(stats["files_skipped"], 2)
+            mock_vector_store.store_documents.assert_not_called()
+
+            # Change one line of one file
+            with open(paths[0], "w") as f:
+                f.write("a.txt first\na.txt edited\n")
+            mock_vector_store.delete_points.reset_mock()
+            stats = run()
+            self.assertEqual(stats["files_skipped"], 1)
+            self.assertEqual(stats["chunks"], 1)
+            self.assertEqual(stats["chunks_deleted"], 1)
+            stored = mock_vector_store.store_documents.call_args[0][0]
+            self.assertEqual([c.page_content for c in stored], ["a.txt edited"])
+            deleted = mock_vector_store.delete_points.call_args[0][0]
+            self.assertEqual(deleted, [VectorStore.point_id(
+                Document(page_content="a.txt second", metadata={"source": paths[0]}))])
+
+            # Removing a file deletes its chunks
+            stats = IngestionPipeline(mock_vector_store, parse_fn=parse_lines, use_processes=False,
+                                      manifest=IndexManifest(manifest_path)).run(paths[:1])
+            self.assertEqual(stats["chunks_deleted"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from unittest.mock import patch
+import json
+import subprocess
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.lazy_import import LazyImport
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HEAVY_MODULES = ["langgraph", "qdrant_client", "langchain_google_genai", "langsmith"]
+
+class TestLazyImport(unittest.TestCase):
+
+    def test_imports_on_first_use(self):
+        """Test that the target is imported when called or read, not when declared"""
+        dumps = LazyImport("json", "dumps")
+        self.assertIn("json.dumps>", repr(dumps))
+        self.assertEqual(dumps([1]), "[1]")
+        self.assertIn("(loaded)", repr(dumps))
+        self.assertEqual(LazyImport("os.path").join("a", "b"), os.path.join("a", "b"))
+        with self.assertRaises(ImportError):
+            LazyImport("no_such_module_here").load()
+
+    @patch('src.tools.vector_store.QdrantClient')
+    def test_module_level_names_can_be_patched(self, mock_client):
+        """Test that patching a lazy name replaces it for the module"""
+        from src.tools import vector_store
+        self.assertIs(vector_store.QdrantClient, mock_client)
+
+    def test_workflow_import_is_light(self):
+        """Test that importing and constructing the workflow loads no heavy SDK"""
+        code = (
+            "import json, sys\n"
+            "from src.graphs.workflow import WorkflowGraph\n"
+            "workflow = WorkflowGraph()\n"
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))\n"
+        )
+        output = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True,
+                                text=True, check=True).stdout
+        self.assertEqual(json.loads(output.splitlines()[-1]), [])
+
+if __name__ == '__main__':
+    unittest.main()
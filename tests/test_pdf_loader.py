@@ -4,11 +4,46 @@ import os
 import tempfile
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from src.tools.pdf_loader import PDFLoader
+from src.tools.pdf_loader import PDFLoader, read_page_range
+from src.tools.text_splitter import FastTextSplitter
+
+def write_pdf(path, pages):
+    """Write a minimal PDF with the given lines of Helvetica text on each page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        shown = " ".join("(" + line.replace("(", "\\(").replace(")", "\\)") + ") Tj T*" for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 20 760 Td {shown} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+    body, offsets = b"%PDF-1.4\n", []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    body += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(body)
+
+def page_lines(page: int, count: int):
+    return [f"Page {page} line {line} about topic {page * 100 + line} with some filler words" for line in range(count)]
 
 class TestPDFLoader(unittest.TestCase):
     def setUp(self):
         self.pdf_loader = PDFLoader()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def make_pdf(self, pages):
+        path = os.path.join(self.tmp_dir.name, "test.pdf")
+        write_pdf(path, pages)
+        return path
 
     def test_pdf_loader_initialization(self):
         """Test that PDFLoader initializes correctly"""
@@ -35,5 +70,74 @@ class TestPDFLoader(unittest.TestCase):
         else:
             self.skipTest("Sample PDF not found")
 
+    def test_iter_chunks_carries_text_across_pages(self):
+        """Test that chunk offsets point into the page each chunk starts on"""
+        pages = [page_lines(0, 25), page_lines(1, 2), [], page_lines(3, 30)]
+        path = self.make_pdf(pages)
+        texts = read_page_range(path, 0, len(pages))
+        
+        chunks = list(self.pdf_loader.iter_chunks(path))
+        
+        self.assertEqual(texts[2], "")
+        for chunk in chunks:
+            page, start = chunk.metadata["page"], chunk.metadata["start_index"]
+            on_page = texts[page][start:]
+            self.assertTrue(chunk.page_content.startswith(on_page[:len(chunk.page_content)]))
+            self.assertLessEqual(len(chunk.page_content), 1000)
+            self.assertEqual((chunk.metadata["source"], chunk.metadata["total_pages"]), (path, 4))
+        # The short second page is chunked together with the end of the first
+        spanning = [c for c in chunks if "Page 0 line 24" in c.page_content and "Page 1 line 1" in c.page_content]
+        self.assertEqual(len(spanning), 1)
+        self.assertEqual(spanning[0].metadata["page"], 0)
+        self.assertNotIn(1, [c.metadata["page"] for c in chunks])
+        # Every line is in some chunk
+        for lines in pages:
+            for line in lines:
+                self.assertTrue(any(line in c.page_content for c in chunks), line)
+
+    def test_held_back_text_spanning_pages_keeps_page_offsets(self):
+        """Test chunks starting after a page break inside the held-back text"""
+        texts = [("aaaa " * 30).strip(), "bb", "cc", ("dd " * 10).strip(), ("ee " * 40).strip()]
+        self.pdf_loader.text_splitter = FastTextSplitter(50, 10)
+        self.pdf_loader.iter_pages = lambda pdf_path: ((n, text, len(texts)) for n, text in enumerate(texts))
+
+        chunks = list(self.pdf_loader.iter_chunks("short_pages.pdf"))
+
+        for chunk in chunks:
+            page, start = chunk.metadata["page"], chunk.metadata["start_index"]
+            self.assertLess(start, len(texts[page]))
+            self.assertTrue(chunk.page_content.startswith(texts[page][start:start + len(chunk.page_content)]))
+        # "bb\n\ncc\n\ndd ..." starts on the second page, inside the text held back from the first
+        self.assertIn(("bb", 1, 0), [(c.page_content[:2], c.metadata["page"], c.metadata["start_index"])
+                                     for c in chunks])
+
+    def test_iter_chunks_is_lazy(self):
+        """Test that chunks are yielded before later pages are read"""
+        read = []
+        
+        def fake_pages(pdf_path):
+            for number in range(100):
+                read.append(number)
+                yield number, "\n".join(page_lines(number, 25)), 100
+        
+        self.pdf_loader.iter_pages = fake_pages
+        chunks = self.pdf_loader.iter_chunks("big.pdf")
+        first = next(chunks)
+        
+        self.assertEqual(first.metadata["page"], 0)
+        self.assertEqual(read, [0])
+        chunks.close()
+
+    def test_parallel_page_ranges_match_sequential(self):
+        """Test that reading page ranges in worker processes gives the same chunks"""
+        path = self.make_pdf([page_lines(page, 12) for page in range(7)])
+        
+        sequential = PDFLoader().load_and_split(path)
+        parallel = PDFLoader(page_workers=2, pages_per_task=2).load_and_split(path)
+        
+        self.assertEqual([(c.page_content, c.metadata) for c in parallel],
+                         [(c.page_content, c.metadata) for c in sequential])
+        self.assertEqual(sequential[-1].metadata["page"], 6)
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from unittest.mock import patch, Mock
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.reranker import Reranker, maximal_marginal_relevance
+
+def hit(text, score, vector=None):
+    result = {"text": text, "score": score, "metadata": {}}
+    if vector is not None:
+        result["vector"] = vector
+    return result
+
+class TestMaximalMarginalRelevance(unittest.TestCase):
+
+    def test_prefers_diverse_candidates(self):
+        """Test that a near-duplicate of the best hit is passed over"""
+        relevance = [0.9, 0.89, 0.7]
+        vectors = [[1.0, 0.0], [0.99, 0.1], [0.0, 1.0]]
+        
+        self.assertEqual(maximal_marginal_relevance(relevance, vectors, 2, lambda_mult=0.5), [0, 2])
+        # lambda 1.0 ranks by relevance only
+        self.assertEqual(maximal_marginal_relevance(relevance, vectors, 2, lambda_mult=1.0), [0, 1])
+
+    def test_normalized_scores(self):
+        """Test that scores on other scales are min-max normalized"""
+        relevance = [12.0, 11.0, 3.0]
+        vectors = [[1.0, 0.0], [1.0, 0.0], [0.0, 1.0]]
+        
+        # Raw BM25 scores would swamp the similarity penalty
+        self.assertEqual(maximal_marginal_relevance(relevance, vectors, 2, lambda_mult=0.5), [0, 1])
+        self.assertEqual(maximal_marginal_relevance(relevance, vectors, 2, lambda_mult=0.5, normalize=True), [0, 2])
+
+    def test_candidates_without_vectors(self):
+        """Test that candidates without vectors are ranked by relevance alone"""
+        order = maximal_marginal_relevance([0.2, 0.8, 0.5], [None, [1.0, 0.0], None], 3, lambda_mult=0.5)
+        
+        self.assertEqual(order, [1, 2, 0])
+
+    def test_limits(self):
+        """Test empty input, equal scores and limits beyond the candidate count"""
+        self.assertEqual(maximal_marginal_relevance([], [], 5), [])
+        self.assertEqual(maximal_marginal_relevance([0.5, 0.5], [None, None], 0), [])
+        self.assertEqual(sorted(maximal_marginal_relevance([0.5, 0.5], [None, None], 5)), [0, 1])
+
+class TestReranker(unittest.TestCase):
+
+    def test_rerank_with_mmr(self):
+        """Test that reranking keeps top_k hits without their vectors"""
+        hits = [hit("revenue 2023", 0.9, [1.0, 0.0]), hit("revenue in 2023", 0.88, [1.0, 0.05]),
+                hit("costs 2023", 0.8, [0.0, 1.0]), hit("appendix", 0.3, [0.7, 0.7])]
+        
+        reranked, timings = Reranker(top_k=2, mmr_lambda=0.5).rerank("revenue", hits)
+        
+        self.assertEqual([h["text"] for h in reranked], ["revenue 2023", "costs 2023"])
+        self.assertNotIn("vector", reranked[0])
+        self.assertIn("vector", hits[0])
+        self.assertEqual(list(timings), ["mmr"])
+
+    @patch('src.tools.reranker.CrossEncoder')
+    def test_rerank_with_cross_encoder(self, mock_cross_encoder):
+        """Test that a configured cross-encoder rescores the candidates"""
+        mock_cross_encoder.return_value.predict.return_value = [-2.0, 5.0, 1.0]
+        hits = [hit("first", 0.9), hit("second", 0.8), hit("third", 0.7)]
+        reranker = Reranker(top_k=2, mmr_lambda=1.0, model_name="cross-encoder/test")
+        
+        reranked, timings = reranker.rerank("query", hits)
+        reranker.rerank("query", hits)
+        
+        mock_cross_encoder.assert_called_once_with("cross-encoder/test")
+        mock_cross_encoder.return_value.predict.assert_called_with(
+            [("query", "first"), ("query", "second"), ("query", "third")])
+        self.assertEqual([h["text"] for h in reranked], ["second", "third"])
+        # The search score is kept for context packing
+        self.assertEqual((reranked[0]["score"], reranked[0]["rerank_score"]), (0.8, 5.0))
+        self.assertEqual(set(timings), {"cross_encoder", "mmr"})
+
+    @patch('src.tools.reranker.CrossEncoder', None)
+    @patch('builtins.print')
+    def test_missing_cross_encoder_package(self, mock_print):
+        """Test that reranking falls back to search scores without sentence-transformers"""
+        reranker = Reranker(top_k=1, model_name="cross-encoder/test")
+        
+        reranked, timings = reranker.rerank("query", [hit("low", 0.2), hit("high", 0.9)])
+        
+        self.assertEqual(reranked[0]["text"], "high")
+        self.assertEqual(list(timings), ["mmr"])
+        mock_print.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
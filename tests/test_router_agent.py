@@ -1,5 +1,6 @@
 import unittest
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, AsyncMock
+import asyncio
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -61,5 +62,185 @@ class TestRouterAgent(unittest.TestCase):
         self.assertEqual(result[0], "document")
         self.assertEqual(result[1], "Some ambiguous query")
 
+    def test_confident_weather_query_skips_llm(self):
+        mock_llm = Mock()
+        self.router.llm = mock_llm
+        
+        decision = self.router.route("Will it be raining in Paris tomorrow?")
+        
+        self.assertEqual(decision["route"], "weather")
+        self.assertEqual(decision["tier"], "rules")
+        self.assertGreaterEqual(decision["confidence"], self.router.confidence_threshold)
+        mock_llm.invoke.assert_not_called()
+
+    def test_confident_document_query_skips_llm(self):
+        mock_llm = Mock()
+        self.router.llm = mock_llm
+        
+        decision = self.router.route("Summarize the report in the PDF")
+        
+        self.assertEqual(decision["route"], "document")
+        self.assertEqual(decision["tier"], "rules")
+        mock_llm.invoke.assert_not_called()
+
+    def test_topical_question_skips_llm(self):
+        mock_llm = Mock()
+        self.router.llm = mock_llm
+        
+        decisions = [self.router.route(query) for query in ["Tell me about artificial intelligence",
+                                                            "What are transformers?"]]
+        
+        self.assertEqual([(d["route"], d["tier"]) for d in decisions], [("document", "rules")] * 2)
+        mock_llm.invoke.assert_not_called()
+
+    def test_ambiguous_query_escalates_to_llm(self):
+        mock_llm = Mock()
+        mock_llm.invoke.return_value = Mock(content="weather")
+        self.router.llm = mock_llm
+        
+        decision = self.router.route("Is it hot in Cairo?")
+        
+        self.assertEqual(decision["route"], "weather")
+        self.assertEqual(decision["tier"], "llm")
+        mock_llm.invoke.assert_called_once()
+        self.assertEqual(self.router.stats["llm"]["decided"], 1)
+        self.assertEqual(self.router.stats["rules"]["decided"], 0)
+        self.assertGreater(self.router.stats["rules"]["seconds"], 0)
+
+    def test_conflicting_terms_escalate_to_llm(self):
+        mock_llm = Mock()
+        mock_llm.invoke.return_value = Mock(content="document")
+        self.router.llm = mock_llm
+        
+        decision = self.router.route("What does the report say about weather patterns?")
+        
+        self.assertEqual(decision["tier"], "llm")
+        self.assertEqual(decision["route"], "document")
+
+    def test_weather_query_with_known_city_needs_no_llm(self):
+        mock_llm = Mock()
+        self.router.llm = mock_llm
+        
+        decision = self.router.route("What's the weather in Tokyo tomorrow?")
+        
+        self.assertEqual(decision["slots"], {"city": "Tokyo", "units": None, "date": "tomorrow"})
+        mock_llm.invoke.assert_not_called()
+
+    def test_structured_route_extracts_slots_in_one_call(self):
+        mock_llm = Mock()
+        mock_llm.invoke.return_value = Mock(
+            content='```json\n{"route": "weather", "city": "Springfield", "units": "imperial", "date": null}\n```'
+        )
+        self.router.llm = mock_llm
+        
+        decision = self.router.route("What's the weather in Springfield?")
+        
+        self.assertEqual(decision["route"], "weather")
+        self.assertEqual(decision["tier"], "llm")
+        self.assertEqual(decision["slots"], {"city": "Springfield", "units": "imperial", "date": None})
+        mock_llm.invoke.assert_called_once()
+
+    def test_unknown_units_fall_back_to_metric(self):
+        mock_llm = Mock()
+        mock_llm.invoke.return_value = Mock(content='{"route": "weather", "city": "Springfield", "units": "celsius"}')
+        self.router.llm = mock_llm
+
+        decision = self.router.route("What's the weather in Springfield?")
+        mock_llm.invoke.return_value = Mock(content='{"route": "weather", "city": "Springfield", "units": "F"}')
+        fahrenheit = self.router.route("How many degrees fahrenheit is it in Springfield?")
+
+        self.assertEqual(decision["slots"]["units"], "metric")
+        # Units named in the query win over an invalid LLM value
+        self.assertEqual(fahrenheit["slots"]["units"], "imperial")
+
+    def test_follow_up_is_rewritten_with_history(self):
+        mock_llm = Mock()
+        mock_llm.invoke.return_value = Mock(
+            content='{"route": "document", "query": "What does the XR-200 manual say about the seal?"}'
+        )
+        self.router.llm = mock_llm
+        history = "User: Which seal does the XR-200 use?\nAssistant: A ceramic seal."
+
+        decision = self.router.route("What does the manual say about that?", history)
+
+        # Document terms alone would have decided the route locally
+        self.assertEqual(decision["tier"], "llm")
+        self.assertEqual(decision["query"], "What does the XR-200 manual say about the seal?")
+        self.assertIn(history, mock_llm.invoke.call_args.args[0][0].content)
+        # Without history the rules decide and the query is searched as asked
+        decision = self.router.route("What does the manual say about that?")
+        self.assertEqual((decision["tier"], decision["query"]), ("rules", "What does the manual say about that?"))
+        mock_llm.invoke.assert_called_once()
+
+    def test_self_contained_queries_with_history_skip_llm(self):
+        mock_llm = Mock()
+        self.router.llm = mock_llm
+        history = "User: What's the weather in Paris?\nAssistant: Sunny, 21°C."
+
+        decisions = [self.router.route(query, history) for query in [
+            "Is it raining in Tokyo?",
+            "What's the weather in London and Paris?",
+            "Tell me about the safety section of the XR-200 pump manual"
+        ]]
+
+        self.assertEqual([d["tier"] for d in decisions], ["rules"] * 3)
+        mock_llm.invoke.assert_not_called()
+        self.assertTrue(self.router.is_follow_up("What about Berlin?"))
+        self.assertTrue(self.router.is_follow_up("What does it say about that?"))
+
+    def test_aroute_takes_city_from_rewritten_follow_up(self):
+        mock_llm = Mock()
+        mock_llm.ainvoke = AsyncMock(return_value=Mock(
+            content='{"route": "weather", "query": "Will it rain in Tokyo tomorrow?", "date": "tomorrow"}'
+        ))
+        self.router.llm = mock_llm
+
+        decision = asyncio.run(self.router.aroute("And tomorrow?", "User: Weather in Tokyo?\nAssistant: Sunny."))
+
+        self.assertEqual(decision["query"], "Will it rain in Tokyo tomorrow?")
+        self.assertEqual(decision["slots"], {"city": "Tokyo", "units": None, "date": "tomorrow"})
+
+    def test_non_string_slots_fall_back_to_local_values(self):
+        mock_llm = Mock()
+        mock_llm.invoke.return_value = Mock(content='{"route": "weather", "city": 42, "units": ["metric"], "date": {}}')
+        self.router.llm = mock_llm
+
+        decision = self.router.route("Is it hot in Tokyo tomorrow?")
+
+        self.assertEqual(decision["route"], "weather")
+        self.assertEqual(decision["slots"], {"city": "Tokyo", "units": None, "date": "tomorrow"})
+
+    def test_route_batch_sends_ambiguous_queries_in_one_call(self):
+        mock_llm = Mock()
+        mock_llm.batch.return_value = [Mock(content='{"route": "weather", "city": "Cairo"}'),
+                                       Mock(content='{"route": "document"}')]
+        self.router.llm = mock_llm
+        
+        decisions = self.router.route_batch([
+            "Is it hot in Cairo?",
+            "What's the weather in Tokyo?",
+            "What does the report say about weather patterns?"
+        ], max_concurrency=4)
+        
+        self.assertEqual([d["route"] for d in decisions], ["weather", "weather", "document"])
+        self.assertEqual([d["tier"] for d in decisions], ["llm", "rules", "llm"])
+        self.assertEqual(decisions[0]["slots"]["city"], "Cairo")
+        mock_llm.batch.assert_called_once()
+        self.assertEqual(len(mock_llm.batch.call_args[0][0]), 2)
+        self.assertEqual(mock_llm.batch.call_args[1]["config"], {"max_concurrency": 4})
+        mock_llm.invoke.assert_not_called()
+
+    def test_aroute_uses_async_llm(self):
+        mock_llm = Mock()
+        mock_llm.ainvoke = AsyncMock(return_value=Mock(content='{"route": "document"}'))
+        self.router.llm = mock_llm
+        
+        decision = asyncio.run(self.router.aroute("What does the report say about weather patterns?"))
+        
+        self.assertEqual(decision["route"], "document")
+        self.assertEqual(decision["tier"], "llm")
+        mock_llm.ainvoke.assert_awaited_once()
+        mock_llm.invoke.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.semantic_cache import SemanticCache
+
+class TestSemanticCache(unittest.TestCase):
+
+    def test_similar_query_hits(self):
+        cache = SemanticCache(threshold=0.95)
+        cache.add([1.0, 0.0], "cached answer")
+
+        self.assertEqual(cache.lookup([0.99, 0.05]), "cached answer")
+        self.assertEqual(cache.stats["hits"], 1)
+
+    def test_dissimilar_query_misses(self):
+        cache = SemanticCache(threshold=0.95)
+        cache.add([1.0, 0.0], "cached answer")
+
+        self.assertIsNone(cache.lookup([0.0, 1.0]))
+        self.assertEqual(cache.hit_rate, 0.0)
+
+    def test_entries_expire(self):
+        cache = SemanticCache(ttl_seconds=10)
+        with patch('src.tools.semantic_cache.time.time', return_value=1000.0):
+            cache.add([1.0, 0.0], "cached answer")
+        with patch('src.tools.semantic_cache.time.time', return_value=1011.0):
+            self.assertIsNone(cache.lookup([1.0, 0.0]))
+        self.assertEqual(len(cache), 0)
+
+    def test_generation_change_invalidates(self):
+        cache = SemanticCache()
+        cache.add([1.0, 0.0], "cached answer", generation=1)
+
+        self.assertEqual(cache.lookup([1.0, 0.0], generation=1), "cached answer")
+        self.assertIsNone(cache.lookup([1.0, 0.0], generation=2))
+        self.assertEqual(cache.stats["invalidations"], 1)
+
+    def test_max_entries_evicts_least_recently_used(self):
+        cache = SemanticCache(max_entries=2)
+        cache.add([1.0, 0.0, 0.0], "a")
+        cache.add([0.0, 1.0, 0.0], "b")
+        cache.lookup([1.0, 0.0, 0.0])
+        cache.add([0.0, 0.0, 1.0], "c")
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.lookup([1.0, 0.0, 0.0]), "a")
+        self.assertIsNone(cache.lookup([0.0, 1.0, 0.0]))
+
+    def test_namespaces_are_separate(self):
+        cache = SemanticCache()
+        cache.add([1.0, 0.0], "acme answer", namespace="acme")
+        cache.add([1.0, 0.0], "globex answer", namespace="globex")
+
+        self.assertEqual(cache.lookup([1.0, 0.0], namespace="acme"), "acme answer")
+        self.assertEqual(cache.lookup([1.0, 0.0], namespace="globex"), "globex answer")
+        self.assertIsNone(cache.lookup([1.0, 0.0]))
+
+if __name__ == '__main__':
+    unittest.main()
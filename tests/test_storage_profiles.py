@@ -0,0 +1,103 @@
+import unittest
+from unittest.mock import patch, Mock
+import sys
+import os
+import tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.documents import Document
+from qdrant_client.http import models
+from src.tools.local_index import LocalVectorIndex
+from src.tools.storage_profiles import (
+    collection_config, estimate_bytes_per_chunk, get_profile, search_params, slim_payload
+)
+from src.tools.vector_store import QdrantBackend, VectorStore
+
+class TestStorageProfiles(unittest.TestCase):
+    def test_default_profile_keeps_server_defaults(self):
+        config = collection_config(get_profile("default"), 768)
+
+        self.assertEqual(list(config), ["vectors_config"])
+        self.assertEqual(config["vectors_config"].size, 768)
+        self.assertIsNone(config["vectors_config"].on_disk)
+        self.assertIsNone(search_params(get_profile("default")))
+
+    def test_compact_profile(self):
+        profile = get_profile("compact")
+        config = collection_config(profile, 768)
+
+        self.assertTrue(config["vectors_config"].on_disk)
+        self.assertTrue(config["on_disk_payload"])
+        self.assertIsInstance(config["quantization_config"], models.ScalarQuantization)
+        self.assertEqual(config["hnsw_config"].m, 8)
+        params = search_params(profile)
+        self.assertTrue(params.quantization.rescore)
+        self.assertEqual(params.quantization.oversampling, 2.0)
+        self.assertEqual(params.hnsw_ef, 128)
+
+    def test_binary_profile_uses_binary_quantization(self):
+        config = collection_config(get_profile("binary"), 768)
+
+        self.assertIsInstance(config["quantization_config"], models.BinaryQuantization)
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ValueError):
+            get_profile("tiny")
+
+    def test_memory_estimates(self):
+        default = estimate_bytes_per_chunk(get_profile("default"), 768, payload_bytes=1000)
+        scalar = estimate_bytes_per_chunk(get_profile("scalar"), 768, payload_bytes=1000)
+        binary = estimate_bytes_per_chunk(get_profile("binary"), 768, payload_bytes=1000)
+
+        self.assertEqual(default["ram"], 768 * 4 + 128 + 1000)
+        self.assertEqual(scalar["ram"], 768 + 128 + 1000)
+        self.assertEqual(binary["ram"], 96 + 128 + 1000)
+
+    def test_slim_payload(self):
+        payload = {"text": "long chunk", "metadata": {"source": "a.pdf", "page": 3, "producer": "x"}}
+
+        self.assertEqual(slim_payload(payload), {"metadata": {"source": "a.pdf", "page": 3}})
+
+    def test_qdrant_backend_creates_collection_with_profile(self):
+        client = Mock()
+        client.get_collection.side_effect = Exception("Collection not found")
+        client.query_points.return_value = Mock(points=[])
+
+        backend = QdrantBackend(client, collection_name="test", profile="scalar")
+        backend.ensure_collection(768)
+        backend.search([0.1] * 768, limit=3)
+
+        kwargs = client.create_collection.call_args[1]
+        self.assertIsInstance(kwargs["quantization_config"], models.ScalarQuantization)
+        self.assertTrue(client.query_points.call_args[1]["search_params"].quantization.rescore)
+
+class TestSlimPayloads(unittest.TestCase):
+    @patch('src.tools.vector_store.EMBEDDING_CACHE_PATH', None)
+    @patch('src.tools.vector_store.BM25_INDEX_PATH', "")
+    @patch('src.tools.vector_store.STORE_VERSION_PATH', "")
+    @patch('src.tools.vector_store.GoogleGenerativeAIEmbeddings')
+    def test_text_lives_in_chunk_store(self, mock_embeddings):
+        """Test that slim payloads drop the text and search restores it"""
+        mock_embeddings.return_value.embed_documents.side_effect = lambda texts: [
+            [float(i == n) for i in range(768)] for n, _ in enumerate(texts)
+        ]
+        mock_embeddings.return_value.embed_query.return_value = [1.0] + [0.0] * 767
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        backend = LocalVectorIndex(os.path.join(tmp_dir.name, "index"))
+
+        with patch('src.tools.vector_store.CHUNK_STORE_PATH', os.path.join(tmp_dir.name, "chunks.sqlite")):
+            vector_store = VectorStore(backend=backend, profile="compact")
+        doc = Document(page_content="Python is a language", metadata={"source": "a.pdf", "page": 0, "creator": "x"})
+        vector_store.store_documents([doc, Document(page_content="Other", metadata={"source": "a.pdf"})])
+
+        hits = backend.search([1.0] + [0.0] * 767, limit=1)
+        self.assertEqual(hits[0][1], {"metadata": {"source": "a.pdf", "page": 0}, "tenant": "default"})
+        results = vector_store.search("python", limit=1)
+        self.assertEqual(results[0]["text"], "Python is a language")
+
+        vector_store.delete_points([VectorStore.point_id(doc)])
+        self.assertEqual(vector_store.chunk_store.get_many([VectorStore.point_id(doc)]), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.tools.tenancy import (
+    check_tenant, payload_matches, payload_value, tenant_collection, tenant_path, tenant_where
+)
+
+class TestTenancy(unittest.TestCase):
+
+    def test_check_tenant(self):
+        self.assertEqual(check_tenant(None), "default")
+        self.assertEqual(check_tenant("acme-eu_1"), "acme-eu_1")
+        for tenant in ("", "a/b", "a b", "x" * 65, 7):
+            with self.assertRaises(ValueError):
+                check_tenant(tenant)
+
+    def test_default_tenant_keeps_existing_names(self):
+        self.assertEqual(tenant_collection("default", "kb"), "kb")
+        self.assertEqual(tenant_collection("acme", "kb"), "kb__acme")
+        self.assertEqual(tenant_path("data/bm25_index.npz", "default"), "data/bm25_index.npz")
+        self.assertEqual(tenant_path("data/bm25_index.npz", "acme"), "data/bm25_index.acme.npz")
+        self.assertEqual(tenant_path("data/local_index", "acme"), "data/local_index.acme")
+        self.assertEqual(tenant_path("", "acme"), "")
+
+    def test_payload_matches(self):
+        payload = {"tenant": "acme", "metadata": {"source": "a.pdf", "page": 3}}
+
+        self.assertEqual(payload_value(payload, "metadata.page"), 3)
+        self.assertIsNone(payload_value(payload, "metadata.page.x"))
+        self.assertTrue(payload_matches(payload, tenant_where("acme")))
+        self.assertFalse(payload_matches(payload, tenant_where("globex")))
+        self.assertTrue(payload_matches(payload, {"metadata.source": "a.pdf", "metadata.page": [1, 3]}))
+        self.assertFalse(payload_matches(payload, {"metadata.source": "a.pdf", "metadata.page": 1}))
+        self.assertTrue(payload_matches(payload, None))
+        # Points stored before tenants existed belong to the default tenant
+        self.assertTrue(payload_matches({"metadata": {}}, tenant_where("default")))
+        self.assertFalse(payload_matches({"metadata": {}}, tenant_where("acme")))
+
+if __name__ == '__main__':
+    unittest.main()
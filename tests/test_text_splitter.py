@@ -0,0 +1,80 @@
+import unittest
+import random
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from src.tools.text_splitter import FastTextSplitter, TokenTextSplitter
+from src.tools.context_packer import estimate_tokens
+
+def random_text(rng, words):
+    """Words, line breaks, paragraph breaks, whitespace runs and a few very long tokens"""
+    parts = []
+    for _ in range(words):
+        roll = rng.random()
+        if roll < 0.03:
+            parts.append("\n\n")
+        elif roll < 0.08:
+            parts.append("\n")
+        elif roll < 0.1:
+            parts.append("  ")
+        elif roll < 0.105:
+            parts.append("x" * rng.randint(50, 1500))
+        else:
+            parts.append("".join(rng.choice("abcdefghij") for _ in range(rng.randint(1, 12))))
+        parts.append(rng.choice([" ", "", " ", "\t"]))
+    return "".join(parts)
+
+class TestFastTextSplitter(unittest.TestCase):
+
+    def test_matches_recursive_character_splitter(self):
+        """Test the chunks are identical to LangChain's splitter"""
+        rng = random.Random(0)
+        texts = ["", "   ", "short text", "\n\nleading and trailing\n\n"]
+        texts += [random_text(rng, rng.randint(0, 3000)) for _ in range(40)]
+        for chunk_size, chunk_overlap in [(1000, 200), (100, 20), (50, 0), (10, 5), (7, 7)]:
+            expected = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+            splitter = FastTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+            for text in texts:
+                self.assertEqual(splitter.split_text(text), expected.split_text(text))
+
+    def test_token_splitter_matches_with_token_length(self):
+        """Test the token-aware variant against LangChain's splitter with the same length function"""
+        rng = random.Random(1)
+        expected = RecursiveCharacterTextSplitter(chunk_size=64, chunk_overlap=16, length_function=estimate_tokens)
+        splitter = TokenTextSplitter(chunk_size=64, chunk_overlap=16)
+        for _ in range(20):
+            text = random_text(rng, 2000)
+            self.assertEqual(splitter.split_text(text), expected.split_text(text))
+            self.assertTrue(all(estimate_tokens(chunk) <= 64 for chunk in splitter.split_text(text)))
+
+    def test_offsets(self):
+        """Test chunk offsets are exact, including for repeated text"""
+        text = "same paragraph here\n\n" * 30
+        splitter = FastTextSplitter(chunk_size=50, chunk_overlap=20)
+        documents = splitter.create_documents([text], [{"source": "a.pdf"}])
+
+        self.assertEqual([doc.page_content for doc in documents], splitter.split_text(text))
+        for doc, (start, end) in zip(documents, splitter.split_spans(text)):
+            self.assertEqual(text[start:end], doc.page_content)
+            self.assertEqual(doc.metadata, {"source": "a.pdf", "start_index": start, "end_index": end})
+        starts = [doc.metadata["start_index"] for doc in documents]
+        self.assertEqual(starts, sorted(set(starts)))
+
+    def test_start_index_matches_recursive_character_splitter(self):
+        """Test start_index agrees with LangChain's on non-repetitive text"""
+        text = "\n\n".join(" ".join(f"word{p}_{w}" for w in range(40)) for p in range(20))
+        expected = RecursiveCharacterTextSplitter(chunk_size=200, chunk_overlap=50, add_start_index=True)
+        splitter = FastTextSplitter(chunk_size=200, chunk_overlap=50)
+
+        self.assertEqual([doc.metadata["start_index"] for doc in splitter.create_documents([text])],
+                         [doc.metadata["start_index"] for doc in expected.create_documents([text])])
+
+    def test_rejects_overlap_larger_than_chunk(self):
+        """Test invalid sizes are rejected"""
+        with self.assertRaises(ValueError):
+            FastTextSplitter(chunk_size=10, chunk_overlap=20)
+
+if __name__ == '__main__':
+    unittest.main()
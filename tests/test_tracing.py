@@ -0,0 +1,185 @@
+import unittest
+from unittest.mock import patch, Mock
+import asyncio
+import io
+import json
+import sys
+import os
+import tempfile
+import urllib.request
+from contextlib import redirect_stdout
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import AIMessage
+from src.graphs.workflow import WorkflowGraph
+from src.tools import tracing
+from src.tools.tracing import Tracer, summarize, token_usage, tracer
+
+class TestTracer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.trace_path = os.path.join(self.tmp_dir.name, "traces", "trace.jsonl")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read_spans(self):
+        with open(self.trace_path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_nested_spans_share_a_trace(self):
+        """Test that spans record parents, attributes and errors"""
+        local_tracer = Tracer(trace_path=self.trace_path)
+        with local_tracer.span("workflow") as root:
+            with local_tracer.span("embed"):
+                local_tracer.annotate(cache_hit=True)
+            with self.assertRaises(ValueError):
+                with local_tracer.span("search"):
+                    raise ValueError("backend down")
+        local_tracer.annotate(ignored=True)
+
+        spans = {span["name"]: span for span in self.read_spans()}
+        self.assertEqual(spans["embed"]["parent_id"], root.span_id)
+        self.assertEqual({span["trace_id"] for span in spans.values()}, {root.trace_id})
+        self.assertIsNone(spans["workflow"]["parent_id"])
+        self.assertEqual(spans["embed"]["attributes"], {"cache_hit": True})
+        self.assertEqual(spans["search"]["error"], "ValueError: backend down")
+        self.assertGreaterEqual(spans["workflow"]["duration"], spans["embed"]["duration"])
+
+    def test_concurrent_tasks_have_separate_traces(self):
+        """Test that each asyncio task keeps its own current span"""
+        local_tracer = Tracer(trace_path=self.trace_path)
+
+        async def request(i):
+            with local_tracer.span("workflow", request=i):
+                await asyncio.sleep(0.01)
+                with local_tracer.span("llm.generate", request=i):
+                    await asyncio.sleep(0.01)
+
+        async def run():
+            await asyncio.gather(*[request(i) for i in range(5)])
+
+        asyncio.run(run())
+        spans = self.read_spans()
+        roots = {span["attributes"]["request"]: span for span in spans if span["name"] == "workflow"}
+        for span in spans:
+            if span["name"] == "llm.generate":
+                self.assertEqual(span["parent_id"], roots[span["attributes"]["request"]]["span_id"])
+
+    def test_summary_and_prometheus(self):
+        """Test percentiles and the Prometheus exposition"""
+        local_tracer = Tracer(trace_path=None)
+        for i in range(101):
+            span = tracing.Span("search", None, {})
+            span.duration = 0.001 * i
+            local_tracer._record(span)
+        with local_tracer.span("llm.generate", input_tokens=120, output_tokens=30):
+            pass
+        with local_tracer.span("response_cache", cache_hit=False):
+            pass
+
+        summary = local_tracer.summary()
+        self.assertEqual(summary["search"]["count"], 101)
+        self.assertAlmostEqual(summary["search"]["p50"], 0.05)
+        self.assertAlmostEqual(summary["search"]["p95"], 0.095)
+        self.assertAlmostEqual(summary["search"]["p99"], 0.099)
+
+        metrics = local_tracer.prometheus()
+        self.assertIn('rag_span_duration_seconds_count{span="search"} 101', metrics)
+        self.assertIn('rag_span_duration_seconds_bucket{span="search",le="0.01"} 11', metrics)
+        self.assertIn('rag_span_duration_seconds_bucket{span="llm.generate",le="+Inf"} 1', metrics)
+        self.assertIn('rag_tokens_total{span="llm.generate",kind="input"} 120', metrics)
+        self.assertIn('rag_cache_lookups_total{span="response_cache",result="miss"} 1', metrics)
+
+    def test_metrics_endpoint(self):
+        """Test that /metrics serves the Prometheus text"""
+        local_tracer = Tracer(trace_path=None)
+        with local_tracer.span("weather", cache_hit=True):
+            pass
+        server = local_tracer.serve(0)
+        try:
+            self.assertIs(local_tracer.serve(0), server)
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                body = response.read().decode()
+            self.assertIn('rag_cache_lookups_total{span="weather",result="hit"} 1', body)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_workflow_survives_taken_metrics_port(self):
+        """Test that a metrics port already in use only prints a warning"""
+        taken = Tracer(trace_path=None).serve(0)
+        self.addCleanup(taken.server_close)
+        self.addCleanup(taken.shutdown)
+        port = taken.server_address[1]
+        local_tracer = Tracer(trace_path=None)
+
+        output = io.StringIO()
+        with patch('src.graphs.workflow.METRICS_PORT', port), patch('src.graphs.workflow.tracer', local_tracer), \
+                redirect_stdout(output):
+            workflow = WorkflowGraph()
+
+        self.assertIsNotNone(workflow.graph)
+        self.assertIn(f"Not serving metrics on port {port}", output.getvalue())
+
+    def test_cli_summary(self):
+        """Test the per-stage percentile summary of a trace file"""
+        local_tracer = Tracer(trace_path=self.trace_path)
+        for _ in range(3):
+            with local_tracer.span("embed"):
+                pass
+        local_tracer._file.close()
+
+        output = io.StringIO()
+        with patch.object(sys, "argv", ["tracing", self.trace_path]), redirect_stdout(output):
+            tracing.main()
+        lines = output.getvalue().splitlines()
+        self.assertIn("p95 ms", lines[0])
+        self.assertTrue(lines[1].startswith("embed") and lines[1].split()[1] == "3")
+        self.assertEqual(summarize(self.read_spans())["embed"]["count"], 3)
+
+    def test_token_usage(self):
+        """Test reading token counts from LLM responses"""
+        message = AIMessage(content="hi", usage_metadata={"input_tokens": 5, "output_tokens": 2, "total_tokens": 7})
+        self.assertEqual(token_usage(message), {"input_tokens": 5, "output_tokens": 2})
+        self.assertEqual(token_usage(Mock(content="hi")), {})
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_workflow_spans(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that a document query records node, stage and LLM spans in one trace"""
+        mock_vector_instance = Mock()
+        mock_vector_instance.search_mode = "dense"
+        mock_vector_instance.generation = 0
+        mock_vector_instance.embed_query.return_value = [0.1] * 768
+        mock_vector_instance.search.return_value = [{"text": "AI is a field.", "score": 0.9, "metadata": {}}]
+        mock_llm_instance = Mock()
+        mock_llm_instance.invoke.return_value = AIMessage(
+            content="AI is a field.", usage_metadata={"input_tokens": 40, "output_tokens": 5, "total_tokens": 45})
+
+        workflow = WorkflowGraph()
+        workflow.llm = mock_llm_instance
+        workflow.vector_store = mock_vector_instance
+        workflow.router = Mock()
+        workflow.router.route.return_value = {"route": "document", "query": "What is AI?", "tier": "rules"}
+
+        with patch.object(tracer, "trace_path", self.trace_path), patch.object(tracer, "_file", None):
+            workflow.run("What is AI?")
+            tracer._file.close()
+
+        spans = {span["name"]: span for span in self.read_spans()}
+        self.assertTrue({"workflow", "node.router", "node.processor", "embed", "response_cache",
+                         "search", "pack", "llm.generate"} <= set(spans))
+        self.assertEqual(len({span["trace_id"] for span in spans.values()}), 1)
+        self.assertEqual(spans["node.router"]["attributes"], {"route": "document", "tier": "rules"})
+        self.assertEqual(spans["response_cache"]["attributes"], {"cache_hit": False})
+        self.assertEqual(spans["llm.generate"]["attributes"], {"input_tokens": 40, "output_tokens": 5})
+        self.assertEqual(spans["llm.generate"]["parent_id"], spans["node.processor"]["span_id"])
+        self.assertIn("llm.generate", tracer.summary())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,467 @@
+import unittest
+from unittest.mock import patch, Mock, AsyncMock
+import asyncio
+import sys
+import os
+import tempfile
+import uuid
+import warnings
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from langchain_core.documents import Document
+from qdrant_client import QdrantClient, models
+from src.tools import local_index
+from src.tools.local_index import LocalVectorIndex
+from src.tools.vector_store import QdrantBackend, VectorStore
+
+def point(n: int) -> str:
+    return str(uuid.UUID(int=n))
+
+class BackendContract:
+    """Tests every vector backend must pass; subclasses provide make_backend"""
+
+    def make_backend(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        self.backend = self.make_backend()
+        self.assertTrue(self.backend.ensure_collection(4))
+        self.backend.upsert(
+            [point(1), point(2), point(3)],
+            [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0], [1.0, 1.0, 0.0, 0.0]],
+            [{"text": "x"}, {"text": "y"}, {"text": "xy", "metadata": {"page": 2}}]
+        )
+
+    def test_search_ranks_by_cosine_similarity(self):
+        hits = self.backend.search([2.0, 0.1, 0.0, 0.0], limit=2)
+
+        self.assertEqual([payload["text"] for _, payload, _ in hits], ["x", "xy"])
+        self.assertAlmostEqual(hits[0][2], 2.0 / np.hypot(2.0, 0.1), places=5)
+        self.assertAlmostEqual(hits[1][2], 2.1 / (np.hypot(2.0, 0.1) * np.sqrt(2)), places=5)
+
+    def test_limit_larger_than_collection(self):
+        hits = self.backend.search([0.0, 0.0, 1.0, 0.0], limit=10)
+
+        self.assertEqual(len(hits), 3)
+
+    def test_upsert_overwrites_existing_point(self):
+        self.backend.upsert([point(2)], [[0.0, 0.0, 1.0, 0.0]], [{"text": "z"}])
+
+        hits = self.backend.search([0.0, 0.0, 1.0, 0.0], limit=1)
+        self.assertEqual(hits[0][1], {"text": "z"})
+        self.assertEqual(len(self.backend.search([0.0, 1.0, 0.0, 0.0], limit=10)), 3)
+
+    def test_delete_removes_points(self):
+        self.backend.delete([point(1), point(3)])
+
+        hits = self.backend.search([1.0, 0.0, 0.0, 0.0], limit=5)
+        self.assertEqual([payload["text"] for _, payload, _ in hits], ["y"])
+
+    def test_search_batch_matches_search(self):
+        queries = [[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0]]
+
+        batched = self.backend.search_batch(queries, limit=2)
+
+        for query, hits in zip(queries, batched):
+            expected = self.backend.search(query, limit=2)
+            self.assertEqual([p for _, p, _ in hits], [p for _, p, _ in expected])
+
+    def test_asearch_matches_search(self):
+        hits = asyncio.run(self.backend.asearch([0.0, 1.0, 0.0, 0.0], limit=1))
+
+        self.assertEqual(hits[0][1], {"text": "y"})
+
+    def test_search_with_vectors(self):
+        hits = self.backend.search([1.0, 0.0, 0.0, 0.0], limit=2, with_vectors=True)
+        batched = self.backend.search_batch([[1.0, 0.0, 0.0, 0.0]], limit=2, with_vectors=True)[0]
+        ahits = asyncio.run(self.backend.asearch([1.0, 0.0, 0.0, 0.0], limit=2, with_vectors=True))
+
+        # Cosine collections store normalized vectors
+        np.testing.assert_allclose(hits[0][3], [1.0, 0.0, 0.0, 0.0], atol=1e-6)
+        np.testing.assert_allclose(hits[1][3], [2 ** -0.5, 2 ** -0.5, 0.0, 0.0], atol=1e-6)
+        self.assertEqual([hit[:3] for hit in batched], [hit[:3] for hit in hits])
+        self.assertEqual(len(ahits[1]), 4)
+        self.assertEqual(len(self.backend.search([1.0, 0.0, 0.0, 0.0], limit=1)[0]), 3)
+
+    def test_retrieve_by_id(self):
+        payloads = self.backend.retrieve([point(3), point(9)])
+
+        self.assertEqual(payloads, {point(3): {"text": "xy", "metadata": {"page": 2}}})
+
+    def test_ensure_collection_is_idempotent(self):
+        self.assertFalse(self.backend.ensure_collection(4))
+
+    def add_tenants(self):
+        self.backend.upsert(
+            [point(10), point(11), point(12)],
+            [[1.0, 0.0, 0.0, 0.0], [1.0, 0.1, 0.0, 0.0], [0.9, 0.3, 0.0, 0.0]],
+            [{"text": "a1", "tenant": "a", "metadata": {"source": "m.pdf", "page": 1}},
+             {"text": "a2", "tenant": "a", "metadata": {"source": "n.pdf", "page": 2}},
+             {"text": "b1", "tenant": "b", "metadata": {"source": "m.pdf", "page": 1}}]
+        )
+
+    def test_search_filtered_by_payload(self):
+        self.add_tenants()
+        query = [1.0, 0.0, 0.0, 0.0]
+
+        texts = lambda hits: sorted(payload["text"] for _, payload, *_ in hits)
+        self.assertEqual(texts(self.backend.search(query, limit=10, where={"tenant": "a"})), ["a1", "a2"])
+        self.assertEqual(texts(self.backend.search(query, limit=10, where={"tenant": "b"})), ["b1"])
+        self.assertEqual(self.backend.search(query, limit=10, where={"tenant": "c"}), [])
+        # None matches points without the field
+        self.assertEqual(texts(self.backend.search(query, limit=10, where={"tenant": ["b", None]})),
+                         ["b1", "x", "xy", "y"])
+        self.assertEqual(texts(self.backend.search(query, limit=10, where={"tenant": "a", "metadata.page": [2, 3]})),
+                         ["a2"])
+        batched = self.backend.search_batch([query, query], limit=1, where={"metadata.source": "m.pdf"})
+        self.assertEqual([texts(hits) for hits in batched], [["a1"], ["a1"]])
+        ahits = asyncio.run(self.backend.asearch(query, limit=1, where={"tenant": "b"}))
+        self.assertEqual(texts(ahits), ["b1"])
+
+    def test_delete_where(self):
+        self.add_tenants()
+
+        self.backend.delete_where({"tenant": "a"})
+
+        texts = sorted(payload["text"] for _, payload, _ in self.backend.search([1.0, 0.0, 0.0, 0.0], limit=10))
+        self.assertEqual(texts, ["b1", "x", "xy", "y"])
+
+    def test_drop_collection(self):
+        self.backend.drop_collection()
+        self.backend.ensure_collection(4)
+
+        self.assertEqual(self.backend.search([1.0, 0.0, 0.0, 0.0], limit=10), [])
+
+class TestQdrantBackend(BackendContract, unittest.TestCase):
+    def make_backend(self):
+        # In-memory Qdrant accepts payload indexes but warns that they have no effect
+        warnings.filterwarnings("ignore", message="Payload indexes have no effect")
+        return QdrantBackend(QdrantClient(":memory:"), collection_name="test")
+
+    def test_partitioned_collection_indexes_tenants(self):
+        client = Mock()
+        client.get_collection.side_effect = Exception("Collection not found")
+        QdrantBackend(client, collection_name="shared", partitioned=True).ensure_collection(4)
+
+        hnsw = client.create_collection.call_args.kwargs["hnsw_config"]
+        self.assertEqual((hnsw.m, hnsw.payload_m), (0, 16))
+        schemas = {c.kwargs["field_name"]: c.kwargs["field_schema"] for c in client.create_payload_index.call_args_list}
+        self.assertEqual(set(schemas), {"tenant", "metadata.source", "metadata.page"})
+        self.assertTrue(schemas["tenant"].is_tenant)
+        self.assertFalse(schemas["metadata.source"].is_tenant)
+
+    @patch('src.tools.vector_store.EMBEDDING_CACHE_PATH', None)
+    @patch('src.tools.vector_store.BM25_INDEX_PATH', "")
+    @patch('src.tools.vector_store.STORE_VERSION_PATH', "")
+    @patch('src.tools.vector_store.GoogleGenerativeAIEmbeddings')
+    def test_default_tenant_filter_skips_untagged_points_when_there_are_none(self, mock_embeddings):
+        def default_tenant_filter(existing_hnsw):
+            client = Mock()
+            if existing_hnsw is None:
+                client.get_collection.side_effect = Exception("Collection not found")
+            else:
+                client.get_collection.return_value.config.hnsw_config = existing_hnsw
+            client.query_points.return_value.points = []
+            backend = QdrantBackend(client, collection_name="shared", partitioned=True)
+            VectorStore(backend=backend, tenancy="payload").search("q", query_vector=[0.1] * 4)
+            return client.query_points.call_args.kwargs["query_filter"].must[0]
+
+        created = default_tenant_filter(None)
+        partitioned = default_tenant_filter(models.HnswConfigDiff(m=0, payload_m=16))
+        legacy = default_tenant_filter(models.HnswConfigDiff(m=16))
+
+        # Collections created with tenants only hold tagged points: one value, one tenant graph
+        for condition in (created, partitioned):
+            self.assertEqual((condition.key, condition.match.value), ("tenant", "default"))
+        # Older collections may hold points with no tenant field
+        self.assertIsInstance(legacy, models.Filter)
+        self.assertIsInstance(legacy.should[1], models.IsEmptyCondition)
+
+class TestLocalVectorIndex(BackendContract, unittest.TestCase):
+    def make_backend(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        return LocalVectorIndex(self.tmp_dir.name)
+
+    def test_reopens_from_disk(self):
+        self.backend.delete([point(2)])
+        self.backend.close()
+
+        reopened = LocalVectorIndex(self.tmp_dir.name)
+
+        self.assertEqual(reopened.dim, 4)
+        self.assertEqual(len(reopened), 2)
+        self.assertIsInstance(reopened._vectors, np.memmap)
+        hits = reopened.search([1.0, 1.0, 0.0, 0.0], limit=5)
+        self.assertEqual([payload["text"] for _, payload, _ in hits], ["xy", "x"])
+        self.assertEqual(hits[0][1]["metadata"], {"page": 2})
+        # Deleted rows are reused
+        reopened.upsert([point(4)], [[0.0, 0.0, 0.0, 1.0]], [{"text": "w"}])
+        self.assertEqual(reopened._count, 3)
+        reopened.close()
+
+    def test_grows_beyond_initial_capacity(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(LocalVectorIndex.INITIAL_CAPACITY + 10, 4))
+        ids = [point(100 + i) for i in range(len(vectors))]
+        self.backend.upsert(ids, vectors.tolist(), [{"text": str(i)} for i in range(len(vectors))])
+
+        hits = self.backend.search(vectors[-1].tolist(), limit=1)
+
+        self.assertEqual(hits[0][1]["text"], str(len(vectors) - 1))
+        self.assertGreaterEqual(self.backend._vectors.shape[0], len(vectors) + 3)
+
+    def test_filtered_search_uses_payload_indexes(self):
+        condition, params = self.backend._where_sql({"tenant": "a"})
+        plan = self.backend._conn.execute(f"EXPLAIN QUERY PLAN SELECT row FROM points WHERE {condition}",
+                                          params).fetchall()
+
+        self.assertIn("points_tenant", " ".join(str(step) for step in plan))
+        with self.assertRaises(ValueError):
+            self.backend.search([1.0, 0.0, 0.0, 0.0], limit=1, where={"tenant') OR (1": "a"})
+
+    def test_rejects_other_dimension(self):
+        with self.assertRaises(ValueError):
+            self.backend.ensure_collection(8)
+
+    @unittest.skipIf(local_index.hnswlib is None, "hnswlib is not installed")
+    def test_hnsw_search_matches_brute_force(self):
+        rng = np.random.default_rng(1)
+        vectors = rng.normal(size=(500, 4))
+        self.backend.upsert([point(100 + i) for i in range(500)], vectors.tolist(),
+                            [{"text": str(i)} for i in range(500)])
+        query = vectors[7].tolist()
+        expected = self.backend.search(query, limit=5)
+
+        self.backend.hnsw_threshold = 1
+        hits = self.backend.search(query, limit=5)
+
+        self.assertEqual(hits[0][1], expected[0][1])
+
+    def add_tenant_points(self, count: int):
+        rng = np.random.default_rng(2)
+        vectors = rng.normal(size=(count, 4))
+        self.backend.upsert([point(100 + i) for i in range(count)], vectors.tolist(),
+                            [{"text": str(i), "tenant": "a" if i % 4 else "b", "metadata": {"page": i % 3}}
+                             for i in range(count)])
+        return vectors
+
+    def test_filters_use_in_memory_field_codes(self):
+        vectors = self.add_tenant_points(400)
+        query = vectors[8].tolist()
+        expected = sorted(((payload["text"], round(score, 5)) for _, payload, score in
+                           self.backend.search(query, limit=400)
+                           if payload.get("tenant") == "b" and payload["metadata"]["page"] in (0, 2)),
+                          key=lambda hit: -hit[1])[:5]
+
+        with patch.object(self.backend, "_matching_rows", side_effect=AssertionError("SQLite lookup")):
+            hits = self.backend.search(query, limit=5, where={"tenant": "b", "metadata.page": [0, 2]})
+        self.backend.close()
+        reopened = LocalVectorIndex(self.tmp_dir.name)
+        self.addCleanup(reopened.close)
+        after_reopen = reopened.search(query, limit=5, where={"tenant": "b", "metadata.page": [0, 2]})
+
+        self.assertEqual([(payload["text"], round(score, 5)) for _, payload, score in hits], expected)
+        self.assertEqual([hit[0] for hit in after_reopen], [hit[0] for hit in hits])
+        # Fields without codes are looked up in SQLite
+        self.assertEqual([payload["text"] for _, payload, _ in reopened.search(query, limit=5, where={"text": "8"})],
+                         ["8"])
+
+    @unittest.skipIf(local_index.hnswlib is None, "hnswlib is not installed")
+    def test_filtered_hnsw_search(self):
+        vectors = self.add_tenant_points(500)
+        query = vectors[8].tolist()
+        expected = self.backend.search(query, limit=5, where={"tenant": "b"})
+
+        self.backend.hnsw_threshold = 50
+        hits = self.backend.search(query, limit=5, where={"tenant": "b"})
+
+        self.assertEqual(hits[0][1], expected[0][1])
+        self.assertTrue(all(payload["tenant"] == "b" for _, payload, _ in hits))
+        self.assertEqual(len(hits), 5)
+        # A filter every point matches is dropped
+        index = self.backend._hnsw_index()
+        with patch.object(self.backend, "_hnsw_index", return_value=Mock(wraps=index)) as hnsw:
+            unfiltered = self.backend.search(query, limit=5, where={"tenant": ["a", "b", None]})
+        self.assertNotIn("filter", hnsw.return_value.knn_query.call_args.kwargs)
+        self.assertEqual(unfiltered, self.backend.search(query, limit=5))
+
+class TestVectorStoreLocalBackend(unittest.TestCase):
+    @patch('src.tools.vector_store.EMBEDDING_CACHE_PATH', None)
+    @patch('src.tools.vector_store.BM25_INDEX_PATH', "")
+    @patch('src.tools.vector_store.STORE_VERSION_PATH', "")
+    @patch('src.tools.vector_store.GoogleGenerativeAIEmbeddings')
+    def test_store_and_search_without_qdrant(self, mock_embeddings):
+        """Test VectorStore end to end on the local backend"""
+        vocabulary = ["weather", "python", "history"]
+        to_vector = lambda text: [float(word in text.lower()) for word in vocabulary] + [0.0] * 765
+        mock_embeddings.return_value.embed_documents.side_effect = lambda texts: [to_vector(t) for t in texts]
+        mock_embeddings.return_value.embed_query.side_effect = to_vector
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+
+        vector_store = VectorStore(backend=LocalVectorIndex(tmp_dir.name))
+        vector_store.store_documents([
+            Document(page_content="Python is a language", metadata={"source": "a.pdf"}),
+            Document(page_content="History of Rome", metadata={"source": "b.pdf"})
+        ])
+        results = vector_store.search("Tell me about python", limit=1)
+
+        self.assertTrue(vector_store.created_collection)
+        self.assertIsNone(vector_store.client)
+        self.assertEqual(results[0]["text"], "Python is a language")
+        self.assertAlmostEqual(results[0]["score"], 1.0, places=5)
+
+    @patch('src.tools.vector_store.EMBEDDING_CACHE_PATH', None)
+    @patch('src.tools.vector_store.BM25_INDEX_PATH', "")
+    @patch('src.tools.vector_store.STORE_VERSION_PATH', "")
+    @patch('src.tools.vector_store.GoogleGenerativeAIEmbeddings')
+    def test_hybrid_and_lexical_search(self, mock_embeddings):
+        """Test BM25-only and fused retrieval on the local backend"""
+        # The embedding model does not know product codes; every text maps to the same direction
+        mock_embeddings.return_value.embed_documents.side_effect = lambda texts: [
+            [1.0, 0.1 * i] + [0.0] * 766 for i, _ in enumerate(texts)
+        ]
+        mock_embeddings.return_value.embed_query.return_value = [1.0, 0.0] + [0.0] * 766
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        vector_store = VectorStore(backend=LocalVectorIndex(tmp_dir.name), search_mode="hybrid")
+        vector_store.store_documents([
+            Document(page_content="General pump overview", metadata={"source": "a.pdf"}),
+            Document(page_content="Valve sizing guide", metadata={"source": "a.pdf"}),
+            Document(page_content="Replacing the seal on model XR-200", metadata={"source": "a.pdf"})
+        ])
+
+        dense = vector_store.search("XR-200 seal", limit=1, mode="dense")
+        lexical = vector_store.search("XR-200 seal", limit=1, mode="lexical")
+        embed_calls = mock_embeddings.return_value.embed_query.call_count
+        hybrid = vector_store.search("XR-200 seal", limit=3)
+        ahybrid = asyncio.run(vector_store.asearch("XR-200 seal", limit=3))
+
+        self.assertEqual(dense[0]["text"], "General pump overview")
+        self.assertEqual(lexical[0]["text"], "Replacing the seal on model XR-200")
+        self.assertEqual(embed_calls, 1)
+        self.assertEqual(hybrid[0]["text"], "Replacing the seal on model XR-200")
+        self.assertEqual(len(hybrid), 3)
+        self.assertEqual(ahybrid, hybrid)
+
+        # Dense hits can carry their vectors for reranking; lexical-only hits have none
+        with_vectors = vector_store.search("XR-200 seal", limit=3, with_vectors=True)
+        self.assertEqual([hit["text"] for hit in with_vectors], [hit["text"] for hit in hybrid])
+        self.assertTrue(all(len(hit["vector"]) == 768 for hit in with_vectors))
+        self.assertNotIn("vector", vector_store.search("XR-200 seal", limit=1, mode="lexical", with_vectors=True)[0])
+
+        # Deleted chunks leave the lexical index too
+        vector_store.delete_points([VectorStore.point_id(Document(
+            page_content="Replacing the seal on model XR-200", metadata={"source": "a.pdf"}))])
+        self.assertEqual(vector_store.search("XR-200", limit=3, mode="lexical"), [])
+
+    @patch('src.tools.vector_store.EMBEDDING_CACHE_PATH', None)
+    @patch('src.tools.vector_store.BM25_INDEX_PATH', "")
+    @patch('src.tools.vector_store.GoogleGenerativeAIEmbeddings')
+    def test_generation_sees_writes_from_other_stores(self, mock_embeddings):
+        """Test that a write through one store changes the generation seen by another"""
+        mock_embeddings.return_value.embed_documents.side_effect = lambda texts: [[1.0] + [0.0] * 767 for _ in texts]
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        with patch('src.tools.vector_store.STORE_VERSION_PATH', os.path.join(tmp_dir.name, "store_version")):
+            # Stands in for the app and for main.py re-indexing in another process
+            reader = VectorStore(backend=LocalVectorIndex(os.path.join(tmp_dir.name, "index")))
+            writer = VectorStore(backend=LocalVectorIndex(os.path.join(tmp_dir.name, "index")))
+
+        before = reader.generation
+        self.assertEqual(reader.generation, before)
+        writer.store_documents([Document(page_content="Python is a language", metadata={"source": "a.pdf"})])
+        after_store = reader.generation
+        writer.delete_points([VectorStore.point_id(Document(page_content="Python is a language",
+                                                            metadata={"source": "a.pdf"}))])
+
+        self.assertNotEqual(after_store, before)
+        self.assertNotEqual(reader.generation, after_store)
+
+class TestVectorStoreTenants(unittest.TestCase):
+    def setUp(self):
+        for target, value in (('EMBEDDING_CACHE_PATH', None), ('BM25_INDEX_PATH', ""), ('STORE_VERSION_PATH', "")):
+            patcher = patch(f'src.tools.vector_store.{target}', value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch('src.tools.vector_store.GoogleGenerativeAIEmbeddings')
+        mock_embeddings = patcher.start()
+        self.addCleanup(patcher.stop)
+        vocabulary = ["pump", "valve", "seal"]
+        to_vector = lambda text: [float(word in text.lower()) for word in vocabulary] + [0.1] + [0.0] * 764
+        mock_embeddings.return_value.embed_documents.side_effect = lambda texts: [to_vector(t) for t in texts]
+        mock_embeddings.return_value.embed_query.side_effect = to_vector
+        mock_embeddings.return_value.aembed_query = AsyncMock(side_effect=to_vector)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def make_store(self, tenancy: str, search_mode: str = "dense") -> VectorStore:
+        factory = lambda tenant: LocalVectorIndex(os.path.join(self.tmp_dir.name, tenant))
+        return VectorStore(backend=factory("default"), tenancy=tenancy, search_mode=search_mode,
+                           backend_factory=factory)
+
+    def populate(self, vector_store: VectorStore):
+        for tenant in ("acme", "globex"):
+            vector_store.store_documents([
+                Document(page_content=f"{tenant} pump manual", metadata={"source": "pump.pdf", "page": 1}),
+                Document(page_content=f"{tenant} valve seal guide", metadata={"source": "valve.pdf", "page": 2})
+            ], tenant=tenant)
+        vector_store.store_documents([Document(page_content="default pump notes", metadata={"source": "notes.md"})])
+
+    def check_isolation(self, vector_store: VectorStore):
+        for mode in ("dense", "lexical", "hybrid"):
+            hits = vector_store.search("pump", limit=10, mode=mode, tenant="acme")
+            self.assertTrue(hits)
+            self.assertTrue(all(hit["text"].startswith("acme") for hit in hits), (mode, hits))
+            default = vector_store.search("pump", limit=10, mode=mode)
+            self.assertEqual([hit["text"] for hit in default], ["default pump notes"])
+        filtered = vector_store.search("seal", limit=10, tenant="globex", where={"metadata.source": "pump.pdf"})
+        self.assertEqual([hit["text"] for hit in filtered], ["globex pump manual"])
+        lexical = vector_store.search("seal", limit=10, mode="lexical", tenant="globex",
+                                      where={"metadata.page": 1})
+        self.assertEqual(lexical, [])
+        batched = vector_store.search_batch([[1.0, 0.0, 0.0, 0.1] + [0.0] * 764], limit=1, tenant="globex")
+        self.assertEqual(batched[0][0]["text"], "globex pump manual")
+        ahits = asyncio.run(vector_store.asearch("valve", limit=1, tenant="acme"))
+        self.assertEqual(ahits[0]["text"], "acme valve seal guide")
+
+    def test_payload_tenancy(self):
+        """Test that tenants sharing one collection only see their own chunks"""
+        vector_store = self.make_store("payload")
+        self.populate(vector_store)
+
+        self.check_isolation(vector_store)
+        self.assertEqual(len(vector_store.backend), 5)
+        self.assertNotEqual(VectorStore.point_id(Document(page_content="x", metadata={}), "acme"),
+                            VectorStore.point_id(Document(page_content="x", metadata={}), "globex"))
+
+        vector_store.delete_tenant("acme")
+        self.assertEqual(vector_store.search("pump", limit=10, tenant="acme"), [])
+        self.assertEqual(len(vector_store.lexical_index("acme")), 0)
+        self.assertEqual(len(vector_store.search("pump", limit=10, tenant="globex")), 2)
+
+    def test_collection_tenancy(self):
+        """Test that each tenant can get its own collection"""
+        vector_store = self.make_store("collection", search_mode="hybrid")
+        self.populate(vector_store)
+
+        self.check_isolation(vector_store)
+        self.assertEqual(len(vector_store.backend), 1)
+        self.assertEqual(len(vector_store.backend_for("acme")), 2)
+
+        vector_store.delete_tenant("globex")
+        self.assertEqual(vector_store.search("pump", limit=10, tenant="globex"), [])
+        self.assertEqual(len(vector_store.search("pump", limit=10, tenant="acme")), 2)
+
+    def test_rejects_invalid_tenant(self):
+        vector_store = self.make_store("payload")
+
+        with self.assertRaises(ValueError):
+            vector_store.search("pump", tenant="../etc")
+        with self.assertRaises(ValueError):
+            VectorStore(backend=vector_store.backend, tenancy="schema")
+
+if __name__ == '__main__':
+    unittest.main()
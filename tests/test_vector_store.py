@@ -1,5 +1,6 @@
 import unittest
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, AsyncMock
+import asyncio
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -8,6 +9,18 @@ from src.tools.vector_store import VectorStore
 
 class TestVectorStore(unittest.TestCase):
     
+    def setUp(self):
+        # Keep the on-disk embedding cache out of unit tests
+        patcher = patch('src.tools.vector_store.EMBEDDING_CACHE_PATH', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('src.tools.vector_store.BM25_INDEX_PATH', "")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch('src.tools.vector_store.STORE_VERSION_PATH', "")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     @patch('src.tools.vector_store.QdrantClient')
     @patch('src.tools.vector_store.GoogleGenerativeAIEmbeddings')
     def test_vector_store_initialization(self, mock_embeddings, mock_client):
@@ -22,10 +35,15 @@ class TestVectorStore(unittest.TestCase):
         mock_client_instance.get_collection.side_effect = Exception("Collection not found")
         
         vector_store = VectorStore()
-        
-        # Verify initialization
+
+        # Verify initialization; the client is created and the collection checked on first use
+        mock_client.assert_not_called()
         self.assertIsNotNone(vector_store.client)
         self.assertIsNotNone(vector_store.embeddings)
+        mock_client_instance.get_collection.assert_not_called()
+        self.assertTrue(vector_store.created_collection)
+        vector_store.delete_points(["a"])
+        mock_client_instance.get_collection.assert_called_once()
         mock_client_instance.create_collection.assert_called_once()
 
     @patch('src.tools.vector_store.QdrantClient')
@@ -40,7 +58,7 @@ class TestVectorStore(unittest.TestCase):
         mock_client_instance.get_collection.side_effect = Exception("Collection not found")
         
         # Mock embedding response
-        mock_embeddings_instance.embed_query.return_value = [0.1] * 768
+        mock_embeddings_instance.embed_documents.return_value = [[0.1] * 768]
         
         vector_store = VectorStore()
         
@@ -52,10 +70,50 @@ class TestVectorStore(unittest.TestCase):
         vector_store.store_documents([mock_doc])
         
         # Verify embedding was called
-        mock_embeddings_instance.embed_query.assert_called_with("Test content")
+        mock_embeddings_instance.embed_documents.assert_called_with(["Test content"])
         # Verify upsert was called
         mock_client_instance.upsert.assert_called_once()
 
+    @patch('src.tools.vector_store.QdrantClient')
+    @patch('src.tools.vector_store.GoogleGenerativeAIEmbeddings')
+    def test_store_documents_in_batches(self, mock_embeddings, mock_client):
+        """Test that documents are embedded and upserted once per batch"""
+        # Setup mocks
+        mock_client_instance = Mock()
+        mock_client.return_value = mock_client_instance
+        mock_embeddings_instance = Mock()
+        mock_embeddings.return_value = mock_embeddings_instance
+        mock_client_instance.get_collection.side_effect = Exception("Collection not found")
+        
+        # Return one vector per text in the batch
+        mock_embeddings_instance.embed_documents.side_effect = lambda texts: [[0.1] * 768 for _ in texts]
+        
+        vector_store = VectorStore()
+        
+        docs = []
+        for i in range(5):
+            doc = Mock()
+            doc.page_content = f"Chunk {i}"
+            doc.metadata = {"source": "test.pdf"}
+            docs.append(doc)
+        
+        stats = vector_store.store_documents(docs, batch_size=2, max_in_flight=2)
+        
+        # 5 chunks in batches of 2 -> 3 embedding calls and 3 upserts
+        self.assertEqual(mock_embeddings_instance.embed_documents.call_count, 3)
+        self.assertEqual(mock_client_instance.upsert.call_count, 3)
+        mock_embeddings_instance.embed_query.assert_not_called()
+        
+        upserted = sum(len(c.kwargs["points"]) for c in mock_client_instance.upsert.call_args_list)
+        self.assertEqual(upserted, 5)
+        
+        # Verify throughput statistics
+        self.assertEqual(stats["chunks"], 5)
+        self.assertEqual(stats["batches"], 3)
+        self.assertGreaterEqual(stats["peak_in_flight"], 1)
+        self.assertLessEqual(stats["peak_in_flight"], 2)
+        self.assertGreaterEqual(stats["chunks_per_sec"], 0)
+
     @patch('src.tools.vector_store.QdrantClient')
     @patch('src.tools.vector_store.GoogleGenerativeAIEmbeddings')
     def test_search_documents(self, mock_embeddings, mock_client):
@@ -74,7 +132,7 @@ class TestVectorStore(unittest.TestCase):
         mock_hit = Mock()
         mock_hit.payload = {"text": "AI is important", "metadata": {}}
         mock_hit.score = 0.95
-        mock_client_instance.search.return_value = [mock_hit]
+        mock_client_instance.query_points.return_value = Mock(points=[mock_hit])
         
         vector_store = VectorStore()
         
@@ -82,12 +140,65 @@ class TestVectorStore(unittest.TestCase):
         
         # Verify search was performed
         mock_embeddings_instance.embed_query.assert_called_with("artificial intelligence")
-        mock_client_instance.search.assert_called_once()
+        mock_client_instance.query_points.assert_called_once()
         
         # Verify results format
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]["text"], "AI is important")
         self.assertEqual(results[0]["score"], 0.95)
 
+    @patch('src.tools.vector_store.QdrantClient')
+    @patch('src.tools.vector_store.GoogleGenerativeAIEmbeddings')
+    def test_search_batch(self, mock_embeddings, mock_client):
+        """Test that many query vectors are searched in one request"""
+        mock_client.return_value.get_collection.return_value = Mock()
+        first, second = Mock(score=0.9), Mock(score=0.8)
+        first.payload = {"text": "first", "metadata": {}}
+        second.payload = {"text": "second", "metadata": {}}
+        mock_client.return_value.query_batch_points.return_value = [Mock(points=[first]),
+                                                                     Mock(points=[second, first])]
+        
+        vector_store = VectorStore()
+        results = vector_store.search_batch([[0.1] * 768, [0.2] * 768], limit=3)
+        
+        mock_client.return_value.query_batch_points.assert_called_once()
+        requests = mock_client.return_value.query_batch_points.call_args[1]["requests"]
+        self.assertEqual([r.limit for r in requests], [3, 3])
+        self.assertEqual(results, [[{"text": "first", "score": 0.9, "metadata": {}}],
+                                   [{"text": "second", "score": 0.8, "metadata": {}}, {"text": "first", "score": 0.9, "metadata": {}}]])
+        self.assertEqual(vector_store.search_batch([]), [])
+
+    @patch('src.tools.vector_store.AsyncQdrantClient')
+    @patch('src.tools.vector_store.QdrantClient')
+    @patch('src.tools.vector_store.GoogleGenerativeAIEmbeddings')
+    def test_asearch_documents(self, mock_embeddings, mock_client, mock_async_client):
+        """Test async search with AsyncQdrantClient"""
+        mock_client.return_value.get_collection.return_value = Mock()
+        mock_embeddings.return_value.aembed_query = AsyncMock(return_value=[0.1] * 768)
+        mock_hit = Mock()
+        mock_hit.payload = {"text": "AI is important", "metadata": {}}
+        mock_hit.score = 0.95
+        mock_async_client.return_value.query_points = AsyncMock(return_value=Mock(points=[mock_hit]))
+        
+        vector_store = VectorStore()
+        results = asyncio.run(vector_store.asearch("artificial intelligence"))
+        
+        mock_embeddings.return_value.aembed_query.assert_awaited_once_with("artificial intelligence")
+        mock_async_client.return_value.query_points.assert_awaited_once()
+        mock_client.return_value.query_points.assert_not_called()
+        self.assertEqual(results, [{"text": "AI is important", "score": 0.95, "metadata": {}}])
+
+    def test_point_id_is_deterministic(self):
+        """Test that point IDs are derived from chunk content"""
+        doc = Mock()
+        doc.page_content = "Test content"
+        doc.metadata = {"source": "test.pdf"}
+        other = Mock()
+        other.page_content = "Other content"
+        other.metadata = {"source": "test.pdf"}
+        
+        self.assertEqual(VectorStore.point_id(doc), VectorStore.point_id(doc))
+        self.assertNotEqual(VectorStore.point_id(doc), VectorStore.point_id(other))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
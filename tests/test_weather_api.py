@@ -1,7 +1,10 @@
 import unittest
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, AsyncMock
+import asyncio
 import sys
 import os
+import threading
+import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from src.tools.weather_api import WeatherAPI
@@ -10,7 +13,7 @@ class TestWeatherAPI(unittest.TestCase):
     def setUp(self):
         self.weather_api = WeatherAPI()
 
-    @patch('src.tools.weather_api.requests.get')
+    @patch('src.tools.weather_api.requests.Session.get')
     def test_get_weather_success(self, mock_get):
         # Mock successful API response
         mock_response = Mock()
@@ -32,7 +35,7 @@ class TestWeatherAPI(unittest.TestCase):
         self.assertEqual(result['name'], 'London')
         self.assertEqual(result['main']['temp'], 20.5)
 
-    @patch('src.tools.weather_api.requests.get')
+    @patch('src.tools.weather_api.requests.Session.get')
     def test_get_weather_api_error(self, mock_get):
         # Mock API error
         mock_get.side_effect = Exception("API Error")
@@ -40,6 +43,88 @@ class TestWeatherAPI(unittest.TestCase):
         result = self.weather_api.get_weather('InvalidCity')
         self.assertIsNone(result)
 
+    @patch('src.tools.weather_api.requests.Session.get')
+    def test_get_weather_is_cached_by_normalized_city(self, mock_get):
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'name': 'London'}
+        mock_get.return_value = mock_response
+
+        self.weather_api.get_weather('London')
+        result = self.weather_api.get_weather('  london ')
+
+        self.assertEqual(result['name'], 'London')
+        mock_get.assert_called_once()
+        self.assertEqual(mock_get.call_args.kwargs['timeout'], self.weather_api.timeout)
+        self.assertEqual(self.weather_api.stats['hits'], 1)
+
+    @patch('src.tools.weather_api.requests.Session.get')
+    def test_concurrent_requests_are_coalesced(self, mock_get):
+        def slow_get(*args, **kwargs):
+            time.sleep(0.05)
+            response = Mock()
+            response.status_code = 200
+            response.json.return_value = {'name': 'London'}
+            return response
+        mock_get.side_effect = slow_get
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.weather_api.get_weather('London')))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        mock_get.assert_called_once()
+        self.assertEqual([r['name'] for r in results], ['London'] * 5)
+
+    @patch('src.tools.weather_api.requests.Session.get')
+    def test_rate_limit_serves_stale_data(self, mock_get):
+        weather_api = WeatherAPI(cache_ttl=0, stale_ttl=3600, rate_limit_per_minute=1)
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'name': 'London'}
+        mock_get.return_value = mock_response
+
+        weather_api.get_weather('London')
+        # The quota is used up: the stale entry is served and no new call is made
+        result = weather_api.get_weather('London')
+        for _ in range(50):
+            if weather_api.stats['rate_limited']:
+                break
+            time.sleep(0.01)
+
+        self.assertEqual(result['name'], 'London')
+        mock_get.assert_called_once()
+        self.assertEqual(weather_api.stats['stale_hits'], 1)
+        self.assertEqual(weather_api.stats['rate_limited'], 1)
+        # A city without cached data gets nothing while over quota
+        self.assertIsNone(weather_api.get_weather('Paris'))
+
+    def test_aget_weather_coalesces_and_caches(self):
+        async def slow_get(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            response = Mock()
+            response.status_code = 200
+            response.json.return_value = {'name': 'London'}
+            return response
+        mock_client = Mock()
+        mock_client.get = AsyncMock(side_effect=slow_get)
+
+        async def run():
+            results = await asyncio.gather(*[self.weather_api.aget_weather('London') for _ in range(5)])
+            cached = await self.weather_api.aget_weather('london')
+            return results, cached
+
+        with patch.object(self.weather_api, '_new_async_client', return_value=mock_client):
+            results, cached = asyncio.run(run())
+
+        mock_client.get.assert_awaited_once()
+        self.assertEqual([r['name'] for r in results], ['London'] * 5)
+        self.assertEqual(cached['name'], 'London')
+        self.assertEqual(self.weather_api.stats['coalesced'], 4)
+
     def test_format_weather_data_valid(self):
         weather_data = {
             'name': 'London',
@@ -57,6 +142,17 @@ class TestWeatherAPI(unittest.TestCase):
         self.assertIn('20.5°C', formatted)
         self.assertIn('clear sky', formatted)
 
+    def test_format_weather_data_imperial(self):
+        weather_data = {
+            'name': 'New York',
+            'main': {'temp': 68.9, 'feels_like': 64.8, 'humidity': 65},
+            'weather': [{'description': 'clear sky'}]
+        }
+        
+        formatted = self.weather_api.format_weather_data(weather_data, units="imperial")
+        
+        self.assertIn('68.9°F', formatted)
+
     def test_format_weather_data_none(self):
         formatted = self.weather_api.format_weather_data(None)
         self.assertEqual(formatted, "Unable to fetch weather data")
@@ -1,9 +1,13 @@
 import unittest
-from unittest.mock import patch, Mock
+from unittest.mock import patch, Mock, AsyncMock
+import asyncio
+import itertools
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
 from src.graphs.workflow import WorkflowGraph
 
 class TestWorkflowGraph(unittest.TestCase):
@@ -54,10 +58,30 @@ class TestWorkflowGraph(unittest.TestCase):
         result = workflow.process_weather("What's the weather in London?")
         
         # Verify calls
-        mock_weather_instance.get_weather.assert_called_with("London")
-        mock_weather_instance.format_weather_data.assert_called_with(mock_weather_data)
+        mock_weather_instance.get_weather.assert_called_with("London", "metric")
+        mock_weather_instance.format_weather_data.assert_called_with(mock_weather_data, "metric")
         self.assertEqual(result, "Weather in London: 20.5°C, clear sky")
 
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_process_weather_uses_routing_slots(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that slots extracted while routing avoid a second LLM call"""
+        mock_llm_instance = Mock()
+        mock_weather_instance = Mock()
+        mock_weather_instance.get_weather.return_value = {'name': 'Springfield'}
+        mock_weather_instance.format_weather_data.return_value = "Weather in Springfield"
+        
+        workflow = WorkflowGraph()
+        workflow.llm = mock_llm_instance
+        workflow.weather_api = mock_weather_instance
+        
+        workflow.process_weather("How warm is it there?", {"city": "Springfield", "units": "imperial", "date": None})
+        
+        mock_llm_instance.invoke.assert_not_called()
+        mock_weather_instance.get_weather.assert_called_with("Springfield", "imperial")
+
     @patch('src.graphs.workflow.RouterAgent')
     @patch('src.graphs.workflow.WeatherAPI')
     @patch('src.graphs.workflow.VectorStore')
@@ -76,6 +100,8 @@ class TestWorkflowGraph(unittest.TestCase):
             {"text": "Machine learning is a subset of AI", "score": 0.85}
         ]
         mock_vector_instance.search.return_value = mock_search_results
+        mock_vector_instance.embed_query.return_value = [0.1] * 768
+        mock_vector_instance.generation = 0
         
         # Mock LLM response
         mock_llm_response = Mock()
@@ -89,10 +115,162 @@ class TestWorkflowGraph(unittest.TestCase):
         result = workflow.process_document("What is AI?")
         
         # Verify calls
-        mock_vector_instance.search.assert_called_with("What is AI?")
+        mock_vector_instance.search.assert_called_with("What is AI?", query_vector=[0.1] * 768)
         mock_llm_instance.invoke.assert_called_once()
         self.assertEqual(result, "AI refers to artificial intelligence and includes machine learning.")
 
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_process_document_uses_semantic_cache(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that a repeated document query is answered from the cache"""
+        mock_llm_instance = Mock()
+        mock_vector_instance = Mock()
+        mock_vector_instance.search.return_value = [{"text": "AI is artificial intelligence", "score": 0.9}]
+        mock_vector_instance.embed_query.return_value = [0.1] * 768
+        mock_vector_instance.generation = 0
+        mock_llm_response = Mock()
+        mock_llm_response.content = "AI is artificial intelligence."
+        mock_llm_instance.invoke.return_value = mock_llm_response
+        
+        workflow = WorkflowGraph()
+        workflow.llm = mock_llm_instance
+        workflow.vector_store = mock_vector_instance
+        
+        first = workflow.process_document("What is AI?")
+        second = workflow.process_document("What is AI ?")
+        
+        self.assertEqual(first, second)
+        mock_llm_instance.invoke.assert_called_once()
+        mock_vector_instance.search.assert_called_once()
+        self.assertEqual(workflow.response_cache.stats["hits"], 1)
+        
+        # A change to the collection invalidates cached answers
+        mock_vector_instance.generation = 1
+        workflow.process_document("What is AI?")
+        self.assertEqual(mock_llm_instance.invoke.call_count, 2)
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_process_document_for_tenant(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that a tenant's query searches its documents and caches answers per tenant"""
+        mock_llm_instance = Mock()
+        mock_vector_instance = Mock()
+        mock_vector_instance.search.return_value = [{"text": "Acme pumps", "score": 0.9}]
+        mock_vector_instance.embed_query.return_value = [0.1] * 768
+        mock_vector_instance.generation = 0
+        mock_llm_instance.invoke.return_value = Mock(content="Acme makes pumps.")
+        
+        workflow = WorkflowGraph()
+        workflow.llm = mock_llm_instance
+        workflow.vector_store = mock_vector_instance
+        
+        workflow.process_document("What does Acme make?", tenant="acme")
+        workflow.process_document("What does Acme make?", tenant="globex")
+        workflow.process_document("What does Acme make?", tenant="acme")
+        
+        mock_vector_instance.search.assert_any_call("What does Acme make?", query_vector=[0.1] * 768,
+                                                    tenant="acme")
+        mock_vector_instance.search.assert_called_with("What does Acme make?", query_vector=[0.1] * 768,
+                                                       tenant="globex")
+        self.assertEqual(mock_llm_instance.invoke.call_count, 2)
+        with self.assertRaises(ValueError):
+            workflow.run("What does Acme make?", tenant="acme/../globex")
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_process_document_lexical_mode_skips_embedding(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that lexical search answers without an embedding call"""
+        mock_llm_instance = Mock()
+        mock_llm_instance.invoke.return_value = Mock(content="The XR-200 needs a new seal.")
+        mock_vector_instance = Mock()
+        mock_vector_instance.search_mode = "lexical"
+        mock_vector_instance.search.return_value = [{"text": "XR-200 seal", "score": 3.2}]
+        
+        workflow = WorkflowGraph()
+        workflow.llm = mock_llm_instance
+        workflow.vector_store = mock_vector_instance
+        
+        result = workflow.process_document("XR-200 seal?")
+        
+        self.assertEqual(result, "The XR-200 needs a new seal.")
+        mock_vector_instance.search.assert_called_once_with("XR-200 seal?")
+        mock_vector_instance.embed_query.assert_not_called()
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_document_context_is_packed(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that weak, overlapping and duplicate hits are packed before generation"""
+        page = {"source": "report.pdf", "page": 1}
+        mock_vector_instance = Mock()
+        mock_vector_instance.search_mode = "dense"
+        mock_vector_instance.generation = 0
+        mock_vector_instance.embed_query.return_value = [0.1] * 768
+        mock_vector_instance.search.return_value = [
+            {"text": "Revenue grew 12% in 2023.", "score": 0.9, "metadata": dict(page, start_index=0)},
+            {"text": "in 2023. Costs fell 3%.", "score": 0.8, "metadata": dict(page, start_index=17)},
+            {"text": "Revenue grew 12% in 2023.", "score": 0.7, "metadata": {"source": "copy.pdf", "page": 1}},
+            {"text": "Unrelated appendix text.", "score": 0.1, "metadata": {"source": "report.pdf", "page": 9}}
+        ]
+        mock_llm_instance = Mock()
+        mock_llm_instance.invoke.return_value = Mock(content="Revenue grew 12%.")
+        
+        workflow = WorkflowGraph()
+        workflow.llm = mock_llm_instance
+        workflow.vector_store = mock_vector_instance
+        
+        result = workflow.run("How did revenue change?")
+        
+        prompt = mock_llm_instance.invoke.call_args[0][0][0]["content"]
+        self.assertIn("Revenue grew 12% in 2023. Costs fell 3%.", prompt)
+        self.assertEqual(prompt.count("Revenue grew"), 1)
+        self.assertNotIn("appendix", prompt)
+        self.assertEqual(result["response"], "Revenue grew 12%.")
+        context = result["context"]
+        self.assertEqual((context["dropped_low_score"], context["merged"], context["deduplicated"]), (1, 1, 1))
+        self.assertGreater(context["tokens_saved"], 0)
+        self.assertEqual(workflow.context_packer.stats["tokens_saved"], context["tokens_saved"])
+
+    @patch('src.graphs.workflow.RERANK_CANDIDATES', 20)
+    @patch('src.graphs.workflow.RERANK_TOP_K', 2)
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_document_reranking(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that reranking over-fetches with vectors and keeps the top passages"""
+        mock_vector_instance = Mock()
+        mock_vector_instance.search_mode = "dense"
+        mock_vector_instance.generation = 0
+        mock_vector_instance.embed_query.return_value = [0.1] * 768
+        mock_vector_instance.search.return_value = [
+            {"text": f"Passage {i}", "score": 0.9 - i / 100, "metadata": {"page": i}, "vector": [1.0, i / 10]}
+            for i in range(20)
+        ]
+        mock_llm_instance = Mock()
+        mock_llm_instance.invoke.return_value = Mock(content="Answer")
+        
+        workflow = WorkflowGraph()
+        workflow.llm = mock_llm_instance
+        workflow.vector_store = mock_vector_instance
+        
+        answer, context = workflow._process_document("What is in the report?")
+        
+        mock_vector_instance.search.assert_called_once_with(
+            "What is in the report?", query_vector=[0.1] * 768, limit=20, with_vectors=True)
+        prompt = mock_llm_instance.invoke.call_args[0][0][0]["content"]
+        self.assertIn("Passage 0", prompt)
+        self.assertEqual(answer, "Answer")
+        self.assertEqual(context["hits"], 2)
+        self.assertEqual(set(context["timings"]), {"embed", "search", "mmr", "pack", "generate"})
+
     @patch('src.graphs.workflow.RouterAgent')
     @patch('src.graphs.workflow.WeatherAPI')
     @patch('src.graphs.workflow.VectorStore')
@@ -109,7 +287,10 @@ class TestWorkflowGraph(unittest.TestCase):
         mock_llm.return_value = mock_llm_instance
         
         # Mock router decision
-        mock_router_instance.route_query.return_value = ("weather", "What's the weather in London?")
+        mock_router_instance.route.return_value = {
+            "route": "weather", "query": "What's the weather in London?",
+            "slots": {"city": "London", "units": None, "date": None}
+        }
         
         # Mock weather processing
         mock_city_response = Mock()
@@ -129,7 +310,333 @@ class TestWorkflowGraph(unittest.TestCase):
         
         # Verify the workflow executed correctly
         self.assertIn("response", result)
-        mock_router_instance.route_query.assert_called_with("What's the weather in London?")
+        mock_router_instance.route.assert_called_with("What's the weather in London?")
+        mock_weather_instance.get_weather.assert_called_with("London", "metric")
+        mock_llm_instance.invoke.assert_not_called()
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_graph_is_compiled_once(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that the graph is compiled once and clients are shared between workflows"""
+        mock_router_instance = Mock()
+        mock_router_instance.route.return_value = {"route": "weather", "query": "What's the weather in London?"}
+        mock_router.return_value = mock_router_instance
+        mock_weather.return_value.format_weather_data.return_value = "Weather in London: 20.5°C"
+        mock_llm.return_value.invoke.return_value = Mock(content="London")
+        
+        workflow = WorkflowGraph()
+        with patch.object(workflow, 'create_graph', wraps=workflow.create_graph) as create_graph:
+            workflow.run("What's the weather in London?")
+            workflow.run("What's the weather in London?")
+        
+        create_graph.assert_called_once()
+        
+        other = WorkflowGraph()
+        self.assertIs(other.router, workflow.router)
+        self.assertIs(other.llm, workflow.llm)
+        self.assertIs(other.vector_store, workflow.vector_store)
+        mock_router.assert_called_once()
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_arun_document_query(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test the async workflow for a document query"""
+        mock_router_instance = Mock()
+        mock_router_instance.aroute = AsyncMock(return_value={"route": "document", "query": "What is AI?"})
+        mock_vector_instance = Mock()
+        mock_vector_instance.aembed_query = AsyncMock(return_value=[0.1] * 768)
+        mock_vector_instance.asearch = AsyncMock(return_value=[{"text": "AI is artificial intelligence", "score": 0.9}])
+        mock_vector_instance.generation = 0
+        mock_llm_instance = Mock()
+        mock_llm_instance.ainvoke = AsyncMock(return_value=Mock(content="AI is artificial intelligence."))
+        
+        workflow = WorkflowGraph()
+        workflow.router = mock_router_instance
+        workflow.vector_store = mock_vector_instance
+        workflow.llm = mock_llm_instance
+        
+        result = asyncio.run(workflow.arun("What is AI?"))
+        
+        self.assertEqual(result["response"], "AI is artificial intelligence.")
+        mock_vector_instance.asearch.assert_awaited_once_with("What is AI?", query_vector=[0.1] * 768)
+        mock_llm_instance.invoke.assert_not_called()
+        mock_router_instance.route.assert_not_called()
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_arun_concurrent_weather_queries(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that async weather queries run concurrently on one event loop"""
+        async def slow_weather(city, units):
+            await asyncio.sleep(0.05)
+            return {'name': city}
+        
+        mock_router_instance = Mock()
+        mock_router_instance.aroute = AsyncMock(side_effect=lambda query: {
+            "route": "weather", "query": query, "slots": {"city": "London"}
+        })
+        mock_weather_instance = Mock()
+        mock_weather_instance.aget_weather = AsyncMock(side_effect=slow_weather)
+        mock_weather_instance.format_weather_data.side_effect = lambda data, units: f"Weather in {data['name']}"
+        
+        workflow = WorkflowGraph()
+        workflow.router = mock_router_instance
+        workflow.weather_api = mock_weather_instance
+        
+        async def run_many():
+            return await asyncio.gather(*[workflow.arun(f"Weather in London #{i}") for i in range(20)])
+        
+        loop = asyncio.new_event_loop()
+        try:
+            start = loop.time()
+            results = loop.run_until_complete(run_many())
+            elapsed = loop.time() - start
+        finally:
+            loop.close()
+        
+        self.assertEqual([r["response"] for r in results], ["Weather in London"] * 20)
+        # 20 queries with 50 ms of latency each would take a second serially
+        self.assertLess(elapsed, 0.5)
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_stream_document_answer_tokens(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that answer tokens are streamed with timing metrics"""
+        mock_router_instance = Mock()
+        mock_router_instance.route.return_value = {"route": "document", "query": "What is AI?"}
+        mock_vector_instance = Mock()
+        mock_vector_instance.embed_query.return_value = [0.1] * 768
+        mock_vector_instance.search.return_value = [{"text": "AI is artificial intelligence", "score": 0.9}]
+        mock_vector_instance.generation = 0
+        
+        workflow = WorkflowGraph()
+        workflow.router = mock_router_instance
+        workflow.vector_store = mock_vector_instance
+        workflow.llm = GenericFakeChatModel(messages=itertools.cycle([AIMessage(content="AI means artificial intelligence")]))
+        
+        events = list(workflow.stream("What is AI?"))
+        
+        tokens = [e["content"] for e in events if e["type"] == "token"]
+        nodes = [e["node"] for e in events if e["type"] == "node"]
+        done = events[-1]
+        self.assertGreater(len(tokens), 1)
+        self.assertEqual("".join(tokens), "AI means artificial intelligence")
+        self.assertEqual(nodes, ["router", "processor"])
+        self.assertEqual(done["type"], "done")
+        self.assertEqual(done["response"], "AI means artificial intelligence")
+        self.assertIsNotNone(done["metrics"]["time_to_first_token"])
+        self.assertGreater(done["metrics"]["tokens"], 0)
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_astream_weather_has_no_tokens(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that non-generated answers arrive in the final event"""
+        mock_router_instance = Mock()
+        mock_router_instance.aroute = AsyncMock(return_value={
+            "route": "weather", "query": "Weather in London", "slots": {"city": "London"}
+        })
+        mock_weather_instance = Mock()
+        mock_weather_instance.aget_weather = AsyncMock(return_value={'name': 'London'})
+        mock_weather_instance.format_weather_data.return_value = "Weather in London"
+        
+        workflow = WorkflowGraph()
+        workflow.router = mock_router_instance
+        workflow.weather_api = mock_weather_instance
+        
+        async def collect():
+            return [event async for event in workflow.astream("Weather in London")]
+        
+        events = asyncio.run(collect())
+        
+        self.assertFalse([e for e in events if e["type"] == "token"])
+        self.assertEqual(events[-1]["response"], "Weather in London")
+        self.assertIsNone(events[-1]["metrics"]["time_to_first_token"])
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_run_batch_groups_work_and_keeps_order(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that a batch is embedded and searched once and returned in order"""
+        queries = ["What is AI?", "Weather in London", "What is ML?", "Weather in Paris"]
+        mock_router_instance = Mock()
+        mock_router_instance.route_batch.return_value = [
+            {"route": "weather" if "Weather" in q else "document", "query": q,
+             "slots": {"city": q.split()[-1]} if "Weather" in q else {}}
+            for q in queries
+        ]
+        mock_vector_instance = Mock()
+        mock_vector_instance.generation = 0
+        mock_vector_instance.embed_queries.return_value = [[1.0, 0.0], [0.0, 1.0]]
+        mock_vector_instance.search_batch.return_value = [[{"text": "AI", "score": 0.9}],
+                                                          [{"text": "ML", "score": 0.9}]]
+        mock_weather_instance = Mock()
+        mock_weather_instance.get_weather.side_effect = lambda city, units: {"name": city}
+        mock_weather_instance.format_weather_data.side_effect = lambda data, units: f"Weather in {data['name']}"
+        mock_llm_instance = Mock()
+        mock_llm_instance.invoke.side_effect = lambda messages, config=None: Mock(
+            content="Answer about " + messages[0]["content"].split("Context:")[1].strip()
+        )
+        
+        workflow = WorkflowGraph()
+        workflow.router = mock_router_instance
+        workflow.vector_store = mock_vector_instance
+        workflow.weather_api = mock_weather_instance
+        workflow.llm = mock_llm_instance
+        
+        results = list(workflow.run_batch(queries, max_concurrency=3))
+        
+        self.assertEqual([r["query"] for r in results], queries)
+        self.assertEqual([r["response"] for r in results],
+                         ["Answer about AI", "Weather in London", "Answer about ML", "Weather in Paris"])
+        self.assertEqual(results[0]["context"]["passages"], 1)
+        self.assertNotIn("context", results[1])
+        mock_router_instance.route_batch.assert_called_once_with(queries, 3)
+        mock_vector_instance.embed_queries.assert_called_once_with(["What is AI?", "What is ML?"])
+        mock_vector_instance.search_batch.assert_called_once()
+        
+        # A repeated batch is answered from the semantic cache
+        mock_vector_instance.search_batch.return_value = []
+        again = list(workflow.run_batch(["What is AI?"], max_concurrency=3))
+        self.assertEqual(again[0]["response"], "Answer about AI")
+        self.assertEqual(mock_llm_instance.invoke.call_count, 2)
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_run_batch_reports_errors_per_query(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that one failing query does not stop the batch"""
+        mock_router_instance = Mock()
+        mock_router_instance.route_batch.return_value = [
+            {"route": "weather", "query": "Weather in London", "slots": {"city": "London"}},
+            {"route": "weather", "query": "Weather in Paris", "slots": {"city": "Paris"}}
+        ]
+        mock_weather_instance = Mock()
+        mock_weather_instance.get_weather.side_effect = [RuntimeError("boom"), {"name": "Paris"}]
+        mock_weather_instance.format_weather_data.return_value = "Weather in Paris"
+        
+        workflow = WorkflowGraph()
+        workflow.router = mock_router_instance
+        workflow.weather_api = mock_weather_instance
+        
+        results = list(workflow.run_batch(["Weather in London", "Weather in Paris"], max_concurrency=1))
+        
+        self.assertIsNone(results[0]["response"])
+        self.assertEqual(results[0]["error"], "boom")
+        self.assertEqual(results[1]["response"], "Weather in Paris")
+        workflow.vector_store.embed_queries.assert_not_called()
+
+    def conversation_workflow(self, window_turns: int = 4) -> WorkflowGraph:
+        workflow = WorkflowGraph()
+        workflow.memory.window_turns = window_turns
+        workflow.router = Mock()
+        workflow.router.route.side_effect = lambda query, history="": {"route": "document", "query": query,
+                                                                        "slots": {}}
+        workflow.vector_store = Mock(search_mode="dense", generation=0)
+        workflow.vector_store.embed_query.return_value = [0.1] * 768
+        workflow.vector_store.search.return_value = [{"text": "The XR-200 pump has a ceramic seal", "score": 0.9}]
+        workflow.llm = Mock()
+        workflow.llm.invoke.side_effect = lambda messages, **kwargs: Mock(
+            content="Summary." if "running summary" in messages[0]["content"] else "It has a ceramic seal.",
+            usage_metadata=None)
+        return workflow
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_conversation_reaches_router_and_answer(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that a thread's earlier turns inform routing and answering"""
+        workflow = self.conversation_workflow()
+        
+        workflow.run("What seal does the XR-200 use?", thread_id="t1")
+        result = workflow.run("What seal does the XR-200 use?", thread_id="t1")
+        
+        self.assertEqual(result["response"], "It has a ceramic seal.")
+        # The first turn had no history; the second gets it and skips the response cache
+        self.assertEqual(workflow.router.route.call_args_list[0].args, ("What seal does the XR-200 use?",))
+        history = workflow.router.route.call_args.args[1]
+        self.assertIn("User: What seal does the XR-200 use?\nAssistant: It has a ceramic seal.", history)
+        self.assertIn("Conversation so far", workflow.llm.invoke.call_args.args[0][0]["content"])
+        self.assertEqual(workflow.vector_store.search.call_count, 2)
+        self.assertEqual(len(workflow.conversation("t1")["messages"]), 4)
+        # Other threads and runs without a thread_id start from scratch
+        workflow.run("What seal does the XR-200 use?", thread_id="t2")
+        self.assertEqual(workflow.router.route.call_args.args, ("What seal does the XR-200 use?",))
+        self.assertEqual(workflow.run("What seal does the XR-200 use?")["messages"], [])
+        
+        workflow.clear_conversation("t1")
+        self.assertEqual(workflow.conversation("t1"), {"messages": [], "summary": ""})
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_follow_up_is_searched_as_rewritten(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that a follow-up is embedded and searched as the router's standalone query"""
+        workflow = self.conversation_workflow()
+        workflow.router.route.side_effect = lambda query, history="": {
+            "route": "document", "query": "How long does the XR-200 ceramic seal last?" if history else query,
+            "slots": {}}
+        
+        workflow.run("What seal does the XR-200 use?", thread_id="t1")
+        workflow.run("How long does it last?", thread_id="t1")
+        
+        workflow.vector_store.embed_query.assert_called_with("How long does the XR-200 ceramic seal last?")
+        self.assertIn("How long does the XR-200 ceramic seal last?", workflow.llm.invoke.call_args.args[0][0]["content"])
+        # The conversation remembers what the user typed, not the rewrite
+        self.assertEqual([m.content for m in workflow.conversation("t1")["messages"]][::2],
+                         ["What seal does the XR-200 use?", "How long does it last?"])
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_weather_city_fallback_sees_history(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that the LLM city fallback can find a city named in earlier turns"""
+        workflow = WorkflowGraph()
+        workflow.llm = Mock()
+        workflow.llm.invoke.return_value = Mock(content="Springfield", usage_metadata=None)
+        workflow.weather_api = Mock()
+        workflow.weather_api.format_weather_data.return_value = "Weather in Springfield"
+        
+        workflow.process_weather("How warm is it there?", {}, "User: I'm visiting Springfield\nAssistant: Enjoy!")
+        
+        self.assertIn("I'm visiting Springfield", workflow.llm.invoke.call_args.args[0][0]["content"])
+        workflow.weather_api.get_weather.assert_called_with("Springfield", "metric")
+
+    @patch('src.graphs.workflow.RouterAgent')
+    @patch('src.graphs.workflow.WeatherAPI')
+    @patch('src.graphs.workflow.VectorStore')
+    @patch('src.graphs.workflow.ChatGoogleGenerativeAI')
+    def test_long_conversation_stays_bounded(self, mock_llm, mock_vector, mock_weather, mock_router):
+        """Test that the window, summary and checkpoints stop growing in long conversations"""
+        workflow = self.conversation_workflow(window_turns=2)
+        
+        sizes = []
+        for i in range(12):
+            workflow.run(f"Question {i} about the XR-200?", thread_id="t1")
+            checkpointer = workflow.checkpointer
+            sizes.append((len(checkpointer.blobs), len(checkpointer.storage["t1"][""]), len(checkpointer.writes)))
+        
+        conversation = workflow.conversation("t1")
+        self.assertEqual([m.content for m in conversation["messages"]][::2],
+                         ["Question 10 about the XR-200?", "Question 11 about the XR-200?"])
+        self.assertEqual(conversation["summary"], "Summary.")
+        self.assertEqual(sizes[-1], sizes[4])
+        # One summarization call per turn once the window is full
+        summaries = [c for c in workflow.llm.invoke.call_args_list if "running summary" in c.args[0][0]["content"]]
+        self.assertEqual(len(summaries), 10)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file